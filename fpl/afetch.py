@@ -0,0 +1,500 @@
+"""asyncio counterparts of the fetch.py functions.
+
+Requests share fetch's cache, snapshot, rate limiter and metrics, so the two
+modules can be mixed freely; only the HTTP client differs (one aiohttp
+session per event loop). Bulk helpers overlap up to `max_concurrency`
+requests on one thread. Cache and snapshot reads and writes, and the
+file-locked rate limiter, run on the loop's default executor so they never
+block the loop.
+
+Synchronous code can use the sync façade, which runs coroutines on a
+background event loop, e.g.:
+
+    league = data.H2HLeague.create(
+        functools.partial(afetch.sync(afetch.get_league_pages), league_id)
+    )
+"""
+import asyncio
+import atexit
+import functools
+import threading
+import time
+import weakref
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List,
+    Optional, TypeVar,
+)
+
+import aiohttp
+
+import decode
+import error
+import fetch
+import metrics
+import ratelimit
+import session
+
+__all__ = (
+    "get_client",
+    "close",
+    "get_bootstrap_json",
+    "get_entry_json",
+    "get_element_json",
+    "get_league_json",
+    "get_league_matches_json",
+    "get_entry_event_picks_json",
+    "get_entry_history_json",
+    "get_entries_json",
+    "get_entry_histories_json",
+    "get_elements_json",
+    "get_picks_json",
+    "iter_league_pages",
+    "iter_league_matches_pages",
+    "get_league_pages",
+    "get_league_matches_pages",
+    "gather_bounded",
+    "run",
+    "sync",
+)
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+# The client's connection limit; requests beyond it queue in aiohttp.
+DEFAULT_CONNECTIONS = 100
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+# Per event loop: the HTTP client, and the in-flight downloads by cache key.
+_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_flights: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+async def _blocking(func: Callable[..., T], *args: Any) -> T:
+    """Run blocking work (disk I/O, file locks) on the running loop's
+    default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+async def get_client() -> aiohttp.ClientSession:
+    """Return the running event loop's shared client, creating it on first
+    use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.closed:
+        config = session.get_config()
+        client = _clients[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=DEFAULT_CONNECTIONS),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=config.connect_timeout,
+                sock_read=config.read_timeout,
+            ),
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+            },
+        )
+    return client
+
+
+async def close() -> None:
+    """Close the running event loop's client."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+async def _limited_get(url: str, headers: Optional[dict] = None):
+    """Issue a GET within the shared rate limit, retrying 5xx responses and
+    connection errors with backoff and 429s after the Retry-After delay (see
+    fetch._limited_get).
+
+    Returns:
+        Tuple[int, CIMultiDictProxy, bytes, int]
+            -- The status, headers and body of the last response, and the
+               number of retries.
+    """
+    client = await get_client()
+    config = session.get_config()
+    retries = 0
+    throttled = 0
+    while True:
+        await asyncio.sleep(await _blocking(ratelimit.reserve))
+        try:
+            async with client.get(url, headers=headers) as response:
+                body = await response.read()
+                status, response_headers = response.status, response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if retries >= config.retries:
+                raise
+            status, response_headers, body = None, {}, b""
+
+        if status == 429 and throttled < fetch.RATE_LIMIT_RETRIES:
+            await _blocking(
+                ratelimit.penalize,
+                ratelimit.retry_after(response_headers, throttled),
+            )
+            throttled += 1
+        elif (status is None or status in session.RETRY_STATUSES) \
+                and retries < config.retries:
+            await asyncio.sleep(config.backoff_factor * 2 ** retries)
+            retries += 1
+        else:
+            return status, response_headers, body, retries
+
+
+async def _download(url: str, key: str, on_fetch=None) -> Any:
+    """Download, decode and cache the JSON at URL (see fetch._download)."""
+    headers = {}
+    validators = await _blocking(fetch.CACHE.validators, key)
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last_modified" in validators:
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    start = time.perf_counter()
+    body = b""
+    retries = 0
+    try:
+        status, response_headers, body, retries = await _limited_get(
+            url, headers
+        )
+        if status == 304:
+            cached = await _blocking(fetch.CACHE.revalidate, key)
+            if cached is not None:
+                metrics.REGISTRY.record_request(
+                    key, time.perf_counter() - start, retries=retries,
+                    not_modified=True,
+                )
+                return cached
+            # The stored body has gone since we read the validators.
+            status, response_headers, body, retries = await _limited_get(url)
+        if not 200 <= status < 300:
+            raise error.FetchError(f"HTTP status {status}")
+        fetched = time.perf_counter()
+        data = decode.loads(body)
+    except Exception as exc:
+        metrics.REGISTRY.record_request(
+            key, time.perf_counter() - start, response_bytes=len(body),
+            retries=retries, failed=True,
+        )
+        msg = f"Error fetching JSON data from URL: {url}: {exc}"
+        raise error.FetchError(msg) from exc
+    metrics.REGISTRY.record_request(
+        key, fetched - start, response_bytes=len(body),
+        decode_time=time.perf_counter() - fetched, retries=retries,
+    )
+
+    if on_fetch is not None:
+        on_fetch(data)
+    if key != fetch.PATHS["bootstrap"] and not fetch.CACHE.policy.deadlines \
+            and not await _blocking(fetch.CACHE.load_policy):
+        # See fetch._ensure_policy.
+        await get_bootstrap_json()
+    await _blocking(functools.partial(
+        fetch.CACHE.put,
+        key,
+        data,
+        validators={
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+        },
+        raw_size=len(body),
+    ))
+    return data
+
+
+async def _get_from_url(
+    url: str, on_fetch=None, revalidate: bool = False
+) -> Any:
+    """Return JSON data from URL (see fetch._get_from_url, including for
+    `revalidate`).
+
+    Concurrent calls for the same URL on one event loop share one download.
+    """
+    key = fetch._cache_key(url)
+    if fetch.SNAPSHOT is not None:
+        data = await _blocking(fetch.SNAPSHOT.get_json, key)
+        if data is not None:
+            return data
+
+    if not revalidate:
+        cached = await _blocking(fetch.CACHE.get, key)
+        metrics.REGISTRY.record_cache(key, hit=cached is not None)
+        if cached is not None:
+            return cached
+
+    flights = _flights.setdefault(asyncio.get_running_loop(), {})
+    task = flights.get(key)
+    if task is not None:
+        metrics.REGISTRY.record_coalesced(key)
+        return await asyncio.shield(task)
+
+    task = flights[key] = asyncio.ensure_future(_download(url, key, on_fetch))
+    task.add_done_callback(lambda _: flights.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def get_bootstrap_json(revalidate: bool = False) -> dict:
+    """See fetch.get_bootstrap_json."""
+    def _update_policy(data):
+        fetch.CACHE.policy.update(data.get("events", []))
+
+    response = await _get_from_url(
+        fetch.BASE_URL + fetch.PATHS["bootstrap"],
+        on_fetch=_update_policy,
+        revalidate=revalidate,
+    )
+    if not fetch.CACHE.policy.deadlines:
+        _update_policy(response)
+    return response
+
+
+async def get_entry_json(entry_id: int) -> dict:
+    """See fetch.get_entry_json."""
+    return await _get_from_url(
+        fetch.BASE_URL + fetch.PATHS["entry"].format(entry_id=entry_id)
+    )
+
+
+async def get_element_json(
+    element_id: int, revalidate: bool = False
+) -> dict:
+    """See fetch.get_element_json."""
+    return await _get_from_url(
+        fetch.BASE_URL + fetch.PATHS["element"].format(element_id=element_id),
+        revalidate=revalidate,
+    )
+
+
+async def get_league_json(league_id: int, page: int = 1) -> dict:
+    """See fetch.get_league_json."""
+    return await _get_from_url(
+        fetch.BASE_URL
+        + fetch.PATHS["league"].format(league_id=league_id, page=page)
+    )
+
+
+async def get_league_matches_json(
+    league_id: int, page: int = 1, event_id: Optional[int] = None
+) -> dict:
+    """See fetch.get_league_matches_json."""
+    if event_id is None:
+        path = fetch.PATHS["league_matches"].format(
+            league_id=league_id, page=page
+        )
+    else:
+        path = fetch.PATHS["league_event_matches"].format(
+            league_id=league_id, page=page, event_id=event_id
+        )
+    return await _get_from_url(fetch.BASE_URL + path)
+
+
+async def get_entry_event_picks_json(entry_id: int, event_id: int) -> dict:
+    """See fetch.get_entry_event_picks_json."""
+    return await _get_from_url(
+        fetch.BASE_URL
+        + fetch.PATHS["picks"].format(entry_id=entry_id, event_id=event_id)
+    )
+
+
+async def get_entry_history_json(entry_id: int) -> dict:
+    """See fetch.get_entry_history_json."""
+    return await _get_from_url(
+        fetch.BASE_URL
+        + fetch.PATHS["entry_history"].format(entry_id=entry_id)
+    )
+
+
+async def gather_bounded(
+    func: Callable[[K], Awaitable[T]],
+    keys: Iterable[K],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[K, T]:
+    """Await `func` for each key, at most `max_concurrency` at once.
+
+    Arguments:
+        func {Callable[[K], Awaitable[T]]} -- The single-item coroutine.
+        keys {Iterable[K]} -- The keys (duplicates fetched once).
+        max_concurrency {int} -- The maximum number of calls in flight.
+
+    Raises:
+        error.BulkFetchError -- If any item failed. The exception carries the
+                                per-key errors, each an error.FetchError (as
+                                from bulk.fetch_many), and the successful
+                                results.
+
+    Returns:
+        Dict[K, T] -- The result for each key, in the order given.
+    """
+    keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _call(key: K) -> T:
+        async with semaphore:
+            return await func(key)
+
+    outcomes = await asyncio.gather(
+        *(_call(key) for key in keys), return_exceptions=True
+    )
+    results: Dict[K, T] = {}
+    errors: Dict[K, error.FetchError] = {}
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, error.FetchError):
+            errors[key] = outcome
+        elif isinstance(outcome, Exception):
+            errors[key] = error.FetchError(
+                f"Error fetching {key!r}: {outcome}"
+            )
+            errors[key].__cause__ = outcome
+        elif isinstance(outcome, BaseException):
+            # e.g. CancelledError: not a failed fetch.
+            raise outcome
+        else:
+            results[key] = outcome
+
+    if errors:
+        msg = f"Failed to fetch {len(errors)} of {len(keys)} items: " + \
+              ", ".join(repr(key) for key in list(errors)[:5])
+        raise error.BulkFetchError(msg, errors, results)
+    return results
+
+
+async def get_entries_json(
+    entry_ids: Iterable[int], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> Dict[int, dict]:
+    """See fetch.get_entries_json."""
+    return await gather_bounded(get_entry_json, entry_ids, max_concurrency)
+
+
+async def get_entry_histories_json(
+    entry_ids: Iterable[int], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> Dict[int, dict]:
+    """See fetch.get_entry_histories_json."""
+    return await gather_bounded(
+        get_entry_history_json, entry_ids, max_concurrency
+    )
+
+
+async def get_elements_json(
+    element_ids: Iterable[int],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    revalidate: bool = False,
+) -> Dict[int, dict]:
+    """See fetch.get_elements_json."""
+    return await gather_bounded(
+        functools.partial(get_element_json, revalidate=revalidate),
+        element_ids,
+        max_concurrency,
+    )
+
+
+async def get_picks_json(
+    entry_ids: Iterable[int],
+    event_ids: Iterable[int],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[tuple, dict]:
+    """See fetch.get_picks_json."""
+    event_ids = list(event_ids)
+    return await gather_bounded(
+        lambda key: get_entry_event_picks_json(*key),
+        [(entry, event) for entry in entry_ids for event in event_ids],
+        max_concurrency,
+    )
+
+
+async def _iter_pages(get_page, has_next) -> AsyncIterator[dict]:
+    """Yield successive pages, fetching the next page while the caller
+    processes the current one (see fetch._iter_pages).
+
+    The prefetch is cancelled if the caller stops early.
+    """
+    page = 1
+    task: Optional[asyncio.Future] = asyncio.ensure_future(get_page(page))
+    try:
+        while task is not None:
+            data = await task
+            page += 1
+            task = asyncio.ensure_future(get_page(page)) if has_next(data) \
+                else None
+            yield data
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+def iter_league_pages(league_id: int) -> AsyncIterator[dict]:
+    """See fetch.iter_league_pages."""
+    return _iter_pages(
+        lambda page: get_league_json(league_id, page),
+        lambda data: data["standings"]["has_next"],
+    )
+
+
+def iter_league_matches_pages(
+    league_id: int, event_id: Optional[int] = None
+) -> AsyncIterator[dict]:
+    """See fetch.iter_league_matches_pages."""
+    return _iter_pages(
+        lambda page: get_league_matches_json(league_id, page, event_id),
+        lambda data: data["has_next"],
+    )
+
+
+async def get_league_pages(league_id: int) -> List[dict]:
+    """Return every page of the given league's standings."""
+    return [page async for page in iter_league_pages(league_id)]
+
+
+async def get_league_matches_pages(
+    league_id: int, event_id: Optional[int] = None
+) -> List[dict]:
+    """Return every page of the given league's matches."""
+    return [
+        page async for page in iter_league_matches_pages(league_id, event_id)
+    ]
+
+
+_loop_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Return the façade's event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="afetch", daemon=True
+            ).start()
+            atexit.register(lambda: run(close()))
+        return _loop
+
+
+def run(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion from synchronous code.
+
+    Coroutines run on one background event loop, so its client and
+    connections are reused across calls, and this works even when the
+    calling thread already has a running loop (e.g. under Streamlit).
+
+    Arguments:
+        coro {Awaitable[T]} -- The coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+def sync(func: Callable[..., Awaitable[T]]) -> Callable[..., T]:
+    """Return a blocking version of a coroutine function, e.g.
+    sync(get_league_pages) for H2HLeague.create.
+
+    Arguments:
+        func {Callable[..., Awaitable[T]]} -- The coroutine function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return run(func(*args, **kwargs))
+    return wrapper
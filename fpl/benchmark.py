@@ -0,0 +1,573 @@
+"""Benchmarks for fetching, decoding and building the league models.
+
+Payloads come from JSON fixtures: either recorded ones in a directory (see
+save_fixtures/load_fixtures) or a SyntheticSeason scaled to any league
+size. Each case reports its best and median wall time and peak traced
+memory; results are appended to a JSON-lines file so that runs can be
+compared over time, and a run is flagged when a case slows down by more
+than the threshold against the previous run at the same scale.
+
+Run with e.g.:
+    ./Taskfile bench --entries 1000 --repeat 5
+"""
+import argparse
+import contextlib
+import functools
+import http.server
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional
+
+import cache
+import data
+import decode
+import fetch
+import metrics
+import mockapi
+import process
+import ratelimit
+import simulate
+import standings
+import synthetic
+
+__all__ = (
+    "FIXTURES",
+    "synthetic_fixtures",
+    "save_fixtures",
+    "load_fixtures",
+    "StubServer",
+    "cases",
+    "run",
+    "pipeline",
+    "main",
+)
+
+DEFAULT_RESULTS = os.path.join("bench", "results.jsonl")
+
+# Seasons played out by the simulate_season case.
+SIMULATIONS = 20000
+
+# Match columns blanked to mark a match as not yet played.
+RESULT_COLUMNS = tuple(
+    f"{side}_{column}"
+    for side in ("entry_1", "entry_2")
+    for column in ("points", "win", "draw", "loss")
+)
+
+# Fixture name -> JSON payload (a list for paged endpoints).
+FIXTURES = ("bootstrap", "league_pages", "matches_pages", "element")
+
+
+def synthetic_fixtures(n_entries: int, n_events: int = 38) -> Dict:
+    """Return fixtures for a generated league of the given size.
+
+    Arguments:
+        n_entries {int} -- The number of entries in the league.
+        n_events {int} -- The number of events, all finished.
+    """
+    season = synthetic.SyntheticSeason(
+        n_entries=n_entries, n_events=n_events, finished=n_events
+    )
+    league_pages = [season.league_json(1)]
+    while league_pages[-1]["standings"]["has_next"]:
+        league_pages.append(season.league_json(len(league_pages) + 1))
+    matches_pages = [season.league_matches_json(1)]
+    while matches_pages[-1]["has_next"]:
+        matches_pages.append(
+            season.league_matches_json(len(matches_pages) + 1)
+        )
+    return {
+        "bootstrap": season.bootstrap_json(),
+        "league_pages": league_pages,
+        "matches_pages": matches_pages,
+        "element": season.element_json(1),
+    }
+
+
+def save_fixtures(directory: str, fixtures: Dict) -> None:
+    """Record fixtures as <name>.json files, e.g. to pin them in a repo.
+
+    Arguments:
+        directory {str} -- The directory to write to.
+        fixtures {dict} -- The fixtures, keyed by FIXTURES name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in FIXTURES:
+        with open(os.path.join(directory, f"{name}.json"), "wb") as file:
+            file.write(decode.dumps(fixtures[name]))
+
+
+def load_fixtures(directory: str) -> Dict:
+    """Load fixtures recorded with save_fixtures.
+
+    Arguments:
+        directory {str} -- The directory to read from.
+    """
+    fixtures = {}
+    for name in FIXTURES:
+        with open(os.path.join(directory, f"{name}.json"), "rb") as file:
+            fixtures[name] = decode.loads(file.read())
+    return fixtures
+
+
+class StubServer:
+    """Class representing a local HTTP server which serves fixed bodies by
+    path, for timing the fetch layer without the network.
+
+    Use as a context manager; `url` is the server's base URL.
+    """
+    def __init__(self, bodies: Dict[str, bytes]) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            bodies {Dict[str, bytes]} -- The response body for each path.
+        """
+        self.bodies: Dict[str, bytes] = bodies
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body = bodies.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), Handler
+        )
+        self.url: str = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@contextlib.contextmanager
+def _unlimited() -> Iterator[None]:
+    """Lift the client-side rate limit (and its shared state file) for the
+    duration, restoring the limiter afterwards, so cases time the code
+    rather than the limiter."""
+    limiter = ratelimit.get_limiter()
+    ratelimit.configure(None, shared=False)
+    try:
+        yield
+    finally:
+        ratelimit.configure(
+            limiter.rate, limiter.burst, limiter.path,
+            shared=limiter.path is not None,
+        )
+
+
+def _time(
+    func: Callable[[], object],
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """Return the best and median wall time of `func`, and its peak traced
+    memory (measured in a separate, untimed call)."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_bytes": peak,
+    }
+
+
+def cases(fixtures: Dict, server_url: str, cache_dir: str) -> Dict:
+    """Return the benchmark cases as (func, setup) pairs keyed by name.
+
+    Arguments:
+        fixtures {dict} -- The fixtures, keyed by FIXTURES name.
+        server_url {str} -- The base URL of a StubServer serving them.
+        cache_dir {str} -- A scratch directory for the response cache.
+    """
+    bootstrap_bytes = decode.dumps(fixtures["bootstrap"])
+    element_bytes = decode.dumps(fixtures["element"])
+    bootstrap_url = server_url + "/" + fetch.PATHS["bootstrap"]
+    response_cache = cache.ResponseCache(cache_dir)
+
+    def _use_cache():
+        # Fetch from the stub by endpoint path, so the bootstrap is cached
+        # under its own key rather than first fetching the live one for
+        # the cache's TTL policy.
+        fetch.set_base_url(server_url, response_cache)
+
+    def _cold_cache():
+        _use_cache()
+        response_cache.invalidate(immutable=True)
+
+    def _warm_cache():
+        _use_cache()
+        fetch._get_from_url(bootstrap_url)
+
+    league_pages = fixtures["league_pages"]
+    matches_pages = fixtures["matches_pages"]
+    matches_df = standings.matches_df_from_pages(matches_pages)
+    events = sorted(matches_df["event"].unique().tolist())
+    before_df = standings.compute_standings(
+        matches_df[matches_df["event"] < events[-1]]
+    )
+    last_df = matches_df[matches_df["event"] == events[-1]]
+
+    # Project the second half of the season as if it were still to play.
+    unplayed = matches_df["event"] > events[len(events) // 2]
+    remaining_df = matches_df.copy()
+    for column in RESULT_COLUMNS:
+        remaining_df.loc[unplayed, column] = 0
+    simulator = simulate.SeasonSimulator.from_matches(remaining_df)
+
+    return {
+        "fetch_bootstrap_cold": (
+            functools.partial(fetch._get_from_url, bootstrap_url),
+            _cold_cache,
+        ),
+        "fetch_bootstrap_cached": (
+            functools.partial(fetch._get_from_url, bootstrap_url),
+            _warm_cache,
+        ),
+        "decode_bootstrap": (
+            functools.partial(decode.loads, bootstrap_bytes), None
+        ),
+        "decode_bootstrap_stdlib": (
+            functools.partial(json.loads, bootstrap_bytes), None
+        ),
+        "bootstrap_elements_df": (
+            lambda: data.Bootstrap(fixtures["bootstrap"]).elements_df, None
+        ),
+        "bootstrap_elements_df_raw": (
+            lambda: data.Bootstrap(bootstrap_bytes).elements_df, None
+        ),
+        "df_from_json_elements": (
+            functools.partial(
+                process.df_from_json, fixtures["bootstrap"]["elements"]
+            ),
+            None,
+        ),
+        "element_history_df": (
+            functools.partial(
+                process.element_history_df_from_json,
+                [fixtures["element"]] * 100,
+            ),
+            None,
+        ),
+        "element_history_df_raw": (
+            functools.partial(
+                process.element_history_df_from_json, [element_bytes] * 100
+            ),
+            None,
+        ),
+        "h2h_league_create": (
+            functools.partial(data.H2HLeague.create, lambda: league_pages),
+            None,
+        ),
+        "matches_df_from_pages": (
+            functools.partial(standings.matches_df_from_pages, matches_pages),
+            None,
+        ),
+        "compute_standings": (
+            functools.partial(standings.compute_standings, matches_df), None
+        ),
+        "append_standings": (
+            functools.partial(standings.append_standings, before_df, last_df),
+            None,
+        ),
+        "simulate_season": (
+            functools.partial(
+                simulator.run, sims=SIMULATIONS, seed=0, processes=0
+            ),
+            None,
+        ),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous(results_path: str, scale: Dict) -> Optional[Dict]:
+    """Return the last recorded run at the same scale, if any."""
+    previous = None
+    try:
+        with open(results_path, "r", encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                if record.get("scale") == scale:
+                    previous = record
+    except (OSError, ValueError):
+        return None
+    return previous
+
+
+def run(
+    fixtures: Dict,
+    scale: Dict,
+    repeat: int = 5,
+    only: Optional[List[str]] = None,
+) -> Dict:
+    """Run the benchmark cases and return the run record.
+
+    Arguments:
+        fixtures {dict} -- The fixtures, keyed by FIXTURES name.
+        scale {dict} -- Describes the fixtures (recorded with the results).
+        repeat {int} -- The number of timed calls per case.
+        only {Optional[List[str]]} -- Run only these cases.
+    """
+    bodies = {
+        "/" + fetch.PATHS["bootstrap"]: decode.dumps(fixtures["bootstrap"])
+    }
+    base_url, response_cache = fetch.BASE_URL, fetch.CACHE
+    results = {}
+    try:
+        with _unlimited(), StubServer(bodies) as server, \
+                tempfile.TemporaryDirectory() as cache_dir:
+            for name, (func, setup) in cases(
+                fixtures, server.url, cache_dir
+            ).items():
+                if only and name not in only:
+                    continue
+                results[name] = _time(func, repeat, setup)
+    finally:
+        fetch.set_base_url(base_url, response_cache)
+
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "decoder": decode.BACKEND,
+        "scale": scale,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def pipeline(
+    n_entries: int,
+    n_events: int = 38,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> Dict:
+    """Build a league's standings and history end to end over HTTP against
+    a mockapi.MockServer, with a cold cache and no client-side rate limit.
+
+    Arguments:
+        n_entries {int} -- The number of entries in the league.
+        n_events {int} -- The number of events, all finished.
+        latency {float} -- See mockapi.MockServer.
+        jitter {float} -- See mockapi.MockServer.
+        error_rate {float} -- See mockapi.MockServer.
+        seed {int} -- See mockapi.MockServer.
+
+    Returns:
+        dict -- Wall time, throughput, the server's counters and each
+                endpoint's latency percentiles.
+    """
+    league_id = 1
+    base_url, response_cache = fetch.BASE_URL, fetch.CACHE
+    metrics.REGISTRY.reset()
+    try:
+        with _unlimited(), mockapi.MockServer(
+            n_entries=n_entries, n_events=n_events, finished=n_events,
+            latency=latency, jitter=jitter, error_rate=error_rate, seed=seed,
+        ) as server, tempfile.TemporaryDirectory() as cache_dir:
+            fetch.set_base_url(server.url, cache.ResponseCache(cache_dir))
+
+            start = time.perf_counter()
+            events = [
+                event["id"] for event in fetch.get_bootstrap_json()["events"]
+                if event["finished"]
+            ]
+            data.H2HLeague.create(
+                functools.partial(fetch.iter_league_pages, league_id)
+            )
+            data.LeagueHistory.create(
+                league_id,
+                events,
+                functools.partial(fetch.iter_league_matches_pages, league_id),
+                fetch.get_picks_json,
+            )
+            wall = time.perf_counter() - start
+            stats = dict(server.stats)
+    finally:
+        fetch.set_base_url(base_url, response_cache)
+
+    return {
+        "wall_s": wall,
+        "requests_per_s": stats["requests"] / wall if wall else None,
+        "server": stats,
+        "endpoints": {
+            endpoint: {
+                f"latency_p{pct}": snapshot[f"latency_p{pct}"]
+                for pct in metrics.PERCENTILES
+            }
+            for endpoint, snapshot in metrics.REGISTRY.snapshot().items()
+        },
+    }
+
+
+def _report(record: Dict, previous: Optional[Dict], threshold: float) -> int:
+    """Print the run against the previous one; return the number of
+    regressions."""
+    regressions = 0
+    before = previous["results"] if previous else {}
+    print(f"{'case':<28}{'best ms':>10}{'median ms':>11}{'peak KiB':>10}"
+          f"{'vs prev':>9}")
+    for name, result in record["results"].items():
+        change = ""
+        if name in before and before[name]["best_s"] > 0:
+            ratio = result["best_s"] / before[name]["best_s"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > threshold:
+                change += " !"
+                regressions += 1
+        print(
+            f"{name:<28}{result['best_s'] * 1000:>10.2f}"
+            f"{result['median_s'] * 1000:>11.2f}"
+            f"{result['peak_bytes'] / 1024:>10.0f}{change:>9}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--entries", type=int, default=20,
+        help="Entries in the synthetic league (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--events", type=int, default=38,
+        help="Finished Gameweeks in the synthetic league "
+             "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fixtures", metavar="DIR",
+        help="Use recorded fixtures from DIR instead of a synthetic league",
+    )
+    parser.add_argument(
+        "--record", metavar="DIR",
+        help="Write the fixtures used to DIR, then run",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="Timed calls per case (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--case", action="append", dest="cases", metavar="NAME",
+        help="Only run this case (repeatable)",
+    )
+    parser.add_argument(
+        "--results", default=DEFAULT_RESULTS,
+        help="JSON-lines file of past runs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="Slowdown against the previous run flagged as a regression "
+             "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true",
+        help="Exit non-zero if any case regressed",
+    )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="Also time the whole fetch pipeline against a mock API server",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="Mock server latency per request, in seconds, for --pipeline "
+             "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0,
+        help="Mock server mean extra exponential latency, in seconds, for "
+             "--pipeline (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0,
+        help="Fraction of mock server requests which fail, for --pipeline "
+             "(default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+        scale = {"fixtures": os.path.abspath(args.fixtures)}
+    else:
+        fixtures = synthetic_fixtures(args.entries, args.events)
+        scale = {"entries": args.entries, "events": args.events}
+    if args.record:
+        save_fixtures(args.record, fixtures)
+
+    record = run(fixtures, scale, repeat=args.repeat, only=args.cases)
+    previous = _previous(args.results, scale)
+    regressions = _report(record, previous, args.threshold)
+
+    if args.pipeline:
+        record["pipeline"] = pipeline(
+            args.entries, args.events, args.latency, args.jitter,
+            args.error_rate,
+        )
+        print(json.dumps(record["pipeline"], indent=2))
+
+    os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+    with open(args.results, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record) + "\n")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
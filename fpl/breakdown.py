@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+__all__ = (
+    "ElementEventIndex",
+    "compute_breakdown",
+)
+
+# Picks in these squad positions start; the rest are on the bench.
+STARTING_POSITIONS = 11
+
+
+class ElementEventIndex:
+    """Class representing dense (element, event) lookup arrays built from
+    per-Gameweek element history.
+
+    Double Gameweeks are summed and blank Gameweeks are zero, so any
+    (element, event) pair can be looked up by array indexing.
+    """
+    def __init__(self, element_history_df: pd.DataFrame) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            element_history_df {pd.DataFrame}
+                -- Per-Gameweek element history (schema.ELEMENT_HISTORY).
+        """
+        elements = element_history_df["element"].to_numpy(np.int64)
+        events = element_history_df["event"].to_numpy(np.int64)
+        self.n_elements: int = int(elements.max(initial=0)) + 1
+        self.n_events: int = int(events.max(initial=0)) + 1
+
+        cells = elements * self.n_events + events
+        size = self.n_elements * self.n_events
+        self.points: np.ndarray = np.bincount(
+            cells,
+            weights=element_history_df["total_points"].to_numpy(np.float64),
+            minlength=size,
+        ).astype(np.int16).reshape(self.n_elements, self.n_events)
+        self.minutes: np.ndarray = np.bincount(
+            cells,
+            weights=element_history_df["minutes"].to_numpy(np.float64),
+            minlength=size,
+        ).astype(np.int16).reshape(self.n_elements, self.n_events)
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(n_elements={self.n_elements}, "
+            f"n_events={self.n_events})"
+        )
+
+
+    def lookup(
+        self, table: np.ndarray, elements: np.ndarray, events: np.ndarray
+    ) -> np.ndarray:
+        """Return `table` values for each (element, event) pair, zero for
+        pairs outside the index.
+
+        Arguments:
+            table {np.ndarray} -- self.points or self.minutes.
+            elements {np.ndarray} -- The Element IDs.
+            events {np.ndarray} -- The Event IDs, one per element.
+        """
+        elements = np.asarray(elements, dtype=np.int64)
+        events = np.asarray(events, dtype=np.int64)
+        inside = (elements < self.n_elements) & (events < self.n_events)
+        values = np.zeros(len(elements), dtype=table.dtype)
+        values[inside] = table[elements[inside], events[inside]]
+        return values
+
+
+def _pick_keys(
+    entries: np.ndarray, events: np.ndarray, elements: np.ndarray
+) -> np.ndarray:
+    """Return a single int64 key per (entry, event, element)."""
+    return (
+        (entries.astype(np.int64) << 24)
+        | (events.astype(np.int64) << 16)
+        | elements.astype(np.int64)
+    )
+
+
+def compute_breakdown(
+    picks_df: pd.DataFrame,
+    element_history_df: pd.DataFrame,
+    entry_history_df: Optional[pd.DataFrame] = None,
+    automatic_subs_df: Optional[pd.DataFrame] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Break every entry's Gameweek points down by player.
+
+    Applies automatic substitutions, and passes the captain's multiplier to
+    the vice-captain when the captain didn't play. Points are looked up in
+    an ElementEventIndex, so the whole join is array indexing.
+
+    `points` counts every pick at its effective multiplier, so it includes
+    the bench under Bench Boost; `bench_points` is the bench left unused by
+    automatic substitutions, like the API's `points_on_bench`.
+
+    Arguments:
+        picks_df {pd.DataFrame}
+            -- Picks for any number of entries and events (schema.PICKS).
+        element_history_df {pd.DataFrame}
+            -- Per-Gameweek element history (schema.ELEMENT_HISTORY).
+        entry_history_df {Optional[pd.DataFrame]}
+            -- Entry history (schema.ENTRY_HISTORY), for transfer hits.
+        automatic_subs_df {Optional[pd.DataFrame]}
+            -- Automatic substitutions (schema.AUTOMATIC_SUBS).
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]
+            -- Per-pick detail (points, effective multiplier, contribution)
+               and a per (entry, event) summary with starting, captaincy,
+               auto-sub and bench points, transfer hits and the total.
+    """
+    index = ElementEventIndex(element_history_df)
+
+    entries = picks_df["entry"].to_numpy(np.int64)
+    events = picks_df["event"].to_numpy(np.int64)
+    elements = picks_df["element"].to_numpy(np.int64)
+    positions = picks_df["position"].to_numpy(np.int64)
+    multiplier = picks_df["multiplier"].to_numpy(np.int64).copy()
+    is_captain = picks_df["is_captain"].to_numpy(bool)
+    is_vice = picks_df["is_vice_captain"].to_numpy(bool)
+
+    points = index.lookup(index.points, elements, events).astype(np.int64)
+    minutes = index.lookup(index.minutes, elements, events)
+
+    # Automatic substitutions, matched on (entry, event, element) keys.
+    keys = _pick_keys(entries, events, elements)
+    sub_in = np.zeros(len(picks_df), dtype=bool)
+    sub_out = np.zeros(len(picks_df), dtype=bool)
+    if automatic_subs_df is not None and not automatic_subs_df.empty:
+        sub_entries = automatic_subs_df["entry"].to_numpy(np.int64)
+        sub_events = automatic_subs_df["event"].to_numpy(np.int64)
+        sub_in = np.isin(keys, _pick_keys(
+            sub_entries, sub_events,
+            automatic_subs_df["element_in"].to_numpy(np.int64),
+        ))
+        sub_out = np.isin(keys, _pick_keys(
+            sub_entries, sub_events,
+            automatic_subs_df["element_out"].to_numpy(np.int64),
+        ))
+        multiplier[sub_out] = 0
+        multiplier[sub_in & (multiplier == 0)] = 1
+
+    # Captain fallback: a non-playing captain's multiplier passes to the
+    # vice-captain. Teams are keyed by (entry, event).
+    teams = _pick_keys(entries, events, np.zeros_like(elements))
+    team_ids, team_of_pick = np.unique(teams, return_inverse=True)
+    captain_minutes = np.full(len(team_ids), -1, dtype=np.int64)
+    captain_multiplier = np.zeros(len(team_ids), dtype=np.int64)
+    captain_minutes[team_of_pick[is_captain]] = minutes[is_captain]
+    captain_multiplier[team_of_pick[is_captain]] = \
+        picks_df["multiplier"].to_numpy(np.int64)[is_captain]
+    fallback = (
+        is_vice
+        & (captain_minutes[team_of_pick] == 0)
+        & (minutes > 0)
+    )
+    has_fallback = np.zeros(len(team_ids), dtype=bool)
+    has_fallback[team_of_pick[fallback]] = True
+    multiplier[fallback] = captain_multiplier[team_of_pick[fallback]]
+    multiplier[is_captain & has_fallback[team_of_pick]] = 0
+
+    contribution = points * multiplier
+    detail_df = pd.DataFrame({
+        "entry": entries.astype(np.int32),
+        "event": events.astype(np.int16),
+        "element": elements.astype(np.int16),
+        "position": positions.astype(np.int8),
+        "points": points.astype(np.int16),
+        "minutes": minutes,
+        "multiplier": multiplier.astype(np.int8),
+        "contribution": contribution.astype(np.int16),
+        "is_captain": is_captain,
+        "auto_sub_in": sub_in,
+        "auto_sub_out": sub_out,
+    })
+
+    # Per-team sums via bincount over the team index.
+    n_teams = len(team_ids)
+    starting = positions <= STARTING_POSITIONS
+
+    def _team_sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(
+            team_of_pick, weights=values, minlength=n_teams
+        ).astype(np.int32)
+
+    first = np.unique(team_of_pick, return_index=True)[1]
+    summary_df = pd.DataFrame({
+        "entry": entries[first].astype(np.int32),
+        "event": events[first].astype(np.int16),
+        "starting_points": _team_sum(points * (starting & ~sub_out)),
+        "captain_points": _team_sum(points * np.maximum(multiplier - 1, 0)),
+        "auto_sub_points": _team_sum(points * sub_in),
+        "bench_points": _team_sum(points * (~starting & ~sub_in)),
+        "points": _team_sum(contribution),
+    })
+
+    summary_df["transfers_cost"] = np.int32(0)
+    if entry_history_df is not None and not entry_history_df.empty:
+        costs = entry_history_df.set_index(["entry", "event"])
+        costs = costs["event_transfers_cost"]
+        summary_df["transfers_cost"] = costs.reindex(
+            pd.MultiIndex.from_arrays(
+                [summary_df["entry"], summary_df["event"]]
+            ),
+            fill_value=0,
+        ).to_numpy(np.int32)
+    summary_df["net_points"] = \
+        summary_df["points"] - summary_df["transfers_cost"]
+
+    return detail_df, summary_df
@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+import error
+
+__all__ = (
+    "RateLimiter",
+    "fetch_many",
+)
+
+DEFAULT_MAX_WORKERS = 16
+# Fetches already share ratelimit's token bucket, so by default bulk
+# fetches add no spacing of their own.
+DEFAULT_RATE = None
+
+K = TypeVar("K", bound=Hashable)
+
+
+class RateLimiter:
+    """Class spacing out calls so that no more than `rate` start per second.
+    """
+    def __init__(self, rate: Optional[float]) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            rate {Optional[float]}
+                -- The maximum number of calls per second (unlimited if None).
+        """
+        self.rate: Optional[float] = rate
+        self._lock = threading.Lock()
+        self._next_slot: float = 0.0
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        return f"{self.__class__.__name__}(rate={self.rate!r})"
+
+
+    def wait(self) -> None:
+        """Block until the caller may start its next call."""
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def fetch_many(
+    func: Callable[[K], dict],
+    keys: Iterable[K],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate: Optional[float] = DEFAULT_RATE,
+) -> Dict[K, dict]:
+    """Call `func` for each key over a bounded thread pool.
+
+    Arguments:
+        func {Callable[[K], dict]} -- The single-item fetch function.
+        keys {Iterable[K]} -- The keys to fetch (duplicates fetched once).
+        max_workers {int} -- The maximum number of requests in flight.
+        rate {Optional[float]} -- The maximum number of requests started per
+                                  second (unlimited if None).
+
+    Raises:
+        error.BulkFetchError -- If any item failed. The exception carries the
+                                per-key errors and the successful results.
+
+    Returns:
+        Dict[K, dict] -- JSON data for each key, in the order given.
+    """
+    keys = list(dict.fromkeys(keys))
+    limiter = RateLimiter(rate)
+
+    def _call(key: K) -> dict:
+        limiter.wait()
+        return func(key)
+
+    results: Dict[K, dict] = {}
+    errors: Dict[K, error.FetchError] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [(key, pool.submit(_call, key)) for key in keys]
+        for key, future in futures:
+            try:
+                results[key] = future.result()
+            except error.FetchError as exc:
+                errors[key] = exc
+            except Exception as exc:
+                errors[key] = error.FetchError(
+                    f"Error fetching {key!r}: {exc}"
+                )
+                errors[key].__cause__ = exc
+
+    if errors:
+        msg = f"Failed to fetch {len(errors)} of {len(keys)} items: " + \
+              ", ".join(repr(key) for key in list(errors)[:5])
+        raise error.BulkFetchError(msg, errors, results)
+
+    return results
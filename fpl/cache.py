@@ -0,0 +1,542 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import decode
+
+__all__ = (
+    "CacheStats",
+    "TTLPolicy",
+    "ResponseCache",
+    "default_directory",
+    "parse_time",
+)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MEMORY_ITEMS = 512
+
+# Passed as put()'s TTL to use the cache's TTLPolicy.
+USE_POLICY = -1.0
+
+# The key of the bootstrap response, whose events drive the TTLPolicy.
+BOOTSTRAP_KEY = "bootstrap-static"
+
+_PICKS_RE = re.compile(r"^entry/\d+/event/(?P<event>\d+)/picks/?$")
+_EVENT_MATCHES_RE = re.compile(
+    r"^leagues-h2h-matches/league/\d+/?\?page=\d+&event=(?P<event>\d+)$"
+)
+
+
+def default_directory() -> str:
+    """Return the cache directory ($FPL_CACHE_DIR, else ~/.cache/fpl)."""
+    return os.environ.get(
+        "FPL_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "fpl"),
+    )
+
+
+def parse_time(value: str) -> float:
+    """Return the epoch time for an FPL ISO-8601 timestamp (e.g. deadline)."""
+    value = value.replace("Z", "+00:00")
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class CacheStats:
+    """Class representing the hit/miss counters of a cache.
+    """
+    FIELDS = (
+        "hits", "misses", "stale", "puts", "evictions",
+        "not_modified", "bytes_saved",
+    )
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.stale: int = 0
+        self.puts: int = 0
+        self.evictions: int = 0
+        self.not_modified: int = 0
+        self.bytes_saved: int = 0
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        parts = [f"{k}={v}" for k, v in self.as_dict().items()]
+        return f"{classname}({', '.join(parts)})"
+
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        """Thread-safely increment one of the counters.
+
+        Arguments:
+            field {str} -- The counter to increment.
+            amount {int} -- The amount to increment by.
+        """
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class TTLPolicy:
+    """Class deciding how long each endpoint's response stays fresh.
+
+    The policy is driven by the bootstrap `events` list:
+      - picks and H2H matches for a finished event never change, so they
+        never expire.
+      - while a gameweek is live, everything else refreshes every `live_ttl`.
+      - otherwise, responses stay fresh until the next `deadline_time`.
+    """
+    def __init__(
+        self,
+        live_ttl: float = 300.0,
+        default_ttl: float = 3600.0,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            live_ttl {float}
+                -- The TTL (seconds) for data that changes during a live
+                   gameweek.
+            default_ttl {float}
+                -- The TTL (seconds) used before the events are known, and
+                   the upper bound for the time-to-next-deadline TTL.
+        """
+        self.live_ttl: float = live_ttl
+        self.default_ttl: float = default_ttl
+        self.finished_events: frozenset = frozenset()
+        self.deadlines: List[float] = []
+        self.live: bool = False
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(live_ttl={self.live_ttl!r}, "
+            f"default_ttl={self.default_ttl!r}, "
+            f"finished_events={sorted(self.finished_events)!r}, "
+            f"live={self.live!r})"
+        )
+
+
+    def update(self, events: Iterable[dict]) -> None:
+        """Update the policy from the bootstrap `events` list.
+
+        Arguments:
+            events {Iterable[dict]} -- The bootstrap `events` items.
+        """
+        events = list(events)
+        self.finished_events = frozenset(
+            event["id"] for event in events if event.get("finished")
+        )
+        self.deadlines = sorted(
+            parse_time(event["deadline_time"])
+            for event in events if event.get("deadline_time")
+        )
+        self.live = any(
+            event.get("is_current") and not event.get("finished")
+            for event in events
+        )
+
+
+    def ttl_for(
+        self, key: str, now: Optional[float] = None
+    ) -> Optional[float]:
+        """Return the TTL (seconds) for the given endpoint key.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            now {Optional[float]} -- The current epoch time (default now).
+
+        Returns:
+            Optional[float] -- The TTL, or None if the data is immutable.
+        """
+        match = _PICKS_RE.match(key) or _EVENT_MATCHES_RE.match(key)
+        if match and int(match.group("event")) in self.finished_events:
+            return None
+
+        if not self.deadlines:
+            return self.default_ttl
+        if self.live:
+            return self.live_ttl
+
+        now = time.time() if now is None else now
+        upcoming = [deadline for deadline in self.deadlines if deadline > now]
+        if not upcoming:
+            # The season is over - nothing changes until the next one.
+            return self.default_ttl
+        return max(1.0, min(upcoming[0] - now, self.default_ttl))
+
+
+class ResponseCache:
+    """Class representing an on-disk, size-bounded LRU cache of JSON responses.
+
+    Each key (an endpoint path) is stored as a gzip-compressed JSON body with a
+    small metadata sidecar holding its expiry time and HTTP validators (ETag,
+    Last-Modified). The files are the source of truth, so several processes
+    can share one cache directory. Recently used parsed objects are also kept
+    in memory - even once stale - so a 304 revalidation avoids re-parsing.
+    """
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        policy: Optional[TTLPolicy] = None,
+        memory_items: int = DEFAULT_MEMORY_ITEMS,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            directory {Optional[str]}
+                -- The cache directory (default to default_directory()).
+            max_bytes {int}
+                -- The maximum total size of the compressed bodies on disk.
+            policy {Optional[TTLPolicy]}
+                -- The TTL policy used when put() is not given a TTL.
+            memory_items {int}
+                -- The number of parsed objects to keep in memory.
+        """
+        self.directory: str = directory or default_directory()
+        self.max_bytes: int = max_bytes
+        self.policy: TTLPolicy = policy or TTLPolicy()
+        self.memory_items: int = memory_items
+        self.stats: CacheStats = CacheStats()
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, Tuple[Any, Optional[float]]]" = \
+            OrderedDict()
+        self._total_bytes: Optional[int] = None
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(directory={self.directory!r}, "
+            f"max_bytes={self.max_bytes!r}, stats={self.stats!r})"
+        )
+
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        """Return the (body, metadata) file paths for the given key."""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + ".json.gz", base + ".meta.json"
+
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """Write the file via a temporary file so readers never see a partial
+        write.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        """Return the metadata for the given key, or None if not cached."""
+        _, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("key") == key else None
+
+
+    def _remember(self, key: str, obj: Any, expires: Optional[float]) -> None:
+        """Add the parsed object to the in-memory LRU."""
+        with self._lock:
+            self._memory[key] = (obj, expires)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached JSON object for the key, if present and fresh.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+
+        Returns:
+            Optional[Any] -- The cached object, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                obj, expires = cached
+                if expires is None or expires > now:
+                    self._memory.move_to_end(key)
+                    self.stats.incr("hits")
+                    return obj
+
+        meta = self._read_meta(key)
+        if meta is None:
+            self.stats.incr("misses")
+            return None
+        if meta["expires"] is not None and meta["expires"] <= now:
+            self.stats.incr("stale")
+            self.stats.incr("misses")
+            return None
+
+        obj = self._load(key, meta)
+        if obj is None:
+            self.stats.incr("misses")
+            return None
+
+        self.stats.incr("hits")
+        return obj
+
+
+    def _load(self, key: str, meta: dict) -> Optional[Any]:
+        """Return the stored object for the key, preferring the memory tier.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            meta {dict} -- The key's metadata read from disk.
+        """
+        body_path, _ = self._paths(key)
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is not None and cached[1] == meta["expires"]:
+            obj = cached[0]
+        else:
+            try:
+                with gzip.open(body_path, "rb") as body_file:
+                    obj = decode.loads(body_file.read())
+            except (OSError, ValueError):
+                return None
+
+        try:
+            # Bump the modification time - it's the LRU eviction order.
+            os.utime(body_path)
+        except OSError:
+            pass
+        self._remember(key, obj, meta["expires"])
+        return obj
+
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Return the stored HTTP validators for the key (fresh or stale).
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+
+        Returns:
+            Dict[str, str] -- The "etag" and/or "last_modified" values, empty
+                              if the key isn't cached or had no validators.
+        """
+        meta = self._read_meta(key)
+        if meta is None:
+            return {}
+        return {
+            name: meta[name] for name in ("etag", "last_modified")
+            if meta.get(name)
+        }
+
+
+    def revalidate(
+        self, key: str, ttl: Optional[float] = USE_POLICY
+    ) -> Optional[Any]:
+        """Mark a stale entry as fresh again after a 304 Not Modified.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            ttl {Optional[float]} -- The new TTL (seconds), or None if the
+                                     data is immutable. Defaults to the
+                                     policy's TTL.
+
+        Returns:
+            Optional[Any] -- The stored object, or None if it has gone (e.g.
+                             evicted), in which case the caller must re-fetch
+                             unconditionally.
+        """
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        obj = self._load(key, meta)
+        if obj is None:
+            return None
+
+        if ttl == USE_POLICY:
+            if not self.policy.deadlines:
+                self.load_policy()
+            ttl = self.policy.ttl_for(key)
+        meta["expires"] = None if ttl is None else time.time() + ttl
+
+        _, meta_path = self._paths(key)
+        with self._lock:
+            self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            self._remember(key, obj, meta["expires"])
+        self.stats.incr("not_modified")
+        self.stats.incr("bytes_saved", meta.get("raw_size", 0))
+        return obj
+
+
+    def load_policy(self) -> bool:
+        """Update the TTL policy from the stored bootstrap, even if stale,
+        so that a process which hasn't fetched bootstrap yet (e.g. a bulk
+        loader started cold) still caches finished events as immutable.
+
+        Returns:
+            bool -- Whether a stored bootstrap was found.
+        """
+        meta = self._read_meta(BOOTSTRAP_KEY)
+        bootstrap = self._load(BOOTSTRAP_KEY, meta) if meta else None
+        if not isinstance(bootstrap, dict) or "events" not in bootstrap:
+            return False
+        self.policy.update(bootstrap["events"])
+        return True
+
+
+    def put(
+        self,
+        key: str,
+        obj: Any,
+        ttl: Optional[float] = USE_POLICY,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        raw_size: Optional[int] = None,
+    ) -> None:
+        """Store the JSON object under the key.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            obj {Any} -- The JSON object to store.
+            ttl {Optional[float]} -- The TTL (seconds), or None if the data is
+                                     immutable. Defaults to the policy's TTL.
+            validators {Optional[Dict[str, Optional[str]]]}
+                -- The response's "etag" and "last_modified" header values.
+            raw_size {Optional[int]}
+                -- The size of the response body as downloaded, counted as
+                   bytes saved by each later 304 (default to the size of the
+                   re-encoded JSON).
+        """
+        if ttl == USE_POLICY:
+            if not self.policy.deadlines:
+                self.load_policy()
+            ttl = self.policy.ttl_for(key)
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+
+        raw = decode.dumps(obj)
+        body = gzip.compress(raw, compresslevel=6)
+        meta = {"key": key, "stored": now, "expires": expires,
+                "size": len(body),
+                "raw_size": len(raw) if raw_size is None else raw_size}
+        for name, value in (validators or {}).items():
+            if value:
+                meta[name] = value
+
+        body_path, meta_path = self._paths(key)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            old_size = os.path.getsize(body_path) \
+                if os.path.exists(body_path) else 0
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            self._remember(key, obj, expires)
+            self.stats.incr("puts")
+
+            if self._total_bytes is not None:
+                self._total_bytes += len(body) - old_size
+            self._evict()
+
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """Return (mtime, size, body path) for every body on disk."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".json.gz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+
+    def _evict(self) -> None:
+        """Delete least recently used bodies until under max_bytes."""
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # Re-scan: other processes may have added or touched entries.
+        entries = sorted(self._entries())
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for _, size, body_path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            meta_path = body_path[:-len(".json.gz")] + ".meta.json"
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes -= size
+            self.stats.incr("evictions")
+
+        # The evicted keys aren't known here, so drop the memory tier.
+        self._memory.clear()
+
+
+    def invalidate(self, immutable: bool = False) -> int:
+        """Expire cached entries so they are re-downloaded on next use.
+
+        Arguments:
+            immutable {bool} -- Also drop entries which never expire (e.g.
+                                picks for finished gameweeks).
+
+        Returns:
+            int -- The number of entries removed.
+        """
+        removed = 0
+        with self._lock:
+            self._memory.clear()
+            for _, _, body_path in self._entries():
+                meta_path = body_path[:-len(".json.gz")] + ".meta.json"
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as meta_file:
+                        meta = json.load(meta_file)
+                except (OSError, ValueError):
+                    meta = {"expires": 0}
+                if meta.get("expires") is None and not immutable:
+                    continue
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                removed += 1
+            self._total_bytes = None
+        return removed
@@ -0,0 +1,316 @@
+"""Dense element-by-Gameweek statistics.
+
+ElementCube holds every element's per-Gameweek history as one NumPy array
+of shape (element, event, stat), with cumulative sums alongside so that any
+window aggregate (form, points per match, ...) is two array lookups.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import process
+
+__all__ = (
+    "STATS",
+    "SCALES",
+    "ElementCube",
+)
+
+# Stats held in the cube, in stat-axis order (see schema.ELEMENT_HISTORY).
+STATS = (
+    "total_points",
+    "minutes",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "goals_conceded",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bonus",
+    "bps",
+    "influence",
+    "creativity",
+    "threat",
+    "ict_index",
+    "value",
+    "fixtures",
+)
+
+# Decimal stats are stored as int16 multiples of 1 / scale.
+SCALES = {
+    "influence": 10,
+    "creativity": 10,
+    "threat": 10,
+    "ict_index": 10,
+}
+
+# Stats which aren't summed over a double Gameweek's fixtures.
+_MAX_STATS = ("value",)
+
+
+def _check_window(window: int) -> None:
+    """Raise ValueError unless the window covers at least one event."""
+    if window < 1:
+        raise ValueError(f"window must be at least 1, not {window}")
+
+
+class ElementCube:
+    """Class representing per-Gameweek element stats as a dense array.
+
+    Event IDs index the event axis directly; column 0 is all zeros, so
+    cumulative sums need no offset. Rows are looked up by Element ID through
+    a dense id-to-row array.
+    """
+    def __init__(self, element_ids: np.ndarray, values: np.ndarray) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            element_ids {np.ndarray} -- The Element ID of each row, sorted.
+            values {np.ndarray} -- int16 stats of shape
+                                   (element, event + 1, stat).
+        """
+        self.element_ids: np.ndarray = np.asarray(element_ids, dtype=np.int16)
+        self.values: np.ndarray = values
+        self.stat_index: Dict[str, int] = {
+            stat: k for k, stat in enumerate(STATS)
+        }
+
+        max_id = int(self.element_ids.max(initial=0))
+        self.rows: np.ndarray = np.full(max_id + 1, -1, dtype=np.int16)
+        self.rows[self.element_ids] = np.arange(
+            len(self.element_ids), dtype=np.int16
+        )
+
+        # Cumulative sums over events, with cumsum[:, 0] == 0.
+        self.cumsum: np.ndarray = np.cumsum(values, axis=1, dtype=np.int32)
+        minutes = values[:, :, self.stat_index["minutes"]]
+        self.played_cumsum: np.ndarray = np.cumsum(
+            minutes > 0, axis=1, dtype=np.int16
+        )
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(elements={len(self.element_ids)}, "
+            f"events={self.n_events}, nbytes={self.nbytes})"
+        )
+
+
+    @property
+    def n_events(self) -> int:
+        """Return the last event included."""
+        return self.values.shape[1] - 1
+
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the cube's arrays."""
+        return (
+            self.values.nbytes
+            + self.cumsum.nbytes
+            + self.played_cumsum.nbytes
+            + self.rows.nbytes
+        )
+
+
+    def row(self, element_id: int) -> int:
+        """Return the row of the given element.
+
+        Arguments:
+            element_id {int} -- The Element ID.
+
+        Raises:
+            KeyError -- If the element isn't in the cube.
+        """
+        if 0 <= element_id < len(self.rows) and self.rows[element_id] >= 0:
+            return int(self.rows[element_id])
+        raise KeyError(element_id)
+
+
+    def get(self, element_id: int, event: int, stat: str) -> Union[int, float]:
+        """Return one element's stat in one event, unscaled.
+
+        Arguments:
+            element_id {int} -- The Element ID.
+            event {int} -- The Event ID.
+            stat {str} -- One of STATS.
+        """
+        value = self.values[self.row(element_id), event, self.stat_index[stat]]
+        scale = SCALES.get(stat)
+        return int(value) if scale is None else value / scale
+
+
+    def stat(self, stat: str) -> np.ndarray:
+        """Return a view of one stat for every (element, event), scaled as
+        stored.
+
+        Arguments:
+            stat {str} -- One of STATS.
+        """
+        return self.values[:, :, self.stat_index[stat]]
+
+
+    def window_sum(self, stat: str, event: int, window: int) -> np.ndarray:
+        """Return every element's stat summed over the `window` events up to
+        and including `event`, scaled as stored.
+
+        Arguments:
+            stat {str} -- One of STATS.
+            event {int} -- The last Event ID in the window.
+            window {int} -- The number of events.
+        """
+        _check_window(window)
+        cumsum = self.cumsum[:, :, self.stat_index[stat]]
+        return cumsum[:, event] - cumsum[:, max(event - window, 0)]
+
+
+    def appearances(self, event: int, window: int) -> np.ndarray:
+        """Return every element's number of events with minutes in the
+        `window` events up to and including `event`.
+
+        Arguments:
+            event {int} -- The last Event ID in the window.
+            window {int} -- The number of events.
+        """
+        _check_window(window)
+        played = self.played_cumsum
+        return played[:, event] - played[:, max(event - window, 0)]
+
+
+    def points_per_match(
+        self, event: int, window: Optional[int] = None
+    ) -> np.ndarray:
+        """Return every element's points per appearance over the `window`
+        events up to `event` (the season so far by default). Elements
+        without an appearance get 0.
+
+        Arguments:
+            event {int} -- The last Event ID in the window.
+            window {Optional[int]} -- The number of events (None or 0 for
+                                      the season so far).
+        """
+        window = window or event
+        points = self.window_sum("total_points", event, window)
+        played = self.appearances(event, window)
+        return np.divide(
+            points,
+            played,
+            out=np.zeros(len(points), dtype=np.float32),
+            where=played > 0,
+        )
+
+
+    def form(self, event: int, window: int = 4) -> np.ndarray:
+        """Return every element's mean points per event over the last
+        `window` events up to `event`, like the API's `form`.
+
+        Arguments:
+            event {int} -- The last Event ID in the window.
+            window {int} -- The number of events.
+        """
+        _check_window(window)
+        window = min(window, event)
+        points = self.window_sum("total_points", event, window)
+        return (points / max(window, 1)).astype(np.float32)
+
+
+    def rolling(self, stat: str, window: int) -> np.ndarray:
+        """Return the (element, event) array of `stat` summed over the last
+        `window` events at each event, scaled as stored.
+
+        Arguments:
+            stat {str} -- One of STATS.
+            window {int} -- The number of events.
+        """
+        _check_window(window)
+        cumsum = self.cumsum[:, :, self.stat_index[stat]]
+        lagged = np.zeros_like(cumsum)
+        lagged[:, window:] = cumsum[:, :-window]
+        return cumsum - lagged
+
+
+    def frame(
+        self, event: int, stats: Sequence[str] = STATS
+    ) -> pd.DataFrame:
+        """Return one event's stats for every element as a DataFrame indexed
+        by element, unscaled.
+
+        Arguments:
+            event {int} -- The Event ID.
+            stats {Sequence[str]} -- The stats to include.
+        """
+        df = pd.DataFrame(
+            {
+                stat: self.values[:, event, self.stat_index[stat]]
+                for stat in stats
+            },
+            index=pd.Index(self.element_ids, name="element"),
+        )
+        for stat in stats:
+            if stat in SCALES:
+                df[stat] = (df[stat] / SCALES[stat]).astype(np.float32)
+        return df
+
+
+    @classmethod
+    def from_history_df(
+        cls,
+        element_history_df: pd.DataFrame,
+        n_events: Optional[int] = None,
+    ) -> "ElementCube":
+        """Create an ElementCube from per-fixture element history.
+
+        Double Gameweeks are summed (except `value`, which takes the
+        maximum), and `fixtures` counts the fixtures played per event.
+
+        Arguments:
+            element_history_df {pd.DataFrame}
+                -- Per-fixture element history (schema.ELEMENT_HISTORY).
+            n_events {Optional[int]} -- The number of events (default: the
+                                        last event in the history).
+        """
+        element_ids, rows = np.unique(
+            element_history_df["element"].to_numpy(np.int64),
+            return_inverse=True,
+        )
+        events = element_history_df["event"].to_numpy(np.int64)
+        if n_events is None:
+            n_events = int(events.max(initial=0))
+
+        values = np.zeros(
+            (len(element_ids), n_events + 1, len(STATS)), dtype=np.int16
+        )
+        for k, stat in enumerate(STATS):
+            if stat == "fixtures":
+                column = np.ones(len(events), dtype=np.int16)
+            else:
+                column = element_history_df[stat].to_numpy()
+                column = np.rint(column * SCALES.get(stat, 1)).astype(np.int16)
+            if stat in _MAX_STATS:
+                np.maximum.at(values[:, :, k], (rows, events), column)
+            else:
+                np.add.at(values[:, :, k], (rows, events), column)
+
+        return cls(element_ids, values)
+
+
+    @classmethod
+    def from_json(
+        cls, summaries: Iterable[Dict], n_events: Optional[int] = None
+    ) -> "ElementCube":
+        """Create an ElementCube from element summaries.
+
+        Arguments:
+            summaries {Iterable[dict]} -- get_element_json objects, e.g. the
+                                          values of get_elements_json.
+            n_events {Optional[int]} -- See from_history_df().
+        """
+        return cls.from_history_df(
+            process.element_history_df_from_json(summaries), n_events
+        )
@@ -1,7 +1,11 @@
-import fetch
+import breakdown
+import decode
+import ownership
 import process
+import standings
+import numpy as np
 import pandas as pd
-from typing import Callable
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import error
 
@@ -67,95 +71,722 @@ class H2HLeague:
 
 
     @classmethod
-    def create(cls, get_func: Callable[[None], dict]) -> "H2HLeague":
+    def _standings_chunk(cls, page: dict) -> pd.DataFrame:
+        """Return the standings DataFrame for one page of JSON data."""
+        results = page["standings"]["results"]
+        if not results:
+            return pd.DataFrame(columns=cls.INTERNAL)
+        return pd.DataFrame.from_records(results, columns=cls.INTERNAL)
+
+
+    @classmethod
+    def create(
+        cls, get_func: Callable[[], Union[dict, Iterable[dict]]]
+    ) -> "H2HLeague":
         """Create a League instance.
 
         Arguments:
-            get_func {Callable[None, dict]}
+            get_func {Callable[[], Union[dict, Iterable[dict]]]}
                 -- The function to call to get the raw JSON data from the FPL
-                   API.
+                   API: either a single standings page, or an iterable of
+                   pages (e.g. fetch.iter_league_pages), which is consumed
+                   one page at a time.
         """
-        # TODO: Better error handling here - what happens when:
-        #  - the 'get' function raises an exception?
-        #  - the JSON structure isn't as expected (e.g. field names changed)?
+        # Errors from the getter (e.g. error.FetchError on a later page)
+        # propagate as they are; only a malformed page is a JSONError.
         json_data = get_func()
+        pages = [json_data] if isinstance(json_data, dict) else json_data
+
+        league_fields = None
+        chunks = []
+        # Only each page's standings columns are kept, and the pages
+        # themselves are dropped as they're read; the table is joined once
+        # at the end.
+        for page in pages:
+            try:
+                if league_fields is None:
+                    league = page["league"]
+                    league_fields = (
+                        league["id"], league["name"], league["start_event"]
+                    )
+                chunks.append(cls._standings_chunk(page))
+            except (KeyError, TypeError) as exc:
+                msg = f"Error in structure of downloaded JSON: {exc}"
+                raise error.JSONError(msg) from exc
+        if league_fields is None:
+            raise error.JSONError("No standings pages were downloaded")
+
+        return cls(*league_fields, pd.concat(chunks, ignore_index=True))
+
+
+class LeagueHistory:
+    """Class representing an H2H league's per-Gameweek tables.
+
+    The tables only ever grow by whole Gameweeks: update() fetches the newly
+    finished events' matches and picks and applies them as a delta, so a
+    refresh costs one Gameweek rather than the season so far.
+    """
+
+    # Running per-entry aggregates kept by update(); means are derived.
+    STATS = {
+        "events_played": "int16",
+        "points_sum": "int32",
+        "points_max": "int16",
+        "points_on_bench_sum": "int32",
+        "transfers_cost_sum": "int32",
+    }
+
+    def __init__(
+        self,
+        id: int,
+        matches_df: pd.DataFrame,
+        standings_df: pd.DataFrame,
+        picks_df: pd.DataFrame,
+        entry_history_df: pd.DataFrame,
+        automatic_subs_df: pd.DataFrame,
+        entry_stats_df: pd.DataFrame,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            id {int} -- The H2H League ID.
+            matches_df {pd.DataFrame}
+                -- The league's matches in the included events.
+            standings_df {pd.DataFrame}
+                -- The standings as of each event (see
+                   standings.compute_standings).
+            picks_df {pd.DataFrame}
+                -- Every entry's picks in each event (schema.PICKS).
+            entry_history_df {pd.DataFrame}
+                -- Every entry's history in each event
+                   (schema.ENTRY_HISTORY).
+            automatic_subs_df {pd.DataFrame}
+                -- Every entry's automatic substitutions in each event
+                   (schema.AUTOMATIC_SUBS).
+            entry_stats_df {pd.DataFrame}
+                -- Running per-entry aggregates (STATS), indexed by entry.
+        """
+        self.id: int = id
+        self.matches_df: pd.DataFrame = matches_df
+        self.standings_df: pd.DataFrame = standings_df
+        self.picks_df: pd.DataFrame = picks_df
+        self.entry_history_df: pd.DataFrame = entry_history_df
+        self.automatic_subs_df: pd.DataFrame = automatic_subs_df
+        self.entry_stats_df: pd.DataFrame = entry_stats_df
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return f"{classname}(id={self.id!r}, events={self.events!r})"
+
+
+    @property
+    def events(self) -> List[int]:
+        """Return the events included so far, in order."""
+        return sorted(self.standings_df["event"].unique().tolist())
+
+
+    @property
+    def stats_df(self) -> pd.DataFrame:
+        """Return the per-entry season statistics, with derived means."""
+        df = self.entry_stats_df.copy()
+        played = df["events_played"].replace(0, np.nan)
+        df["points_mean"] = df["points_sum"] / played
+        df["points_on_bench_mean"] = df["points_on_bench_sum"] / played
+        return df
+
+
+    @classmethod
+    def empty(cls, id: int) -> "LeagueHistory":
+        """Create a LeagueHistory with no events.
+
+        Arguments:
+            id {int} -- The H2H League ID.
+        """
+        picks_df, entry_history_df, automatic_subs_df = \
+            process.picks_dfs_from_json({})
+        entry_stats_df = process.typed_df_from_columns(
+            {field: [] for field in cls.STATS}, cls.STATS
+        )
+        entry_stats_df.index = pd.Index([], dtype="int32", name="entry")
+        return cls(
+            id,
+            standings.matches_df_from_json([]),
+            standings.compute_standings(standings.matches_df_from_json([])),
+            picks_df,
+            entry_history_df,
+            automatic_subs_df,
+            entry_stats_df,
+        )
+
+
+    @classmethod
+    def create(
+        cls,
+        id: int,
+        events: Iterable[int],
+        get_matches_func: Callable[[int], Iterable[dict]],
+        get_picks_func: Callable[[Iterable[int], Iterable[int]], Dict],
+    ) -> "LeagueHistory":
+        """Create a LeagueHistory covering the given events.
+
+        Arguments:
+            id {int} -- The H2H League ID.
+            events {Iterable[int]} -- The finished events to include.
+            get_matches_func {Callable[[int], Iterable[dict]]}
+                -- Returns the pages of the league's matches in one event,
+                   e.g. functools.partial(fetch.iter_league_matches_pages, id)
+                   called with event_id.
+            get_picks_func {Callable[[Iterable[int], Iterable[int]], Dict]}
+                -- Returns picks JSON keyed by (entry, event) for the given
+                   entries and events, e.g. fetch.get_picks_json.
+        """
+        league = cls.empty(id)
+        league.update(events, get_matches_func, get_picks_func)
+        return league
 
+
+    def update(
+        self,
+        events: Iterable[int],
+        get_matches_func: Callable[[int], Iterable[dict]],
+        get_picks_func: Callable[[Iterable[int], Iterable[int]], Dict],
+    ) -> List[int]:
+        """Apply any finished events not yet included.
+
+        Only the new events' matches and picks are fetched. Events must be
+        applied in order, so new events before the last included event are
+        ignored.
+
+        Arguments:
+            events {Iterable[int]} -- The finished events.
+            get_matches_func -- See create().
+            get_picks_func -- See create().
+
+        Returns:
+            List[int] -- The events applied.
+        """
+        included = self.events
+        last = included[-1] if included else 0
+        new_events = sorted(event for event in set(events) if event > last)
+        if not new_events:
+            return []
+
+        delta_df = pd.concat(
+            [
+                standings.matches_df_from_pages(get_matches_func(event))
+                for event in new_events
+            ],
+            ignore_index=True,
+        )
+        delta_df = delta_df[delta_df["event"].isin(new_events)]
+        entries = pd.unique(
+            delta_df[["entry_1_entry", "entry_2_entry"]].stack().dropna()
+        ).astype(int).tolist()
         try:
-            standings_df = pd.DataFrame(json_data["standings"]["results"])
-            standings_df = standings_df[cls.INTERNAL]
-        except Exception as exc:
+            picks_df, history_df, subs_df = process.picks_dfs_from_json(
+                get_picks_func(entries, new_events)
+            )
+        except KeyError as exc:
             msg = f"Error in structure of downloaded JSON: {exc}"
             raise error.JSONError(msg) from exc
 
-        return cls(
-            json_data["league"]["id"],
-            json_data["league"]["name"],
-            json_data["league"]["start_event"],
-            standings_df,
+        self.matches_df = pd.concat(
+            [self.matches_df, delta_df], ignore_index=True
+        )
+        self.standings_df = standings.append_standings(
+            self.standings_df, delta_df
+        )
+        self.picks_df = pd.concat([self.picks_df, picks_df], ignore_index=True)
+        self.entry_history_df = pd.concat(
+            [self.entry_history_df, history_df], ignore_index=True
+        )
+        self.automatic_subs_df = pd.concat(
+            [self.automatic_subs_df, subs_df], ignore_index=True
         )
+        self._update_stats(history_df)
+        return new_events
 
 
-class Bootstrap:
-    """Class representing the bootstrap data.
+    @property
+    def element_ids(self) -> List[int]:
+        """Return every element picked by any entry, e.g. for
+        fetch.get_elements_json."""
+        return sorted(self.picks_df["element"].unique().tolist())
+
+
+    def points_breakdown(
+        self, element_history_df: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Break every entry's points down by player in each included event.
+
+        See breakdown.compute_breakdown.
+
+        Arguments:
+            element_history_df {pd.DataFrame}
+                -- History of (at least) the picked elements, e.g.
+                   process.element_history_df_from_json applied to
+                   fetch.get_elements_json(self.element_ids).
+        """
+        return breakdown.compute_breakdown(
+            self.picks_df,
+            element_history_df,
+            self.entry_history_df,
+            self.automatic_subs_df,
+        )
+
+
+    def _update_stats(self, history_df: pd.DataFrame) -> None:
+        """Fold new entry history rows into the running aggregates."""
+        delta = history_df.groupby("entry").agg(
+            events_played=("event", "size"),
+            points_sum=("points", "sum"),
+            points_max=("points", "max"),
+            points_on_bench_sum=("points_on_bench", "sum"),
+            transfers_cost_sum=("event_transfers_cost", "sum"),
+        )
+        index = self.entry_stats_df.index.union(delta.index)
+        old = self.entry_stats_df.reindex(index, fill_value=0)
+        delta = delta.reindex(index, fill_value=0)
+
+        stats = old + delta
+        stats["points_max"] = np.maximum(
+            old["points_max"], delta["points_max"]
+        )
+        self.entry_stats_df = stats.astype(self.STATS)
+
+
+class LeagueSeason:
+    """Class representing every league member's season so far, from one
+    entry history request per member.
+    """
+
+    # Per-event fields shown by points_df and friends.
+    FIELDS = (
+        "points",
+        "total_points",
+        "rank",
+        "overall_rank",
+        "bank",
+        "value",
+        "event_transfers",
+        "event_transfers_cost",
+        "points_on_bench",
+    )
+
+    def __init__(self, id: int, entry_history_df: pd.DataFrame) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            id {int} -- The League ID.
+            entry_history_df {pd.DataFrame}
+                -- One row per (entry, event) (schema.ENTRY_HISTORY).
+        """
+        self.id: int = id
+        self.entry_history_df: pd.DataFrame = entry_history_df
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        entries = self.entry_history_df["entry"].nunique()
+        return f"{classname}(id={self.id!r}, entries={entries})"
+
+
+    def pivot(self, field: str) -> pd.DataFrame:
+        """Return one field as an entry x event DataFrame.
+
+        Arguments:
+            field {str} -- One of FIELDS.
+        """
+        return self.entry_history_df.pivot(
+            index="entry", columns="event", values=field
+        )
+
+
+    @property
+    def points_df(self) -> pd.DataFrame:
+        """Return each entry's points per event (entry x event)."""
+        return self.pivot("points")
+
+
+    @classmethod
+    def create(
+        cls,
+        get_league_func: Callable[[], Union[dict, Iterable[dict]]],
+        get_histories_func: Callable[[Iterable[int]], Dict[int, dict]],
+    ) -> "LeagueSeason":
+        """Create a LeagueSeason for every member of a league.
+
+        Arguments:
+            get_league_func {Callable[[], Union[dict, Iterable[dict]]]}
+                -- Returns the league's standings pages, as for
+                   H2HLeague.create.
+            get_histories_func
+                {Callable[[Iterable[int]], Dict[int, dict]]}
+                -- Returns entry history JSON keyed by entry, e.g.
+                   fetch.get_entry_histories_json.
+        """
+        league = H2HLeague.create(get_league_func)
+        entries = league.standings_df["entry"].astype(int).tolist()
+        try:
+            entry_history_df = process.entry_history_df_from_json(
+                get_histories_func(entries)
+            )
+        except KeyError as exc:
+            msg = f"Error in structure of downloaded JSON: {exc}"
+            raise error.JSONError(msg) from exc
+        return cls(league.id, entry_history_df)
+
+
+class LeagueOwnership:
+    """Class representing who owns whom across a league's entries.
+
+    Picks are held as sparse (entry, element) matrices per event, and each
+    event's pairwise overlaps are computed on first use (see ownership.py).
     """
     def __init__(
         self,
-        elements_df: pd.DataFrame,
-        events_df: pd.DataFrame,
-        phases_df: pd.DataFrame,
-        pl_teams_df: pd.DataFrame,
-        element_types_df: pd.DataFrame,
+        id: int,
+        entries: np.ndarray,
+        elements: np.ndarray,
+        matrices: Dict[int, ownership.EventMatrices],
     ) -> None:
         """Class constructor.
 
         Keyword Arguments:
-            elements_df {pd.DataFrame}
-                -- The Pandas DataFrame for the elements (players).
-            events_df {pd.DataFrame}
-                -- The Pandas DataFrame for the events (Gameweeks).
-            phases_df {pd.DataFrame}
-                -- The Pandas DataFrame for the phases (months).
-            pl_teams_df {pd.DataFrame}
-                -- The Pandas DataFrame for the PL teams.
-            element_types_df {pd.DataFrame}
-                -- The Pandas DataFrame for the element (player) types.
-        """
-        self.elements_df: pd.DataFrame = elements_df
-        self.events_df: pd.DataFrame = events_df
-        self.phases_df: pd.DataFrame = phases_df
-        self.pl_teams_df: pd.DataFrame = pl_teams_df
-        self.element_types_df: pd.DataFrame = element_types_df
+            id {int} -- The League ID.
+            entries {np.ndarray} -- The Entry IDs, in matrix row order.
+            elements {np.ndarray} -- The Element IDs, in matrix column order.
+            matrices {Dict[int, ownership.EventMatrices]}
+                -- Each event's picks.
+        """
+        self.id: int = id
+        self.entries: np.ndarray = entries
+        self.elements: np.ndarray = elements
+        self.matrices: Dict[int, ownership.EventMatrices] = matrices
+        self._overlaps: Dict[int, ownership.Overlaps] = {}
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(id={self.id!r}, entries={len(self.entries)}, "
+            f"events={self.events!r})"
+        )
+
+
+    @property
+    def events(self) -> List[int]:
+        """Return the events included, in order."""
+        return sorted(self.matrices)
+
+
+    def overlaps(self, event: int) -> ownership.Overlaps:
+        """Return every pair of entries' overlaps in the given event.
+
+        Arguments:
+            event {int} -- The Event ID.
+        """
+        if event not in self._overlaps:
+            self._overlaps[event] = ownership.overlaps(self.matrices[event])
+        return self._overlaps[event]
+
+
+    def overlap_df(self, event: int, field: str = "shared") -> pd.DataFrame:
+        """Return one overlap as an entry x entry DataFrame.
+
+        Arguments:
+            event {int} -- The Event ID.
+            field {str} -- One of ownership.Overlaps._fields.
+        """
+        index = pd.Index(self.entries, name="entry")
+        return pd.DataFrame(
+            getattr(self.overlaps(event), field), index=index, columns=index
+        )
+
+
+    def ownership_df(self, event: int) -> pd.DataFrame:
+        """Return the fraction of entries owning, starting and captaining
+        each element in the given event.
+
+        Arguments:
+            event {int} -- The Event ID.
+        """
+        matrices = self.matrices[event]
+        n_entries = max(len(self.entries), 1)
+        df = pd.DataFrame(
+            {
+                name: np.asarray(matrix.sum(axis=0)).ravel() / n_entries
+                for name, matrix in zip(
+                    ("owned", "started", "captained"), matrices
+                )
+            },
+            index=pd.Index(self.elements, name="element"),
+        )
+        return df[df["owned"] > 0].sort_values("owned", ascending=False)
+
+
+    def matchups_df(
+        self, matches_df: pd.DataFrame, event: int
+    ) -> pd.DataFrame:
+        """Return the overlaps of each H2H match in the given event.
+
+        Arguments:
+            matches_df {pd.DataFrame} -- The league's matches
+                                         (standings.MATCHES).
+            event {int} -- The Event ID.
+        """
+        overlaps = self.overlaps(event)
+        df = matches_df.loc[
+            (matches_df["event"] == event)
+            & matches_df["entry_2_entry"].notna(),
+            ["entry_1_entry", "entry_1_name", "entry_2_entry", "entry_2_name"],
+        ].reset_index(drop=True)
+        rows_1 = np.searchsorted(self.entries, df["entry_1_entry"].to_numpy())
+        rows_2 = np.searchsorted(self.entries, df["entry_2_entry"].to_numpy())
+
+        df["shared"] = overlaps.shared[rows_1, rows_2]
+        df["shared_starting"] = overlaps.shared_starting[rows_1, rows_2]
+        df["entry_1_differentials"] = overlaps.differentials[rows_1, rows_2]
+        df["entry_2_differentials"] = overlaps.differentials[rows_2, rows_1]
+        df["same_captain"] = overlaps.same_captain[rows_1, rows_2]
+        return df
+
+
+    @classmethod
+    def from_picks(cls, id: int, picks_df: pd.DataFrame) -> "LeagueOwnership":
+        """Create a LeagueOwnership from picks.
+
+        Arguments:
+            id {int} -- The League ID.
+            picks_df {pd.DataFrame} -- Every entry's picks in each event
+                                       (schema.PICKS), e.g.
+                                       LeagueHistory.picks_df.
+        """
+        entries = np.unique(picks_df["entry"].to_numpy())
+        elements = np.unique(picks_df["element"].to_numpy())
+        return cls(
+            id,
+            entries,
+            elements,
+            ownership.event_matrices(picks_df, entries, elements),
+        )
+
+
+class Bootstrap:
+    """Class representing the bootstrap data.
+
+    Each table is built from the raw JSON on first access, with compact
+    explicit dtypes, so unused tables cost nothing.
+    """
+
+    # Bootstrap JSON key for each table property.
+    TABLES = {
+        "elements_df": "elements",
+        "events_df": "events",
+        "phases_df": "phases",
+        "pl_teams_df": "teams",
+        "element_types_df": "element_types",
+    }
+
+    ELEMENTS = {
+        "id": "int16",
+        "web_name": "object",
+        "first_name": "object",
+        "second_name": "object",
+        "element_type": "category",
+        "team": "category",
+        "team_code": "int16",
+        "now_cost": "int16",
+        "cost_change_start": "int16",
+        "cost_change_event": "int16",
+        "total_points": "int16",
+        "event_points": "int16",
+        "form": "float32",
+        "points_per_game": "float32",
+        "selected_by_percent": "float32",
+        "value_form": "float32",
+        "value_season": "float32",
+        "dreamteam_count": "int16",
+        "in_dreamteam": "bool",
+        "transfers_in_event": "int32",
+        "transfers_out_event": "int32",
+        "minutes": "int16",
+        "goals_scored": "int16",
+        "assists": "int16",
+        "clean_sheets": "int16",
+        "goals_conceded": "int16",
+        "own_goals": "int16",
+        "penalties_saved": "int16",
+        "penalties_missed": "int16",
+        "yellow_cards": "int16",
+        "red_cards": "int16",
+        "saves": "int16",
+        "bonus": "int16",
+        "bps": "int16",
+    }
+
+    EVENTS = {
+        "id": "int16",
+        "name": "object",
+        "deadline_time": "datetime",
+        "average_entry_score": "int16",
+        "finished": "bool",
+        "data_checked": "bool",
+        "is_previous": "bool",
+        "is_current": "bool",
+        "is_next": "bool",
+        # Null until the event has been played.
+        "highest_scoring_entry": "Int32",
+        "highest_score": "Int16",
+        "most_selected": "Int16",
+        "most_transferred_in": "Int16",
+        "top_element": "Int16",
+        "transfers_made": "int32",
+        "most_captained": "Int16",
+        "most_vice_captained": "Int16",
+    }
+
+    PHASES = {
+        "id": "int16",
+        "name": "object",
+        "start_event": "int16",
+        "stop_event": "int16",
+    }
+
+    PL_TEAMS = {
+        "id": "int16",
+        "code": "int16",
+        "name": "object",
+        "short_name": "object",
+    }
+
+    ELEMENT_TYPES = {
+        "id": "int16",
+        "plural_name": "object",
+        "plural_name_short": "object",
+        "singular_name": "object",
+        "singular_name_short": "object",
+    }
+
+    def __init__(self, json_data: Union[dict, bytes]) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            json_data {Union[dict, bytes]}
+                -- The bootstrap JSON data from the FPL API, decoded or as
+                   the raw document. Tables of a raw document are decoded
+                   straight into columns (see decode.decode_columns).
+        """
+        self._document: Union[dict, bytes] = json_data
+        self._json_data: Optional[dict] = \
+            json_data if isinstance(json_data, dict) else None
+        self._tables: Dict[str, pd.DataFrame] = {}
 
 
     def __repr__(self) -> str:
         """Instance string representation."""
-        # TODO: The DataFrame repr is very long - neaten this up (with type?)
         classname = self.__class__.__name__
-        parts = [f"{k}={type(v)}" for k, v in self.__dict__.items()]
+        parts = [
+            f"{name}={'built' if name in self._tables else 'lazy'}"
+            for name in self.TABLES
+        ]
         return f"{classname}({', '.join(parts)})"
 
 
+    @property
+    def json_data(self) -> dict:
+        """Return the decoded bootstrap JSON, decoding a raw document on
+        first access."""
+        if self._json_data is None:
+            self._json_data = decode.loads(self._document)
+        return self._json_data
+
+
+    def _table(self, name: str, dtypes: Dict[str, str]) -> pd.DataFrame:
+        """Return the named table, building it on first access.
+
+        Arguments:
+            name {str} -- The table property name (a key of TABLES).
+            dtypes {Dict[str, str]} -- The dtype of each column to keep.
+        """
+        if name not in self._tables:
+            try:
+                columns = decode.decode_columns(
+                    self._document, [self.TABLES[name]], dtypes
+                )
+                df = process.typed_df_from_columns(columns, dtypes)
+            except Exception as exc:
+                msg = f"Error in structure of downloaded JSON: {exc}"
+                raise error.JSONError(msg) from exc
+            self._tables[name] = df
+        return self._tables[name]
+
+
+    @property
+    def elements_df(self) -> pd.DataFrame:
+        """Return the DataFrame for the elements (players).
+
+        The `team` and `element_type` categories cover every PL team and
+        element type, so they line up with the other tables' IDs.
+        """
+        if "elements_df" not in self._tables:
+            df = self._table("elements_df", self.ELEMENTS)
+            df["team"] = df["team"].cat.set_categories(
+                self.pl_teams_df["id"].tolist()
+            )
+            df["element_type"] = df["element_type"].cat.set_categories(
+                self.element_types_df["id"].tolist()
+            )
+        return self._tables["elements_df"]
+
+
+    @property
+    def events_df(self) -> pd.DataFrame:
+        """Return the DataFrame for the events (Gameweeks)."""
+        return self._table("events_df", self.EVENTS)
+
+
+    @property
+    def phases_df(self) -> pd.DataFrame:
+        """Return the DataFrame for the phases (months)."""
+        return self._table("phases_df", self.PHASES)
+
+
+    @property
+    def pl_teams_df(self) -> pd.DataFrame:
+        """Return the DataFrame for the PL teams."""
+        return self._table("pl_teams_df", self.PL_TEAMS)
+
+
+    @property
+    def element_types_df(self) -> pd.DataFrame:
+        """Return the DataFrame for the element (player) types."""
+        return self._table("element_types_df", self.ELEMENT_TYPES)
+
+
     @classmethod
-    def create(cls, get_func: Callable[[None], dict]) -> "Elements":
-        """Create an Elements instance.
+    def create(
+        cls, get_func: Callable[[], Union[dict, bytes]]
+    ) -> "Bootstrap":
+        """Create a Bootstrap instance.
 
         Arguments:
-            get_func {Callable[None, dict]}
-                -- The function to call to get the raw JSON data from the FPL
-                   API.
+            get_func {Callable[[], Union[dict, bytes]]}
+                -- The function to call to get the JSON data from the FPL
+                   API, decoded or as the raw document (whose tables are
+                   checked as they're decoded).
         """
-        # TODO: Better error handling here - what happens when:
-        #  - the 'get' function raises an exception?
-        #  - the JSON structure isn't as expected (e.g. field names changed)?
         json_data = get_func()
+        if not isinstance(json_data, dict):
+            return cls(json_data)
 
-        try:
-            elements_df = pd.DataFrame(json_data["elements"])
-            elements_df = elements_df[cls.INTERNAL]
-        except Exception as exc:
-            msg = f"Error in structure of downloaded JSON: {exc}"
-            raise error.JSONError(msg) from exc
+        missing = [key for key in cls.TABLES.values() if key not in json_data]
+        if missing:
+            msg = f"Error in structure of downloaded JSON: missing {missing}"
+            raise error.JSONError(msg)
 
-        return cls(
-            elements_df,
-        )
+        return cls(json_data)
@@ -0,0 +1,162 @@
+"""Fast JSON decoding.
+
+Uses orjson or msgspec when installed, falling back to the stdlib json
+module. Also provides a schema-driven decode of a table of JSON objects
+straight into per-field columns, which skips the intermediate list of dicts
+when given the raw document and msgspec is installed.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+__all__ = (
+    "BACKEND",
+    "loads",
+    "dumps",
+    "columns",
+    "decode_columns",
+)
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+_MSGSPEC_DECODER: Any = None
+_MSGSPEC_ENCODER: Any = None
+if msgspec is not None:
+    _MSGSPEC_DECODER = msgspec.json.Decoder()
+    _MSGSPEC_ENCODER = msgspec.json.Encoder()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document with the fastest available backend.
+
+    Arguments:
+        data {Union[bytes, str]} -- The JSON document.
+    """
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    if BACKEND == "msgspec":
+        return _MSGSPEC_DECODER.decode(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON with the fastest available
+    backend.
+
+    Arguments:
+        obj {Any} -- The JSON-able object.
+    """
+    if BACKEND == "orjson":
+        return orjson.dumps(obj)
+    if BACKEND == "msgspec":
+        return _MSGSPEC_ENCODER.encode(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def columns(
+    records: Iterable[Dict], fields: Iterable[str]
+) -> Dict[str, List]:
+    """Transpose a list of JSON objects into one list per field.
+
+    Arguments:
+        records {Iterable[dict]} -- The JSON objects (table rows).
+        fields {Iterable[str]} -- The fields to keep.
+
+    Raises:
+        KeyError -- If a row is missing one of the fields.
+    """
+    records = records if isinstance(records, list) else list(records)
+    return {field: [row[field] for row in records] for field in fields}
+
+
+# msgspec type for each pandas dtype in a schema. The API sends decimals as
+# strings (e.g. "4.5"), so float fields accept either.
+_MSGSPEC_TYPES = {
+    "bool": bool,
+    "float": Union[float, str, None],
+    "int": Optional[int],
+    "Int": Optional[int],
+}
+
+_STRUCT_CACHE: Dict[tuple, Any] = {}
+
+
+def _table_type(path: Sequence[str], fields: Dict[str, str]) -> Any:
+    """Return (and memoize) a msgspec type which decodes only `fields` of the
+    array at `path`, skipping everything else in the document.
+    """
+    cache_key = (tuple(path), tuple(fields.items()))
+    table_type = _STRUCT_CACHE.get(cache_key)
+    if table_type is not None:
+        return table_type
+
+    row_fields = []
+    for field, dtype in fields.items():
+        prefix = dtype.rstrip("0123456789")
+        row_fields.append(
+            (field, _MSGSPEC_TYPES.get(prefix, Union[str, int, float, None]))
+        )
+    table_type = List[msgspec.defstruct("Row", row_fields)]
+
+    for depth, key in enumerate(reversed(path)):
+        table_type = msgspec.defstruct(f"Level{depth}", [(key, table_type)])
+
+    _STRUCT_CACHE[cache_key] = table_type
+    return table_type
+
+
+def decode_columns(
+    data: Any,
+    path: Sequence[str],
+    fields: Dict[str, str],
+) -> Dict[str, List]:
+    """Decode the table at `path` in a JSON document straight into columns.
+
+    Given the raw document with msgspec installed, only the requested fields
+    are decoded - into lightweight structs rather than a list of dicts.
+    Otherwise the document is decoded with loads() (unless it already has
+    been, e.g. when served from the response cache) and transposed with
+    columns().
+
+    Arguments:
+        data {Any} -- The JSON document (bytes or str), or the object
+                      decoded from it.
+        path {Sequence[str]} -- The keys leading to the table, e.g.
+                                ["elements"] for bootstrap-static or
+                                ["standings", "results"] for a league.
+        fields {Dict[str, str]} -- Mapping of field name to pandas dtype,
+                                   e.g. data.Bootstrap.ELEMENTS.
+
+    Raises:
+        KeyError -- If the document is missing the table or a field.
+    """
+    raw = isinstance(data, (bytes, bytearray, memoryview, str))
+    if raw and msgspec is not None:
+        try:
+            obj = msgspec.json.decode(data, type=_table_type(path, fields))
+        except msgspec.ValidationError as exc:
+            raise KeyError(str(exc)) from exc
+        for key in path:
+            obj = getattr(obj, key)
+        return {
+            field: [getattr(row, field) for row in obj] for field in fields
+        }
+
+    obj = loads(data) if raw else data
+    for key in path:
+        obj = obj[key]
+    return columns(obj, fields)
@@ -26,3 +26,19 @@ class JSONError(FplError):
             Error string for this exception.
         """
         super().__init__(message)
+
+
+class BulkFetchError(FetchError):
+    """Error fetching one or more items in a bulk fetch."""
+    def __init__(self, message, errors, results):
+        """
+        :param message:
+            Error string for this exception.
+        :param errors:
+            Dict mapping each failed key to the FetchError it raised.
+        :param results:
+            Dict mapping each successful key to its JSON data.
+        """
+        super().__init__(message)
+        self.errors = errors
+        self.results = results
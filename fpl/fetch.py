@@ -1,7 +1,17 @@
-import requests
-import streamlit as st
-
+import functools
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bulk
+import cache
+import decode
 import error
+import metrics
+import ratelimit
+import session
+import singleflight
 
 __all__ = (
     "get_entry_json",
@@ -10,27 +20,228 @@ __all__ = (
     "get_league_matches_json",
     "get_entry_event_picks_json",
     "get_entry_history_json",
+    "get_entries_json",
+    "get_entry_histories_json",
+    "get_elements_json",
+    "get_picks_json",
+    "iter_league_pages",
+    "iter_league_matches_pages",
 )
 
-BASE_URL = "https://fantasy.premierleague.com/api/"
+DEFAULT_BASE_URL = "https://fantasy.premierleague.com/api/"
+
+# The API root, e.g. a mockapi.MockServer's url for offline runs.
+BASE_URL = os.environ.get("FPL_BASE_URL", DEFAULT_BASE_URL)
+
+# Endpoint path templates, relative to BASE_URL. These double as cache keys.
+PATHS = {
+    "bootstrap": "bootstrap-static",
+    "entry": "entry/{entry_id}",
+    "element": "element-summary/{element_id}",
+    "league": "leagues-h2h/{league_id}/standings/?page_standings={page}",
+    "league_matches": "leagues-h2h-matches/league/{league_id}/?page={page}",
+    "league_event_matches":
+        "leagues-h2h-matches/league/{league_id}/?page={page}&event={event_id}",
+    "picks": "entry/{entry_id}/event/{event_id}/picks",
+    "entry_history": "entry/{entry_id}/history",
+}
+
+CACHE = cache.ResponseCache()
+
+# The number of times a request is retried after a 429.
+RATE_LIMIT_RETRIES = 5
+
+# In-flight downloads, so concurrent callers share one request per URL.
+FLIGHTS = singleflight.Group()
+
+# Set to a snapshot.SnapshotStore to serve requests from local snapshots
+# instead of HTTP, falling back to HTTP for anything not in the snapshot.
+SNAPSHOT = None
+
+def set_base_url(url, response_cache=None):
+    """Point every fetch at another API root, e.g. a local mock server.
+
+    Responses are cached by endpoint path, so a different server should
+    normally get its own cache.
+
+    Arguments:
+        url {str} -- The API root (DEFAULT_BASE_URL for the live API).
+        response_cache {cache.ResponseCache} -- The cache to use from now
+                                                on, if not the current one.
+    """
+    global BASE_URL, CACHE
+    BASE_URL = url if url.endswith("/") else url + "/"
+    if response_cache is not None:
+        CACHE = response_cache
+
+
+def _cache_key(url):
+    """Return the cache key (endpoint path) for the given URL.
+    """
+    return url[len(BASE_URL):] if url.startswith(BASE_URL) else url
+
 
-def _get_from_url(url):
+def _record_request(key, start, response, decode_time=0.0, end=None,
+                    **kwargs):
+    """Record an HTTP request's metrics.
+
+    Arguments:
+        key {str} -- The cache key (endpoint path).
+        start {float} -- The perf_counter() time the request started.
+        response {requests.Response} -- The response, if one arrived.
+        decode_time {float} -- The time spent decoding the JSON.
+        end {float} -- The perf_counter() time the response arrived (default
+                       now).
+        kwargs -- Extra flags passed to metrics.Registry.record_request.
+    """
+    end = time.perf_counter() if end is None else end
+    retries = 0
+    response_bytes = 0
+    if response is not None:
+        retry = getattr(response.raw, "retries", None)
+        history = getattr(retry, "history", ())
+        retries = len(history or ())
+        response_bytes = len(response.content)
+    metrics.REGISTRY.record_request(
+        key,
+        end - start,
+        response_bytes=response_bytes,
+        decode_time=decode_time,
+        retries=retries,
+        **kwargs,
+    )
+
+
+def _limited_get(url, headers=None):
+    """Issue a GET on the shared session within the shared rate limit.
+
+    A 429 response pauses the limiter (for every process sharing it) for
+    the Retry-After delay, then the request is retried, up to
+    RATE_LIMIT_RETRIES times.
+
+    Arguments:
+        url {str} -- The URL to fetch.
+        headers {dict} -- Extra request headers.
+
+    Returns:
+        requests.Response -- The last response.
+    """
+    for attempt in itertools.count():
+        ratelimit.acquire()
+        response = session.get(url, headers=headers)
+        if response.status_code != 429 or attempt >= RATE_LIMIT_RETRIES:
+            return response
+        ratelimit.penalize(ratelimit.retry_after(response.headers, attempt))
+
+
+def _get_from_url(url, on_fetch=None, revalidate=False):
     """Return JSON string from URL.
+
+    Responses come from the local snapshot if one is in use (see SNAPSHOT),
+    then from the on-disk cache if still fresh. Otherwise the request
+    goes through the shared pooled session, so connections are kept alive
+    between calls and 5xx responses are retried with backoff, within the
+    shared rate limit (see _limited_get).
+
+    Concurrent calls for the same URL are coalesced (see FLIGHTS): one
+    caller downloads, and the others share its parsed result.
+
+    Arguments:
+        url {str} -- The URL to fetch.
+        on_fetch {Callable[[dict], None]}
+            -- Optional hook called with freshly downloaded data before it is
+               cached.
+        revalidate {bool}
+            -- Check with the API even if the cached copy is fresh (a
+               conditional request, so unchanged data costs a 304), e.g. to
+               poll live data more often than the cache TTL.
+    """
+    key = _cache_key(url)
+    if SNAPSHOT is not None:
+        data = SNAPSHOT.get_json(key)
+        if data is not None:
+            return data
+
+    if not revalidate:
+        cached = CACHE.get(key)
+        metrics.REGISTRY.record_cache(key, hit=cached is not None)
+        if cached is not None:
+            return cached
+
+    data, shared = FLIGHTS.do(key, lambda: _download(url, key, on_fetch))
+    if shared:
+        metrics.REGISTRY.record_coalesced(key)
+    return data
+
+
+def _download(url, key, on_fetch=None):
+    """Download, decode and cache the JSON at URL.
+
+    Arguments:
+        url {str} -- The URL to fetch.
+        key {str} -- The URL's cache key.
+        on_fetch {Callable[[dict], None]} -- See _get_from_url.
     """
+    # Revalidate a stale copy rather than re-downloading it.
+    headers = {}
+    validators = CACHE.validators(key)
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last_modified" in validators:
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    start = time.perf_counter()
+    response = None
     try:
         # Catch all fetch-related exceptions in one block.
-        response = requests.get(url)
+        response = _limited_get(url, headers=headers)
+        if response.status_code == 304:
+            cached = CACHE.revalidate(key)
+            if cached is not None:
+                _record_request(key, start, response, not_modified=True)
+                return cached
+            # The stored body has gone since we read the validators.
+            response = _limited_get(url)
         response.raise_for_status() # checks status is success
-        response = response.json()
+        fetched = time.perf_counter()
+        data = decode.loads(response.content)
     except Exception as exc:
+        _record_request(key, start, response, failed=True)
         msg = f"Error fetching JSON data from URL: {url}: {exc}"
         raise error.FetchError(msg) from exc
+    _record_request(
+        key, start, response, decode_time=time.perf_counter() - fetched,
+        end=fetched,
+    )
+
+    if on_fetch is not None:
+        on_fetch(data)
+    _ensure_policy(key)
+    CACHE.put(
+        key,
+        data,
+        validators={
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        },
+        raw_size=len(response.content),
+    )
+    return data
 
-    return response
 
+def _ensure_policy(key):
+    """Make sure the cache's TTL policy knows which events have finished
+    before `key` is cached, fetching bootstrap if nothing has yet.
 
-@st.cache(persist=True)
-def get_bootstrap_json():
+    Arguments:
+        key {str} -- The cache key about to be stored.
+    """
+    if key != PATHS["bootstrap"] and not CACHE.policy.deadlines \
+            and not CACHE.load_policy():
+        get_bootstrap_json()
+
+
+def get_bootstrap_json(revalidate=False):
     """Returns JSON data for the given team (entry).
 
     Data is structured as follows:
@@ -141,14 +352,28 @@ def get_bootstrap_json():
                 <irrelevant fields omitted>
             }
         }
-    
+
+    Arguments:
+        revalidate {bool} -- See _get_from_url.
+
     Returns:
         dict -- JSON object obtained from the URL.
     """
-    return _get_from_url(BASE_URL + "bootstrap-static")
+    def _update_policy(data):
+        CACHE.policy.update(data.get("events", []))
+
+    # Refresh the TTL policy from the events before caching, so bootstrap
+    # itself stays fresh until the next deadline.
+    response = _get_from_url(
+        BASE_URL + PATHS["bootstrap"], on_fetch=_update_policy,
+        revalidate=revalidate,
+    )
+    if not CACHE.policy.deadlines:
+        # Served from a cache written by another process.
+        _update_policy(response)
+    return response
 
 
-@st.cache(persist=True)
 def get_entry_json(entry_id):
     """Returns JSON data for the given team (entry).
 
@@ -210,11 +435,10 @@ def get_entry_json(entry_id):
     Returns:
         dict -- JSON object obtained from the URL.
     """
-    return _get_from_url(BASE_URL + f"entry/{entry_id}")
+    return _get_from_url(BASE_URL + PATHS["entry"].format(entry_id=entry_id))
 
 
-@st.cache(persist=True)
-def get_element_json(element_id):
+def get_element_json(element_id, revalidate=False):
     """Returns JSON data for the given element.
 
     Data is structured as follows:
@@ -278,16 +502,19 @@ def get_element_json(element_id):
 
     Arguments:
         element_id {int} -- The Element ID.
+        revalidate {bool} -- See _get_from_url.
     
     Returns:
         dict -- JSON object obtained from the URL.
     """
-    return _get_from_url(BASE_URL + f"element-summary/{element_id}")
+    return _get_from_url(
+        BASE_URL + PATHS["element"].format(element_id=element_id),
+        revalidate=revalidate,
+    )
 
 
-@st.cache(persist=True)
-def get_league_json(league_id):
-    """Returns JSON data for the given league.
+def get_league_json(league_id, page=1):
+    """Returns JSON data for one page of the given league's standings.
 
     Data is structured as follows:
         {
@@ -329,18 +556,18 @@ def get_league_json(league_id):
 
     Arguments:
         league_id {int} -- The League ID.
+        page {int} -- The page of standings to fetch (1-based).
     
     Returns:
         dict -- JSON object obtained from the URL.
     """
     return _get_from_url(
-        BASE_URL + f"leagues-h2h/{league_id}/standings"
+        BASE_URL + PATHS["league"].format(league_id=league_id, page=page)
     )
 
 
-@st.cache(persist=True)
-def get_league_matches_json(league_id):
-    """Returns JSON data for the given league's matches.
+def get_league_matches_json(league_id, page=1, event_id=None):
+    """Returns JSON data for one page of the given league's matches.
 
     Data is structured as follows:
         {
@@ -377,16 +604,76 @@ def get_league_matches_json(league_id):
 
     Arguments:
         league_id {int} -- The League ID.
+        page {int} -- The page of matches to fetch (1-based).
+        event_id {int} -- Only fetch matches in this Gameweek (default to
+                          all Gameweeks).
     
     Returns:
         dict -- JSON object obtained from the URL.
     """
-    return _get_from_url(
-        BASE_URL + f"leagues-h2h-matches/league/{league_id}"
+    if event_id is None:
+        path = PATHS["league_matches"].format(league_id=league_id, page=page)
+    else:
+        path = PATHS["league_event_matches"].format(
+            league_id=league_id, page=page, event_id=event_id
+        )
+    return _get_from_url(BASE_URL + path)
+
+
+def _iter_pages(get_page, has_next):
+    """Yield successive pages, fetching the next page in the background
+    while the caller processes the current one.
+
+    Arguments:
+        get_page {Callable[[int], dict]} -- Fetches the given 1-based page.
+        has_next {Callable[[dict], bool]} -- Whether a page has a successor.
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        page = 1
+        future = pool.submit(get_page, page)
+        while future is not None:
+            data = future.result()
+            page += 1
+            future = pool.submit(get_page, page) if has_next(data) else None
+            yield data
+
+
+def iter_league_pages(league_id):
+    """Yields every page of the given league's standings.
+
+    See get_league_json for the structure of each page.
+
+    Arguments:
+        league_id {int} -- The League ID.
+
+    Returns:
+        Iterator[dict] -- JSON object for each page, in order.
+    """
+    return _iter_pages(
+        lambda page: get_league_json(league_id, page),
+        lambda data: data["standings"]["has_next"],
+    )
+
+
+def iter_league_matches_pages(league_id, event_id=None):
+    """Yields every page of the given league's matches.
+
+    See get_league_matches_json for the structure of each page.
+
+    Arguments:
+        league_id {int} -- The League ID.
+        event_id {int} -- Only fetch matches in this Gameweek (default to
+                          all Gameweeks).
+
+    Returns:
+        Iterator[dict] -- JSON object for each page, in order.
+    """
+    return _iter_pages(
+        lambda page: get_league_matches_json(league_id, page, event_id),
+        lambda data: data["has_next"],
     )
 
 
-@st.cache(persist=True)
 def get_entry_event_picks_json(entry_id, event_id):
     """Returns JSON data containing the team (picks) for a given manager
     (entry) and gameweek (event).
@@ -427,11 +714,10 @@ def get_entry_event_picks_json(entry_id, event_id):
         dict -- JSON object obtained from the URL.
     """
     return _get_from_url(
-        BASE_URL + f"entry/{entry_id}/event/{event_id}/picks"
+        BASE_URL + PATHS["picks"].format(entry_id=entry_id, event_id=event_id)
     )
 
 
-@st.cache(persist=True)
 def get_entry_history_json(entry_id):
     """Returns JSON data containing the history for a given manager (entry).
 
@@ -470,11 +756,123 @@ def get_entry_history_json(entry_id):
 
     Arguments:
         entry_id {int} -- The Entry ID.
-        event_id {int} -- The Event ID for the Gameweek.
     
     Returns:
         dict -- JSON object obtained from the URL.
     """
     return _get_from_url(
-        BASE_URL + f"entry/{entry_id}/event/{event_id}/picks"
+        BASE_URL + PATHS["entry_history"].format(entry_id=entry_id)
+    )
+
+
+def get_entries_json(entry_ids, max_workers=bulk.DEFAULT_MAX_WORKERS,
+                     rate=bulk.DEFAULT_RATE):
+    """Returns JSON data for each of the given teams (entries).
+
+    Requests are fanned out over a bounded thread pool. See get_entry_json for
+    the structure of each item.
+
+    Arguments:
+        entry_ids {Iterable[int]} -- The Entry IDs.
+        max_workers {int} -- The maximum number of requests in flight.
+        rate {float} -- An extra cap on requests per second, on top of the
+                        shared rate limit (see ratelimit.py).
+
+    Raises:
+        error.BulkFetchError -- If any entry could not be fetched.
+
+    Returns:
+        dict -- JSON object for each Entry ID, keyed by Entry ID.
+    """
+    return bulk.fetch_many(
+        get_entry_json,
+        entry_ids,
+        max_workers=max_workers,
+        rate=rate,
+    )
+
+
+def get_entry_histories_json(entry_ids,
+                             max_workers=bulk.DEFAULT_MAX_WORKERS,
+                             rate=bulk.DEFAULT_RATE):
+    """Returns JSON history data for each of the given teams (entries).
+
+    One request per entry covers its whole season. Requests are fanned out
+    over a bounded thread pool. See get_entry_history_json for the structure
+    of each item.
+
+    Arguments:
+        entry_ids {Iterable[int]} -- The Entry IDs.
+        max_workers {int} -- The maximum number of requests in flight.
+        rate {float} -- An extra cap on requests per second, on top of the
+                        shared rate limit (see ratelimit.py).
+
+    Raises:
+        error.BulkFetchError -- If any entry could not be fetched.
+
+    Returns:
+        dict -- JSON object for each Entry ID, keyed by Entry ID.
+    """
+    return bulk.fetch_many(
+        get_entry_history_json,
+        entry_ids,
+        max_workers=max_workers,
+        rate=rate,
+    )
+
+
+def get_elements_json(element_ids, max_workers=bulk.DEFAULT_MAX_WORKERS,
+                      rate=bulk.DEFAULT_RATE, revalidate=False):
+    """Returns JSON data for each of the given elements.
+
+    Requests are fanned out over a bounded thread pool. See get_element_json
+    for the structure of each item.
+
+    Arguments:
+        element_ids {Iterable[int]} -- The Element IDs.
+        max_workers {int} -- The maximum number of requests in flight.
+        rate {float} -- An extra cap on requests per second, on top of the
+                        shared rate limit (see ratelimit.py).
+        revalidate {bool} -- See _get_from_url.
+
+    Raises:
+        error.BulkFetchError -- If any element could not be fetched.
+
+    Returns:
+        dict -- JSON object for each Element ID, keyed by Element ID.
+    """
+    return bulk.fetch_many(
+        functools.partial(get_element_json, revalidate=revalidate),
+        element_ids,
+        max_workers=max_workers,
+        rate=rate,
+    )
+
+
+def get_picks_json(entry_ids, event_ids, max_workers=bulk.DEFAULT_MAX_WORKERS,
+                   rate=bulk.DEFAULT_RATE):
+    """Returns JSON picks data for every (entry, event) pair.
+
+    Requests are fanned out over a bounded thread pool. See
+    get_entry_event_picks_json for the structure of each item.
+
+    Arguments:
+        entry_ids {Iterable[int]} -- The Entry IDs.
+        event_ids {Iterable[int]} -- The Event IDs for the Gameweeks.
+        max_workers {int} -- The maximum number of requests in flight.
+        rate {float} -- An extra cap on requests per second, on top of the
+                        shared rate limit (see ratelimit.py).
+
+    Raises:
+        error.BulkFetchError -- If any (entry, event) pair could not be
+                                fetched.
+
+    Returns:
+        dict -- JSON object for each pair, keyed by (Entry ID, Event ID).
+    """
+    return bulk.fetch_many(
+        lambda key: get_entry_event_picks_json(*key),
+        itertools.product(entry_ids, list(event_ids)),
+        max_workers=max_workers,
+        rate=rate,
     )
@@ -1,15 +1,34 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import functools
 
 import fetch
-import data
-import error
+import metrics
+import plane
+import planner
+import simulate
+import standings
+
+
+@st.cache(allow_output_mutation=True)
+def data_plane():
+    """Return the process-wide data plane, shared by every session, so each
+    league is fetched and held once however many viewers it has."""
+    return plane.DataPlane()
+
 
 def main():
-    if st.sidebar.button("Refresh Data"):
-        st.caching.clear_cache()
+    refresh = st.sidebar.button("Refresh Data")
+    if refresh:
+        # Finished-gameweek data never changes, so keep it.
+        fetch.CACHE.invalidate()
+
+    # Picks up newly finished Gameweeks once the bootstrap's TTL expires.
+    data_plane().refresh()
+
+    show_metrics = st.sidebar.checkbox("Show fetch metrics")
+    show_form = st.sidebar.checkbox("Show player form")
+    show_plans = st.sidebar.checkbox("Show transfer planner")
+    show_projection = st.sidebar.checkbox("Show season projection")
 
     league_id = st.sidebar.text_input("League ID", value="309333")
     try:
@@ -20,10 +39,13 @@ def main():
         )
         raise st.StopException from exc
 
+    if refresh:
+        # The plane only rebuilds a league once a new Gameweek finishes;
+        # drop it so the live standings and names are fetched again.
+        data_plane().evict(league_id)
+
     try:
-        league = data.H2HLeague.create(
-            functools.partial(fetch.get_league_json, league_id)
-        )
+        league = data_plane().league(league_id)
     except Exception as exc:
         st.error(f"Error obtaining league data: {exc}")
         raise st.StopException from exc
@@ -34,6 +56,154 @@ def main():
     st.dataframe(league.display_df)
     st.dataframe(league.standings_df)
 
+    history_df = league.standings_history_df
+    if not history_df.empty:
+        events = history_df["event"].unique().tolist()
+        event = st.sidebar.selectbox(
+            "Standings as of Gameweek", events, index=len(events) - 1
+        )
+        st.header(f"Standings after Gameweek {event}")
+        st.dataframe(standings.standings_as_of(history_df, event))
+        show_ownership(league, event)
+        if show_form:
+            show_player_form(league, event)
+        if show_plans:
+            show_planner(league)
+        if show_projection:
+            show_season_projection(league)
+
+    if show_metrics:
+        show_fetch_metrics()
+
+
+def show_ownership(league, event):
+    """Render the league's squad overlaps in the given Gameweek.
+
+    Arguments:
+        league {plane.LeagueView} -- The league.
+        event {int} -- The Event ID.
+    """
+    ownership = league.ownership
+    if event not in ownership.events:
+        return
+
+    st.header(f"Gameweek {event} Matchup Overlaps")
+    st.dataframe(ownership.matchups_df(league.matches_df, event))
+    st.subheader("Shared Players")
+    st.dataframe(ownership.overlap_df(event))
+    st.subheader("Ownership")
+    st.dataframe(ownership.ownership_df(event))
+
+
+def show_player_form(league, event):
+    """Render the form of the players picked in the league in the given
+    Gameweek.
+
+    Arguments:
+        league {plane.LeagueView} -- The league.
+        event {int} -- The Event ID.
+    """
+    element_cube = league.element_cube
+    if event > element_cube.n_events:
+        return
+
+    st.header(f"Player Form after Gameweek {event}")
+    form_df = pd.DataFrame(
+        {
+            "form": element_cube.form(event),
+            "points_per_match": element_cube.points_per_match(event),
+            "total_points": element_cube.window_sum(
+                "total_points", event, event
+            ),
+        },
+        index=pd.Index(element_cube.element_ids, name="element"),
+    )
+    picks_df = league.picks_df
+    picked = picks_df.loc[picks_df["event"] == event, "element"]
+    form_df = form_df[form_df.index.isin(picked)]
+    names = league.bootstrap.elements_df.set_index("id")["web_name"]
+    form_df.insert(0, "player", names.reindex(form_df.index).to_numpy())
+    st.dataframe(form_df.sort_values("form", ascending=False))
+
+
+def show_planner(league):
+    """Render suggested transfers for one of the league's entries, from
+    their squad in the last included Gameweek.
+
+    Arguments:
+        league {plane.LeagueView} -- The league.
+    """
+    transfer_planner = data_plane().transfer_planner()
+    if transfer_planner is None:
+        return
+
+    st.header("Transfer Planner")
+    names = dict(zip(
+        league.standings_df["entry"], league.standings_df["entry_name"]
+    ))
+    entry = st.selectbox(
+        "Team", list(names), format_func=lambda entry: names[entry]
+    )
+    horizon = st.slider(
+        "Gameweeks ahead", 1, len(transfer_planner.events),
+        min(3, len(transfer_planner.events)),
+    )
+    max_transfers = st.slider("Maximum transfers", 0, 3, 1)
+
+    last = league.events[-1]
+    picks_df = league.picks_df
+    squad = picks_df.loc[
+        (picks_df["entry"] == entry) & (picks_df["event"] == last), "element"
+    ].tolist()
+    entry_history_df = league.entry_history_df
+    bank = entry_history_df.loc[
+        (entry_history_df["entry"] == entry)
+        & (entry_history_df["event"] == last),
+        "bank",
+    ]
+    if not squad or bank.empty:
+        return
+
+    plans = transfer_planner.plan(
+        squad, int(bank.iloc[0]), horizon, max_transfers
+    )
+    st.dataframe(pd.DataFrame(plans, columns=planner.Plan._fields))
+
+
+@st.cache
+def season_projection(league_id, events):
+    """Return the league's simulated final table.
+
+    Arguments:
+        league_id {int} -- The H2H League ID.
+        events {Tuple[int, ...]} -- The finished Event IDs (so the
+                                    projection is redone once they change).
+    """
+    matches_df = standings.matches_df_from_pages(
+        fetch.iter_league_matches_pages(league_id)
+    )
+    simulator = simulate.SeasonSimulator.from_matches(matches_df)
+    return simulator.run(sims=20000)
+
+
+def show_season_projection(league):
+    """Render each entry's chances over the rest of the season.
+
+    Arguments:
+        league {plane.LeagueView} -- The league.
+    """
+    st.header("Season Projection")
+    st.dataframe(season_projection(league.id, tuple(league.events)))
+
+
+def show_fetch_metrics():
+    """Render the fetch-layer debug panel."""
+    st.header("Fetch Metrics")
+    snapshot = metrics.REGISTRY.snapshot()
+    if snapshot:
+        st.dataframe(pd.DataFrame.from_dict(snapshot, orient="index"))
+    st.json(fetch.CACHE.stats.as_dict())
+
 
 if __name__ == "__main__":
     main()
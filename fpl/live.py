@@ -0,0 +1,360 @@
+"""Provisional points for a gameweek in progress.
+
+LiveEngine keeps every tracked entry's provisional score for one event. Each
+poll takes the event's per-fixture element stats (the element-summary
+`history` rows for the event), adds provisional bonus from BPS for fixtures
+whose bonus isn't confirmed yet, and recomputes only the entries holding an
+element whose points, minutes or finished state changed - found through an
+element -> entries index - applying automatic substitutions and captain
+fallback.
+
+Which fixtures have finished is derived from the same rows: the API only
+awards (confirms) bonus once a fixture is over, so a fixture with confirmed
+bonus is finished. Auto-subs therefore wait for bonus confirmation, about
+an hour after full time, rather than the final whistle. Callers with the
+fixtures endpoint's `finished` flags can pass them instead.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import standings
+
+__all__ = (
+    "provisional_bonus",
+    "bonus_confirmed_fixtures",
+    "LiveEngine",
+)
+
+# Bonus for BPS ranks 1-3 within a fixture; ties share the higher bonus and
+# the next rank is skipped (e.g. 3, 3, 1).
+BONUS = (3, 2, 1)
+
+# The minimum number of starters per element type for automatic subs.
+MIN_STARTERS = {1: 1, 2: 3, 3: 2, 4: 1}
+
+STARTING_POSITIONS = 11
+GOALKEEPER = 1
+
+
+def provisional_bonus(stats_df: pd.DataFrame) -> np.ndarray:
+    """Return the bonus each row would get from the current BPS.
+
+    Within each fixture, players with minutes are ranked by BPS (ties share
+    the higher rank) and ranks 1-3 get 3, 2 and 1 bonus points.
+
+    Arguments:
+        stats_df {pd.DataFrame}
+            -- One row per (element, fixture), with `fixture`, `minutes`
+               and `bps` (see schema.ELEMENT_HISTORY).
+    """
+    played = stats_df["minutes"].to_numpy() > 0
+    bps = stats_df["bps"].where(played)
+    ranks = bps.groupby(stats_df["fixture"]).rank(
+        method="min", ascending=False
+    ).fillna(len(BONUS) + 1).to_numpy(np.int64)
+    bonus = np.zeros(len(BONUS) + 2, dtype=np.int16)
+    bonus[1:len(BONUS) + 1] = BONUS
+    return bonus[np.minimum(ranks, len(BONUS) + 1)]
+
+
+def _confirmed(stats_df: pd.DataFrame) -> np.ndarray:
+    """Return, for each row, whether its fixture's bonus is confirmed."""
+    bonus = stats_df["bonus"].to_numpy(np.int64)
+    return pd.Series(bonus > 0).groupby(
+        stats_df["fixture"].to_numpy()
+    ).transform("any").to_numpy(bool)
+
+
+def bonus_confirmed_fixtures(stats_df: pd.DataFrame) -> List[int]:
+    """Return the fixtures whose bonus has been confirmed, i.e. which have
+    finished.
+
+    Arguments:
+        stats_df {pd.DataFrame}
+            -- One row per (element, fixture), with `fixture` and `bonus`
+               (see schema.ELEMENT_HISTORY).
+    """
+    fixtures = stats_df["fixture"].to_numpy()[_confirmed(stats_df)]
+    return np.unique(fixtures).tolist()
+
+
+class LiveEngine:
+    """Class representing provisional scores for one event, kept up to date
+    incrementally.
+    """
+    def __init__(
+        self,
+        event: int,
+        picks_df: pd.DataFrame,
+        element_types: Dict[int, int],
+        transfers_cost: Optional[Dict[int, int]] = None,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            event {int} -- The Event ID.
+            picks_df {pd.DataFrame}
+                -- Picks of every tracked entry in the event (schema.PICKS),
+                   e.g. for several leagues at once.
+            element_types {Dict[int, int]}
+                -- Element type of every element, e.g. from
+                   Bootstrap.elements_df.
+            transfers_cost {Optional[Dict[int, int]]}
+                -- Transfer hits per entry in the event.
+        """
+        self.event: int = event
+        self.element_types: Dict[int, int] = dict(element_types)
+        self.transfers_cost: Dict[int, int] = dict(transfers_cost or {})
+
+        picks_df = picks_df[picks_df["event"] == event].sort_values(
+            ["entry", "position"]
+        )
+        self.picks: Dict[int, List[Tuple[int, int, int, bool, bool]]] = {
+            int(entry): list(zip(
+                group["element"].astype(int),
+                group["position"].astype(int),
+                group["multiplier"].astype(int),
+                group["is_captain"].astype(bool),
+                group["is_vice_captain"].astype(bool),
+            ))
+            for entry, group in picks_df.groupby("entry")
+        }
+
+        # Change index: which entries hold each element.
+        self.holders: Dict[int, np.ndarray] = {
+            int(element): np.unique(group["entry"].to_numpy())
+            for element, group in picks_df.groupby("element")
+        }
+
+        size = max(
+            [int(picks_df["element"].max()) if len(picks_df) else 0]
+            + list(self.element_types)
+        ) + 1
+        self._points = np.zeros(size, dtype=np.int16)
+        self._minutes = np.zeros(size, dtype=np.int16)
+        self._done = np.zeros(size, dtype=bool)
+        self.scores: Dict[int, dict] = {}
+        self._initialized = False
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(event={self.event!r}, entries={len(self.picks)}, "
+            f"elements={len(self.holders)})"
+        )
+
+
+    @property
+    def elements(self) -> List[int]:
+        """Return the elements held by any tracked entry, e.g. to poll with
+        fetch.get_elements_json."""
+        return sorted(self.holders)
+
+
+    def element_state(
+        self,
+        stats_df: pd.DataFrame,
+        finished_fixtures: Optional[Iterable[int]] = None,
+        event_finished: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the provisional points, minutes and finished flag of every
+        element, indexed by Element ID.
+
+        Arguments:
+            stats_df {pd.DataFrame}
+                -- The event's per-fixture element stats (element, fixture,
+                   minutes, bps, bonus, total_points). Rows for other events
+                   are ignored if an `event` column is present.
+            finished_fixtures {Optional[Iterable[int]]}
+                -- Fixtures which have finished; an element is finished when
+                   all its fixtures are. Defaults to those with confirmed
+                   bonus (see bonus_confirmed_fixtures).
+            event_finished {bool}
+                -- Whether every fixture in the event has finished, so that
+                   elements without a fixture count as not playing.
+        """
+        if "event" in stats_df:
+            stats_df = stats_df[stats_df["event"] == self.event]
+        stats_df = stats_df[stats_df["element"] < len(self._points)]
+
+        # Confirmed bonus replaces the provisional bonus fixture by fixture.
+        bonus = stats_df["bonus"].to_numpy(np.int64)
+        confirmed = _confirmed(stats_df)
+        if finished_fixtures is None:
+            finished_fixtures = bonus_confirmed_fixtures(stats_df)
+        points = stats_df["total_points"].to_numpy(np.int64) + np.where(
+            confirmed, 0, provisional_bonus(stats_df) - bonus
+        )
+
+        elements = stats_df["element"].to_numpy(np.int64)
+        finished = np.isin(
+            stats_df["fixture"].to_numpy(), np.fromiter(finished_fixtures, int)
+        )
+        size = len(self._points)
+        new_points = np.bincount(
+            elements, weights=points, minlength=size
+        ).astype(np.int16)
+        new_minutes = np.bincount(
+            elements, weights=stats_df["minutes"].to_numpy(), minlength=size
+        ).astype(np.int16)
+        fixtures = np.bincount(elements, minlength=size)
+        done = np.bincount(elements, weights=finished, minlength=size)
+        new_done = np.where(fixtures > 0, done == fixtures, event_finished)
+        return new_points, new_minutes, new_done
+
+
+    def update(
+        self,
+        stats_df: pd.DataFrame,
+        finished_fixtures: Optional[Iterable[int]] = None,
+        event_finished: bool = False,
+    ) -> List[int]:
+        """Apply a poll of the event's element stats.
+
+        Only entries holding an element whose provisional points, minutes or
+        finished state changed are recomputed.
+
+        Arguments:
+            stats_df -- See element_state().
+            finished_fixtures -- See element_state().
+            event_finished -- See element_state().
+
+        Returns:
+            List[int] -- The entries recomputed.
+        """
+        points, minutes, done = self.element_state(
+            stats_df, finished_fixtures, event_finished
+        )
+        if self._initialized:
+            changed = np.flatnonzero(
+                (points != self._points)
+                | (minutes != self._minutes)
+                | (done != self._done)
+            )
+            affected = [
+                self.holders[element] for element in changed.tolist()
+                if element in self.holders
+            ]
+            entries = np.unique(np.concatenate(affected)).tolist() \
+                if affected else []
+        else:
+            entries = list(self.picks)
+            self._initialized = True
+
+        self._points, self._minutes, self._done = points, minutes, done
+        for entry in entries:
+            self.scores[entry] = self._score(entry)
+        return entries
+
+
+    def _score(self, entry: int) -> dict:
+        """Return one entry's provisional score from the element state."""
+        picks = self.picks[entry]
+        starters = [pick for pick in picks if pick[1] <= STARTING_POSITIONS]
+        bench = [pick for pick in picks if pick[1] > STARTING_POSITIONS]
+
+        def _did_not_play(element):
+            return self._done[element] and self._minutes[element] == 0
+
+        # Automatic substitutions, in bench order, keeping a valid
+        # formation. Goalkeepers are only replaced by goalkeepers. With Bench
+        # Boost the bench already scores, so there are none.
+        lineup = [pick[0] for pick in starters]
+        bench_boost = any(pick[2] > 0 for pick in bench)
+        counts: Dict[int, int] = {}
+        for element in lineup:
+            element_type = self.element_types.get(element)
+            counts[element_type] = counts.get(element_type, 0) + 1
+        subs = []
+        available = [] if bench_boost else [pick[0] for pick in bench]
+        for element in list(lineup):
+            if not _did_not_play(element):
+                continue
+            out_type = self.element_types.get(element)
+            for sub in available:
+                sub_type = self.element_types.get(sub)
+                if (out_type == GOALKEEPER) != (sub_type == GOALKEEPER):
+                    continue
+                if sub_type != out_type and \
+                        counts[out_type] - 1 < MIN_STARTERS.get(out_type, 0):
+                    continue
+                if self._minutes[sub] == 0:
+                    if self._done[sub]:
+                        continue
+                    # The sub's fixture is still to finish, so they may yet
+                    # play: leave the slot unresolved rather than skipping
+                    # to the next bench player.
+                    break
+                lineup[lineup.index(element)] = sub
+                counts[out_type] -= 1
+                counts[sub_type] = counts.get(sub_type, 0) + 1
+                available.remove(sub)
+                subs.append((element, sub))
+                break
+
+        # Captain fallback to the vice-captain.
+        multipliers = {element: 1 for element in lineup}
+        captain = next((pick for pick in picks if pick[3]), None)
+        vice = next((pick for pick in picks if pick[4]), None)
+        if captain is not None:
+            multiplier = max(captain[2], 2)
+            if not _did_not_play(captain[0]):
+                if captain[0] in multipliers:
+                    multipliers[captain[0]] = multiplier
+            elif vice is not None and vice[0] in multipliers \
+                    and not _did_not_play(vice[0]):
+                multipliers[vice[0]] = multiplier
+        # Bench Boost: every bench pick's multiplier is already 1.
+        for element, _, multiplier, _, _ in bench:
+            if multiplier > 0 and element not in multipliers:
+                multipliers[element] = multiplier
+
+        points = sum(
+            int(self._points[element]) * multiplier
+            for element, multiplier in multipliers.items()
+        )
+        cost = self.transfers_cost.get(entry, 0)
+        return {
+            "points": points - cost,
+            "gross_points": points,
+            "transfers_cost": cost,
+            "auto_subs": subs,
+        }
+
+
+    @property
+    def scores_df(self) -> pd.DataFrame:
+        """Return every entry's provisional score, indexed by entry."""
+        df = pd.DataFrame.from_dict(self.scores, orient="index")
+        df.index.name = "entry"
+        return df
+
+
+    def matches_df(self, matches_df: pd.DataFrame) -> pd.DataFrame:
+        """Return the event's H2H matches with provisional points and
+        results, in the standings.MATCHES layout.
+
+        Arguments:
+            matches_df {pd.DataFrame} -- The league's matches
+                                         (standings.MATCHES).
+        """
+        df = matches_df[matches_df["event"] == self.event].copy()
+        points = {
+            entry: score["points"] for entry, score in self.scores.items()
+        }
+        for side in ("entry_1", "entry_2"):
+            live = df[f"{side}_entry"].map(points)
+            # Keep the API's points for the AVERAGE and untracked entries.
+            df[f"{side}_points"] = live.fillna(df[f"{side}_points"]).astype(
+                standings.MATCHES[f"{side}_points"]
+            )
+
+        diff = df["entry_1_points"].astype(int) - df["entry_2_points"]
+        for side, sign in (("entry_1", 1), ("entry_2", -1)):
+            df[f"{side}_win"] = (sign * diff > 0).astype("int8")
+            df[f"{side}_draw"] = (diff == 0).astype("int8")
+            df[f"{side}_loss"] = (sign * diff < 0).astype("int8")
+        return df
@@ -0,0 +1,263 @@
+import bisect
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+__all__ = (
+    "endpoint_template",
+    "EndpointStats",
+    "Registry",
+    "REGISTRY",
+)
+
+# Latency histogram bucket upper bounds (seconds), Prometheus-style.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The number of recent latencies kept per endpoint for percentiles.
+RESERVOIR_SIZE = 2048
+
+PERCENTILES = (50, 90, 99)
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_template(key: str) -> str:
+    """Return the endpoint template for a cache key (endpoint path), e.g.
+    "entry/123/event/4/picks" -> "entry/{id}/event/{id}/picks".
+
+    Arguments:
+        key {str} -- The endpoint path relative to the API base URL.
+    """
+    path = key.split("?", 1)[0].strip("/")
+    return _ID_RE.sub("/{id}", "/" + path).lstrip("/")
+
+
+class EndpointStats:
+    """Class representing the counters for one endpoint template.
+    """
+    COUNTERS = (
+        "requests",
+        "errors",
+        "retries",
+        "cache_hits",
+        "cache_misses",
+        "not_modified",
+        "coalesced",
+        "response_bytes",
+    )
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        self.requests: int = 0
+        self.errors: int = 0
+        self.retries: int = 0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.not_modified: int = 0
+        self.coalesced: int = 0
+        self.response_bytes: int = 0
+        self.latency_sum: float = 0.0
+        self.decode_sum: float = 0.0
+        self.buckets: List[int] = [0] * (len(BUCKETS) + 1)
+        self.recent: Deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return f"{classname}({self.snapshot()!r})"
+
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given latency percentile over recent requests.
+
+        Arguments:
+            pct {float} -- The percentile (0-100).
+        """
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        index = int(round(pct / 100.0 * (len(ordered) - 1)))
+        index = min(len(ordered) - 1, index)
+        return ordered[index]
+
+
+    def snapshot(self) -> dict:
+        """Return the counters and latency summary as a JSON-able dict."""
+        data: dict = {name: getattr(self, name) for name in self.COUNTERS}
+        data["latency_seconds_sum"] = self.latency_sum
+        data["decode_seconds_sum"] = self.decode_sum
+        for pct in PERCENTILES:
+            data[f"latency_p{pct}"] = self.percentile(pct)
+        return data
+
+
+class Registry:
+    """Class representing the per-endpoint fetch metrics of the process.
+    """
+    def __init__(self) -> None:
+        """Class constructor."""
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        return f"{self.__class__.__name__}({sorted(self._endpoints)!r})"
+
+
+    def _stats(self, key: str) -> EndpointStats:
+        """Return the stats for the key's template (lock must be held)."""
+        template = endpoint_template(key)
+        stats = self._endpoints.get(template)
+        if stats is None:
+            stats = self._endpoints[template] = EndpointStats()
+        return stats
+
+
+    def record_cache(self, key: str, hit: bool) -> None:
+        """Record a cache lookup.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            hit {bool} -- Whether the lookup was a hit.
+        """
+        with self._lock:
+            stats = self._stats(key)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+
+    def record_coalesced(self, key: str) -> None:
+        """Record a call which shared another caller's in-flight request.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+        """
+        with self._lock:
+            self._stats(key).coalesced += 1
+
+
+    def record_request(
+        self,
+        key: str,
+        latency: float,
+        response_bytes: int = 0,
+        decode_time: float = 0.0,
+        retries: int = 0,
+        not_modified: bool = False,
+        failed: bool = False,
+    ) -> None:
+        """Record an HTTP request.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            latency {float} -- The time spent on the network (seconds).
+            response_bytes {int} -- The size of the response body.
+            decode_time {float} -- The time spent decoding JSON (seconds).
+            retries {int} -- The number of retries the request needed.
+            not_modified {bool} -- Whether the response was a 304.
+            failed {bool} -- Whether the request failed.
+        """
+        with self._lock:
+            stats = self._stats(key)
+            stats.requests += 1
+            stats.errors += int(failed)
+            stats.retries += retries
+            stats.not_modified += int(not_modified)
+            stats.response_bytes += response_bytes
+            stats.latency_sum += latency
+            stats.decode_sum += decode_time
+            stats.buckets[bisect.bisect_left(BUCKETS, latency)] += 1
+            stats.recent.append(latency)
+
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self._endpoints.clear()
+
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return every endpoint's metrics as a JSON-able dict."""
+        with self._lock:
+            return {
+                template: stats.snapshot()
+                for template, stats in sorted(self._endpoints.items())
+            }
+
+
+    def to_json(self) -> str:
+        """Return the metrics snapshot as a JSON string."""
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            for name in EndpointStats.COUNTERS:
+                metric = f"fpl_fetch_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for template, stats in endpoints:
+                    lines.append(
+                        f'{metric}{{endpoint="{template}"}} '
+                        f"{getattr(stats, name)}"
+                    )
+
+            metric = "fpl_fetch_decode_seconds_total"
+            lines.append(f"# TYPE {metric} counter")
+            for template, stats in endpoints:
+                lines.append(
+                    f'{metric}{{endpoint="{template}"}} {stats.decode_sum}'
+                )
+
+            metric = "fpl_fetch_latency_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for template, stats in endpoints:
+                cumulative = 0
+                bounds = [str(b) for b in BUCKETS] + ["+Inf"]
+                for bound, count in zip(bounds, stats.buckets):
+                    cumulative += count
+                    lines.append(
+                        f'{metric}_bucket{{endpoint="{template}",'
+                        f'le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{metric}_sum{{endpoint="{template}"}} '
+                    f"{stats.latency_sum}"
+                )
+                lines.append(
+                    f'{metric}_count{{endpoint="{template}"}} '
+                    f"{stats.requests}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+    def write(self, path: str) -> None:
+        """Atomically write the metrics to a file, e.g. for the Prometheus
+        node exporter's textfile collector.
+
+        Arguments:
+            path {str} -- The output path. A ".json" suffix writes the JSON
+                          snapshot, anything else the Prometheus format.
+        """
+        text = self.to_json() if path.endswith(".json") \
+            else self.to_prometheus()
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(text)
+        os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
@@ -0,0 +1,456 @@
+"""A local mock of the FPL API, for offline, reproducible runs.
+
+MockServer serves every endpoint fetch.py uses - bootstrap, entries, entry
+history, picks, element summaries and H2H standings and matches - from
+recorded payloads where given, and otherwise from SyntheticSeason, with one
+generated league per League ID (entries are League ID * 100000 + n), so
+leagues of any size can be served without generating them up front.
+
+Latency and errors can be injected. Both are a pure function of the seed,
+the path and how many times the path has been requested, so a run is
+repeatable however its requests interleave.
+
+Point the fetch layer at it with fetch.set_base_url(server.url) (or the
+FPL_BASE_URL environment variable), giving it a fresh cache, and lift the
+client-side rate limit (ratelimit.configure(None, shared=False)) to
+measure the pipeline rather than the limiter. Run standalone with e.g.:
+    ./Taskfile mock --entries 5000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import http.server
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import decode
+import synthetic
+
+__all__ = (
+    "save_recording",
+    "load_recording",
+    "MockServer",
+    "main",
+)
+
+# Path prefix the API is served under, as in the live API.
+PREFIX = "/api/"
+
+# The largest league: entry IDs are League ID * 100000 + n.
+MAX_ENTRIES = 99999
+
+# Generated seasons kept in memory; the least recently used is regenerated
+# when next requested.
+DEFAULT_MAX_SEASONS = 16
+
+
+def _normalize(key: str) -> str:
+    """Return an endpoint key without slashes around the path, so keys
+    match however the client spells them."""
+    path, _, query = key.partition("?")
+    path = path.strip("/")
+    return f"{path}?{query}" if query else path
+
+
+def save_recording(path: str, payloads: Dict[str, Any]) -> None:
+    """Record payloads as JSON lines of {"key": ..., "body": ...}.
+
+    Arguments:
+        path {str} -- The file to write.
+        payloads {Dict[str, Any]} -- JSON payloads keyed by endpoint path
+                                     (as fetch.PATHS), e.g. captured from
+                                     the live API.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        for key, body in payloads.items():
+            file.write(json.dumps({"key": key, "body": body}) + "\n")
+
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """Load payloads recorded with save_recording.
+
+    Arguments:
+        path {str} -- The file to read.
+    """
+    payloads = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                payloads[record["key"]] = record["body"]
+    return payloads
+
+
+class MockServer:
+    """Class representing a local HTTP server mocking the FPL API.
+
+    Use as a context manager (or call start() and stop()); `url` is the API
+    root to pass to fetch.set_base_url.
+    """
+    def __init__(
+        self,
+        n_entries: int = 20,
+        n_elements: int = 600,
+        n_events: int = 38,
+        finished: Optional[int] = None,
+        seed: int = 0,
+        recorded: Optional[Dict[str, Any]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: float = 1.0,
+        max_seasons: int = DEFAULT_MAX_SEASONS,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            n_entries {int} -- Entries in every generated league (at most
+                               MAX_ENTRIES).
+            n_elements {int} -- See synthetic.SyntheticSeason.
+            n_events {int} -- See synthetic.SyntheticSeason.
+            finished {Optional[int]} -- See synthetic.SyntheticSeason.
+            seed {int} -- Seeds the generated payloads and the injected
+                          latency and errors.
+            recorded {Optional[Dict[str, Any]]}
+                -- Payloads keyed by endpoint path, served in preference to
+                   generated ones (see load_recording).
+            latency {float} -- The delay before every response (seconds).
+            jitter {float} -- The mean of an exponentially distributed
+                              extra delay (seconds), giving a latency tail.
+            error_rate {float} -- The fraction of requests which fail.
+            error_status {int} -- The status of failed requests.
+            retry_after {float} -- The Retry-After sent with a 429.
+            max_seasons {int} -- The number of generated leagues to keep.
+            host {str} -- The interface to listen on.
+            port {int} -- The port to listen on (0 for any free port).
+        """
+        if n_entries > MAX_ENTRIES:
+            raise ValueError(f"At most {MAX_ENTRIES} entries per league")
+        self.n_entries: int = n_entries
+        self.n_elements: int = n_elements
+        self.n_events: int = n_events
+        self.finished: Optional[int] = finished
+        self.seed: int = seed
+        self.recorded: Dict[str, Any] = {
+            _normalize(key): body for key, body in (recorded or {}).items()
+        }
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.retry_after: float = retry_after
+        self.max_seasons: int = max_seasons
+
+        self._lock = threading.Lock()
+        self._seasons: "OrderedDict[int, synthetic.SyntheticSeason]" = \
+            OrderedDict()
+        self._counts: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {
+            "requests": 0, "errors": 0, "not_found": 0, "not_modified": 0,
+        }
+        self._routes: Tuple[Tuple[Any, Callable], ...] = (
+            (re.compile(r"^bootstrap-static$"), self._bootstrap),
+            (re.compile(r"^entry/(\d+)$"), self._entry),
+            (re.compile(r"^entry/(\d+)/history$"), self._entry_history),
+            (re.compile(r"^entry/(\d+)/event/(\d+)/picks$"), self._picks),
+            (re.compile(r"^element-summary/(\d+)$"), self._element),
+            (re.compile(r"^leagues-h2h/(\d+)/standings$"), self._league),
+            (
+                re.compile(r"^leagues-h2h-matches/league/(\d+)$"),
+                self._league_matches,
+            ),
+        )
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one write, flushed per request, so
+            # keep-alive clients don't wait on delayed ACKs.
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url: str = (
+            f"http://{host}:{self.server.server_port}{PREFIX}"
+        )
+        self._thread: Optional[threading.Thread] = None
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(url={self.url!r}, n_entries={self.n_entries}, "
+            f"latency={self.latency}, jitter={self.jitter}, "
+            f"error_rate={self.error_rate})"
+        )
+
+
+    def __enter__(self) -> "MockServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+    def start(self) -> None:
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    def season(self, league_id: int) -> synthetic.SyntheticSeason:
+        """Return the generated season of a league, creating it on first
+        use (or again after it was dropped to keep within max_seasons).
+
+        Arguments:
+            league_id {int} -- The H2H League ID.
+        """
+        with self._lock:
+            season = self._seasons.get(league_id)
+            if season is None:
+                season = self._seasons[league_id] = synthetic.SyntheticSeason(
+                    n_entries=self.n_entries,
+                    n_elements=self.n_elements,
+                    n_events=self.n_events,
+                    finished=self.finished,
+                    league_id=league_id,
+                    seed=self.seed,
+                )
+                while len(self._seasons) > self.max_seasons:
+                    self._seasons.popitem(last=False)
+            self._seasons.move_to_end(league_id)
+        return season
+
+
+    def _entry_season(
+        self, entry_id: int
+    ) -> Optional[synthetic.SyntheticSeason]:
+        """Return the season of the league an entry belongs to, if any."""
+        league_id, number = divmod(entry_id, 100000)
+        if league_id < 1 or not 1 <= number <= self.n_entries:
+            return None
+        return self.season(league_id)
+
+
+    def _bootstrap(self, query):
+        return self.season(1).bootstrap_json()
+
+
+    def _entry(self, query, entry_id):
+        season = self._entry_season(int(entry_id))
+        return season and season.entry_json(int(entry_id))
+
+
+    def _entry_history(self, query, entry_id):
+        season = self._entry_season(int(entry_id))
+        return season and season.entry_history_json(int(entry_id))
+
+
+    def _picks(self, query, entry_id, event):
+        season = self._entry_season(int(entry_id))
+        if season is None or not 1 <= int(event) <= season.finished:
+            return None
+        return season.picks_json(int(entry_id), int(event))
+
+
+    def _element(self, query, element_id):
+        if not 1 <= int(element_id) <= self.n_elements:
+            return None
+        return self.season(1).element_json(int(element_id))
+
+
+    def _league(self, query, league_id):
+        page = int(query.get("page_standings", ["1"])[0])
+        return self.season(int(league_id)).league_json(page)
+
+
+    def _league_matches(self, query, league_id):
+        page = int(query.get("page", ["1"])[0])
+        event = query.get("event")
+        return self.season(int(league_id)).league_matches_json(
+            page, int(event[0]) if event else None
+        )
+
+
+    def _payload(self, key: str) -> Optional[Any]:
+        """Return the payload for a normalized endpoint key, if any."""
+        if key in self.recorded:
+            return self.recorded[key]
+        path, _, query = key.partition("?")
+        params = urllib.parse.parse_qs(query)
+        for pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match:
+                return handler(params, *match.groups())
+        return None
+
+
+    def _fault(self, key: str) -> Tuple[float, bool]:
+        """Return the injected delay for this request, and whether it
+        fails."""
+        with self._lock:
+            n = self._counts[key] = self._counts.get(key, 0) + 1
+        rng = random.Random(zlib.crc32(f"{self.seed}:{key}:{n}".encode()))
+        delay = self.latency
+        if self.jitter > 0:
+            delay += rng.expovariate(1.0 / self.jitter)
+        return delay, rng.random() < self.error_rate
+
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+
+    def _handle(self, handler: http.server.BaseHTTPRequestHandler) -> None:
+        """Respond to one GET request."""
+        self._count("requests")
+        path = handler.path
+        if path.startswith(PREFIX):
+            path = path[len(PREFIX):]
+        key = _normalize(path)
+
+        delay, fails = self._fault(key)
+        if delay > 0:
+            time.sleep(delay)
+        if fails:
+            self._count("errors")
+            body = b'{"detail": "Injected error."}'
+            handler.send_response(self.error_status)
+            if self.error_status == 429:
+                handler.send_header("Retry-After", f"{self.retry_after:g}")
+            self._send(handler, body)
+            return
+
+        try:
+            payload = self._payload(key)
+        except (ValueError, IndexError):
+            payload = None
+        if payload is None:
+            self._count("not_found")
+            handler.send_response(404)
+            self._send(handler, b'{"detail": "Not found."}')
+            return
+
+        body = decode.dumps(payload)
+        etag = f'"{zlib.crc32(body):08x}"'
+        if handler.headers.get("If-None-Match") == etag:
+            self._count("not_modified")
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        handler.send_response(200)
+        handler.send_header("ETag", etag)
+        self._send(handler, body)
+
+
+    @staticmethod
+    def _send(
+        handler: http.server.BaseHTTPRequestHandler, body: bytes
+    ) -> None:
+        """Finish a response with a JSON body."""
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def main(argv=None) -> int:
+    """Command-line entry point: serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--entries", type=int, default=20,
+        help="Entries in every league (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--events", type=int, default=38,
+        help="Gameweeks in the season (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--finished", type=int,
+        help="The last finished Gameweek (default: half the season)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--recording", metavar="FILE",
+        help="Serve payloads recorded with save_recording first",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="Delay before every response, in seconds (default: "
+             "%(default)s)",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0,
+        help="Mean extra exponential delay, in seconds (default: "
+             "%(default)s)",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0,
+        help="Fraction of requests which fail (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=503,
+        help="Status of failed requests (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    server = MockServer(
+        n_entries=args.entries,
+        n_events=args.events,
+        finished=args.finished,
+        seed=args.seed,
+        recorded=load_recording(args.recording) if args.recording else None,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Serving the mock FPL API at {server.url}")
+    print(f"Use it with: FPL_BASE_URL={server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Pairwise squad overlaps between entries, computed with sparse matrices.
+
+Each event's picks become a sparse entry x element matrix; products of
+these matrices give every pair of entries' shared players, differentials and
+captaincy overlap at once.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Dict, NamedTuple
+
+__all__ = (
+    "EventMatrices",
+    "Overlaps",
+    "event_matrices",
+    "overlaps",
+)
+
+
+class EventMatrices(NamedTuple):
+    """One event's picks as sparse (entry, element) matrices. Rows follow
+    the entries array and columns follow the elements array."""
+    squad: sparse.csr_matrix
+    starting: sparse.csr_matrix
+    captain: sparse.csr_matrix
+
+
+class Overlaps(NamedTuple):
+    """Dense (entry, entry) overlap counts for one event."""
+    shared: np.ndarray
+    shared_starting: np.ndarray
+    same_captain: np.ndarray
+    differentials: np.ndarray
+
+
+def event_matrices(
+    picks_df: pd.DataFrame, entries: np.ndarray, elements: np.ndarray
+) -> Dict[int, EventMatrices]:
+    """Return each event's picks as sparse (entry, element) matrices.
+
+    Arguments:
+        picks_df {pd.DataFrame} -- Picks (schema.PICKS).
+        entries {np.ndarray} -- The Entry IDs giving the row order, sorted.
+        elements {np.ndarray} -- The Element IDs giving the column order,
+                                 sorted.
+    """
+    shape = (len(entries), len(elements))
+    rows = np.searchsorted(entries, picks_df["entry"].to_numpy())
+    columns = np.searchsorted(elements, picks_df["element"].to_numpy())
+    events = picks_df["event"].to_numpy()
+    starting = picks_df["multiplier"].to_numpy() > 0
+    captain = picks_df["is_captain"].to_numpy(bool)
+
+    def _matrix(mask: np.ndarray) -> sparse.csr_matrix:
+        return sparse.csr_matrix(
+            (np.ones(mask.sum(), dtype=np.int16), (rows[mask], columns[mask])),
+            shape=shape,
+        )
+
+    matrices = {}
+    for event in np.unique(events):
+        in_event = events == event
+        matrices[int(event)] = EventMatrices(
+            squad=_matrix(in_event),
+            starting=_matrix(in_event & starting),
+            captain=_matrix(in_event & captain),
+        )
+    return matrices
+
+
+def overlaps(matrices: EventMatrices) -> Overlaps:
+    """Return every pair of entries' overlaps in one event.
+
+    `differentials[i, j]` counts entry i's players that entry j doesn't own.
+
+    Arguments:
+        matrices {EventMatrices} -- The event's picks.
+    """
+    shared = (matrices.squad @ matrices.squad.T).toarray()
+    squad_sizes = np.asarray(matrices.squad.sum(axis=1)).ravel()
+    return Overlaps(
+        shared=shared.astype(np.int8),
+        shared_starting=(
+            matrices.starting @ matrices.starting.T
+        ).toarray().astype(np.int8),
+        same_captain=(
+            matrices.captain @ matrices.captain.T
+        ).toarray().astype(bool),
+        differentials=(squad_sizes[:, None] - shared).astype(np.int8),
+    )
@@ -0,0 +1,576 @@
+"""A shared, in-process data plane for serving many leagues.
+
+One DataPlane holds the data every league needs - the bootstrap tables,
+the element summaries and the element cube and transfer planner built
+from them - once, and a bounded LRU of per-league models which reference
+those shared tables rather than copying them. Viewers get read-only
+LeagueView objects over the models, so memory and upstream requests grow
+with the number of distinct leagues, not the number of viewers.
+Concurrent requests for the same league are coalesced.
+"""
+import functools
+import threading
+from collections import OrderedDict
+from typing import (
+    Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
+)
+
+import pandas as pd
+
+import cube
+import data
+import error
+import fetch
+import planner
+import process
+import singleflight
+
+__all__ = (
+    "DEFAULT_MAX_LEAGUES",
+    "DEFAULT_PLANNER_EVENTS",
+    "LeagueModel",
+    "LeagueView",
+    "DataPlane",
+)
+
+DEFAULT_MAX_LEAGUES = 32
+
+# The number of upcoming events the shared transfer planner covers.
+DEFAULT_PLANNER_EVENTS = 8
+
+T = TypeVar("T")
+
+
+class LeagueModel:
+    """Class representing one league's tables, owned by a DataPlane.
+
+    Only the plane updates a model; viewers see it through a LeagueView.
+    """
+    def __init__(
+        self,
+        plane: "DataPlane",
+        league: data.H2HLeague,
+        history: data.LeagueHistory,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            plane {DataPlane} -- The plane holding the shared tables.
+            league {data.H2HLeague} -- The league's current standings.
+            history {data.LeagueHistory} -- The league's per-Gameweek tables.
+        """
+        self.plane: "DataPlane" = plane
+        self.league: data.H2HLeague = league
+        self.history: data.LeagueHistory = history
+        self.finished: Tuple[int, ...] = tuple(history.events)
+        # The ownership matrices of the latest history version asked for.
+        self._ownership: Optional[
+            Tuple[data.LeagueHistory, data.LeagueOwnership]
+        ] = None
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(id={self.league.id!r}, "
+            f"events={list(self.finished)!r})"
+        )
+
+
+    def ownership(self, history: data.LeagueHistory) -> data.LeagueOwnership:
+        """Return the ownership matrices of a version of the league's
+        history, building them once per version.
+
+        Arguments:
+            history {data.LeagueHistory} -- The version (this model's
+                                            history, now or before an
+                                            update).
+        """
+        cached = self._ownership
+        if cached is not None and cached[0] is history:
+            return cached[1]
+
+        ownership = self.plane.coalesce(
+            ("ownership", id(history)),
+            lambda: data.LeagueOwnership.from_picks(
+                history.id, history.picks_df
+            ),
+        )
+        self._ownership = (history, ownership)
+        return ownership
+
+
+class LeagueView:
+    """Class representing a read-only view of a league for one viewer.
+
+    A view keeps the version of the league's tables current when it was
+    created, so one render sees a consistent league even if the plane
+    applies newly finished events meanwhile. The model's LeagueHistory is
+    not exposed, only its tables; each is the plane's shared object, not a
+    copy, so callers must copy a table before modifying it.
+    """
+    def __init__(self, model: LeagueModel) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            model {LeagueModel} -- The league model to view.
+        """
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_league", model.league)
+        object.__setattr__(self, "_history", model.history)
+        object.__setattr__(self, "_finished", model.finished)
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return f"{classname}(id={self.id!r})"
+
+
+    def __setattr__(self, name, value) -> None:
+        """Views are read-only."""
+        raise AttributeError(f"{self.__class__.__name__} is read-only")
+
+
+    @property
+    def id(self) -> int:
+        """Return the League ID."""
+        return self._league.id
+
+
+    @property
+    def name(self) -> str:
+        """Return the league's name."""
+        return self._league.name
+
+
+    @property
+    def standings_df(self) -> pd.DataFrame:
+        """Return the current standings."""
+        return self._league.standings_df
+
+
+    @property
+    def display_df(self) -> pd.DataFrame:
+        """Return the current standings for display."""
+        return self._league.display_df
+
+
+    @property
+    def events(self) -> List[int]:
+        """Return the finished events included."""
+        return list(self._finished)
+
+
+    @property
+    def matches_df(self) -> pd.DataFrame:
+        """Return the H2H matches in the included events."""
+        return self._history.matches_df
+
+
+    @property
+    def standings_history_df(self) -> pd.DataFrame:
+        """Return the standings after each included event."""
+        return self._history.standings_df
+
+
+    @property
+    def picks_df(self) -> pd.DataFrame:
+        """Return every entry's picks in the included events."""
+        return self._history.picks_df
+
+
+    @property
+    def entry_history_df(self) -> pd.DataFrame:
+        """Return every entry's history in the included events."""
+        return self._history.entry_history_df
+
+
+    @property
+    def automatic_subs_df(self) -> pd.DataFrame:
+        """Return every entry's automatic subs in the included events."""
+        return self._history.automatic_subs_df
+
+
+    @property
+    def stats_df(self) -> pd.DataFrame:
+        """Return per-entry season statistics. See
+        data.LeagueHistory.stats_df."""
+        return self._history.stats_df
+
+
+    @property
+    def ownership(self) -> data.LeagueOwnership:
+        """Return who owns whom across the league's entries, shared by
+        every view of this version of the league."""
+        return self._model.ownership(self._history)
+
+
+    @property
+    def bootstrap(self) -> data.Bootstrap:
+        """Return the shared bootstrap tables."""
+        return self._model.plane.bootstrap
+
+
+    @property
+    def element_history_df(self) -> pd.DataFrame:
+        """Return the shared element history, loading any of this league's
+        picked elements not yet held by the plane.
+
+        The table covers every league's elements; lookups by element (e.g.
+        breakdown.compute_breakdown) only touch this league's.
+        """
+        return self._model.plane.element_history_df(
+            self._history.element_ids
+        )
+
+
+    @property
+    def element_cube(self) -> cube.ElementCube:
+        """Return the shared element history as an ElementCube, loading any
+        of this league's picked elements not yet held (see
+        element_history_df)."""
+        return self._model.plane.element_cube(self._history.element_ids)
+
+
+    def points_breakdown(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Break every entry's points down by player. See
+        data.LeagueHistory.points_breakdown."""
+        return self._history.points_breakdown(self.element_history_df)
+
+
+class DataPlane:
+    """Class representing the data shared by every league served from this
+    process.
+    """
+    def __init__(
+        self,
+        max_leagues: int = DEFAULT_MAX_LEAGUES,
+        get_bootstrap_func: Callable[[], dict] = fetch.get_bootstrap_json,
+        get_league_func: Callable[[int], Iterable[dict]] =
+            fetch.iter_league_pages,
+        get_matches_func: Callable[..., Iterable[dict]] =
+            fetch.iter_league_matches_pages,
+        get_picks_func: Callable[[Iterable[int], Iterable[int]], Dict] =
+            fetch.get_picks_json,
+        get_elements_func: Callable[[Iterable[int]], Dict] =
+            fetch.get_elements_json,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            max_leagues {int} -- The number of league models to keep; the
+                                 least recently viewed is dropped first.
+            get_bootstrap_func {Callable[[], dict]}
+                -- Returns the bootstrap JSON.
+            get_league_func {Callable[[int], Iterable[dict]]}
+                -- Returns a league's standings pages, given its ID.
+            get_matches_func {Callable[..., Iterable[dict]]}
+                -- Returns a league's matches pages, given its ID and
+                   event_id.
+            get_picks_func {Callable[[Iterable[int], Iterable[int]], Dict]}
+                -- See data.LeagueHistory.create.
+            get_elements_func {Callable[[Iterable[int]], Dict]}
+                -- Returns element summary JSON keyed by Element ID.
+        """
+        self.max_leagues: int = max_leagues
+        self.get_bootstrap_func = get_bootstrap_func
+        self.get_league_func = get_league_func
+        self.get_matches_func = get_matches_func
+        self.get_picks_func = get_picks_func
+        self.get_elements_func = get_elements_func
+
+        self._lock = threading.Lock()
+        self._flights = singleflight.Group()
+        self._models: "OrderedDict[int, LeagueModel]" = OrderedDict()
+        self._bootstrap_json: Optional[dict] = None
+        self._bootstrap: Optional[data.Bootstrap] = None
+        self._element_history_df: pd.DataFrame = \
+            process.element_history_df_from_json([])
+        self._element_fixtures_df: pd.DataFrame = \
+            process.element_fixtures_df_from_json({})
+        self._elements: frozenset = frozenset()
+        self._cube: Optional[Tuple[pd.DataFrame, cube.ElementCube]] = None
+        self._elements_finished: Optional[Tuple[int, ...]] = None
+        self._planner: Optional[
+            Tuple[data.Bootstrap, Tuple[int, ...], planner.TransferPlanner]
+        ] = None
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        with self._lock:
+            leagues = list(self._models)
+            elements = len(self._elements)
+        return (
+            f"{classname}(leagues={leagues!r}, elements={elements}, "
+            f"max_leagues={self.max_leagues!r})"
+        )
+
+
+    @property
+    def bootstrap(self) -> data.Bootstrap:
+        """Return the shared bootstrap tables, fetching them on first use."""
+        if self._bootstrap is None:
+            self.refresh()
+        return self._bootstrap
+
+
+    @property
+    def finished(self) -> Tuple[int, ...]:
+        """Return the finished events, per the shared bootstrap."""
+        events = self.bootstrap.json_data["events"]
+        return tuple(event["id"] for event in events if event["finished"])
+
+
+    def refresh(self) -> data.Bootstrap:
+        """Re-read the bootstrap JSON (served from the fetch cache until its
+        TTL expires), rebuilding the shared tables only if it changed."""
+        json_data = self.get_bootstrap_func()
+        with self._lock:
+            if json_data is not self._bootstrap_json:
+                bootstrap = data.Bootstrap.create(lambda: json_data)
+                self._bootstrap_json = json_data
+                self._bootstrap = bootstrap
+            return self._bootstrap
+
+
+    def element_history_df(self, element_ids: Iterable[int]) -> pd.DataFrame:
+        """Return the shared element history table, first loading any of
+        the given elements not yet held.
+
+        Every held element is refetched once the finished events change,
+        since each element summary gains a row.
+
+        Arguments:
+            element_ids {Iterable[int]} -- The elements needed.
+        """
+        finished = self.finished
+        with self._lock:
+            current = self._elements \
+                if finished == self._elements_finished else frozenset()
+            missing = sorted(
+                self._elements.union(element_ids).difference(current)
+            )
+            if not missing:
+                return self._element_history_df
+
+        self._flights.do(
+            ("elements", finished, tuple(missing)),
+            lambda: self._load_elements(finished, missing),
+        )
+        with self._lock:
+            return self._element_history_df
+
+
+    def element_cube(self, element_ids: Iterable[int]) -> cube.ElementCube:
+        """Return the shared element history as an ElementCube, first
+        loading any of the given elements not yet held.
+
+        The cube, with its cumulative sums for window aggregates, is built
+        once per version of the element history table, i.e. when elements
+        are loaded or the finished events change.
+
+        Arguments:
+            element_ids {Iterable[int]} -- The elements needed.
+        """
+        element_history_df = self.element_history_df(element_ids)
+        cached = self._cube
+        if cached is not None and cached[0] is element_history_df:
+            return cached[1]
+
+        element_cube = self.coalesce(
+            ("cube", id(element_history_df)),
+            lambda: cube.ElementCube.from_history_df(element_history_df),
+        )
+        self._cube = (element_history_df, element_cube)
+        return element_cube
+
+
+    def _load_elements(
+        self, finished: Tuple[int, ...], missing: List[int]
+    ) -> None:
+        """Fetch element summaries into the shared tables."""
+        try:
+            summaries = self.get_elements_func(missing)
+            delta_df = process.element_history_df_from_json(
+                summaries.values()
+            )
+            fixtures_df = process.element_fixtures_df_from_json(summaries)
+        except KeyError as exc:
+            msg = f"Error in structure of downloaded JSON: {exc}"
+            raise error.JSONError(msg) from exc
+
+        with self._lock:
+            if finished == self._elements_finished:
+                delta_df = delta_df[~delta_df["element"].isin(self._elements)]
+                fixtures_df = fixtures_df[
+                    ~fixtures_df["element"].isin(self._elements)
+                ]
+                self._element_history_df = pd.concat(
+                    [self._element_history_df, delta_df], ignore_index=True
+                )
+                self._element_fixtures_df = pd.concat(
+                    [self._element_fixtures_df, fixtures_df],
+                    ignore_index=True,
+                )
+                self._elements = self._elements.union(missing)
+            else:
+                # The first load since the finished events changed starts
+                # new tables.
+                self._element_history_df = delta_df
+                self._element_fixtures_df = fixtures_df
+                self._elements = frozenset(missing)
+                self._elements_finished = finished
+
+
+    def transfer_planner(
+        self, n_events: int = DEFAULT_PLANNER_EVENTS
+    ) -> Optional[planner.TransferPlanner]:
+        """Return the transfer planner over the next upcoming events, shared
+        by every league.
+
+        It is built from the plane's element summaries (loading every
+        element's) and kept until the bootstrap or the upcoming events
+        change.
+
+        Arguments:
+            n_events {int} -- The number of upcoming events to cover.
+
+        Returns:
+            Optional[planner.TransferPlanner] -- None once every event has
+                                                 finished.
+        """
+        bootstrap = self.bootstrap
+        upcoming = tuple(
+            event["id"] for event in bootstrap.json_data["events"]
+            if not event["finished"]
+        )[:n_events]
+        if not upcoming:
+            return None
+
+        cached = self._planner
+        if cached is not None and cached[0] is bootstrap \
+                and cached[1] == upcoming:
+            return cached[2]
+
+        def _build():
+            elements = bootstrap.json_data["elements"]
+            self.element_history_df(element["id"] for element in elements)
+            with self._lock:
+                fixtures_df = self._element_fixtures_df
+            return planner.TransferPlanner.from_fixtures(
+                bootstrap.json_data, fixtures_df, upcoming
+            )
+
+        transfer_planner, _ = self._flights.do(
+            ("planner", id(bootstrap), upcoming), _build
+        )
+        self._planner = (bootstrap, upcoming, transfer_planner)
+        return transfer_planner
+
+
+    def league(self, league_id: int) -> LeagueView:
+        """Return a read-only view of a league, building its model on first
+        use and applying any newly finished events.
+
+        Arguments:
+            league_id {int} -- The H2H League ID.
+        """
+        finished = self.finished
+        with self._lock:
+            model = self._models.get(league_id)
+            if model is not None:
+                self._models.move_to_end(league_id)
+
+        if model is None:
+            model, _ = self._flights.do(
+                ("league", league_id),
+                lambda: self._build(league_id, finished),
+            )
+        elif model.finished != finished:
+            self._flights.do(
+                ("update", league_id, finished),
+                lambda: self._update(model, finished),
+            )
+        # The model's tables are swapped under the lock (see _update).
+        with self._lock:
+            return LeagueView(model)
+
+
+    def _build(self, league_id: int, finished: Tuple[int, ...]) -> LeagueModel:
+        """Create a league's model and add it to the LRU."""
+        league = data.H2HLeague.create(
+            functools.partial(self.get_league_func, league_id)
+        )
+        history = data.LeagueHistory.create(
+            league_id,
+            finished,
+            functools.partial(self.get_matches_func, league_id),
+            self.get_picks_func,
+        )
+        model = LeagueModel(self, league, history)
+        model.finished = finished
+
+        with self._lock:
+            self._models[league_id] = model
+            self._models.move_to_end(league_id)
+            while len(self._models) > self.max_leagues:
+                self._models.popitem(last=False)
+        return model
+
+
+    def _update(self, model: LeagueModel, finished: Tuple[int, ...]) -> None:
+        """Apply newly finished events to a league's model.
+
+        Fresh standings and history replace the model's in one step, so
+        viewers never see a half-updated league.
+        """
+        league_id = model.league.id
+        league = data.H2HLeague.create(
+            functools.partial(self.get_league_func, league_id)
+        )
+        history = data.LeagueHistory(**vars(model.history))
+        history.update(
+            finished,
+            functools.partial(self.get_matches_func, league_id),
+            self.get_picks_func,
+        )
+        with self._lock:
+            model.league, model.history = league, history
+            model.finished = finished
+
+
+    def coalesce(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Call `func`, sharing the call with any concurrent caller for the
+        same key (see singleflight.Group), e.g. to build a table derived
+        from a model once.
+
+        Arguments:
+            key {Hashable} -- Identifies equivalent calls.
+            func {Callable[[], T]} -- The call to make.
+        """
+        result, _ = self._flights.do(key, func)
+        return result
+
+
+    def evict(self, league_id: Optional[int] = None) -> None:
+        """Drop one league's model, or every model if no ID is given.
+
+        Arguments:
+            league_id {Optional[int]} -- The H2H League ID.
+        """
+        with self._lock:
+            if league_id is None:
+                self._models.clear()
+            else:
+                self._models.pop(league_id, None)
+
+
+    @property
+    def leagues(self) -> List[int]:
+        """Return the leagues held, least recently viewed first."""
+        with self._lock:
+            return list(self._models)
@@ -0,0 +1,417 @@
+"""Transfer planning over the next few Gameweeks.
+
+TransferPlanner holds dense per-element arrays (cost, type, team) and each
+element's expected points in every upcoming event: a base rate (e.g. points
+per game) scaled by the difficulty of each fixture in the event, so blank
+Gameweeks score nothing and double Gameweeks score twice.
+
+plan() finds the transfers which most increase the squad's expected points
+over a horizon, net of hits, by branch and bound: the sets of players sold
+are tried best bound first, and for each the players bought are chosen one
+position slot at a time, pruning on the budget, the three-per-team rule and
+an upper bound from the best remaining candidates. Players are swapped like
+for like, so the squad keeps its composition. Candidates dominated (by
+score and cost) by players from enough distinct teams are dropped up front,
+which cannot change the optimum.
+"""
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import process
+
+__all__ = (
+    "DIFFICULTY_FACTORS",
+    "Plan",
+    "TransferPlanner",
+)
+
+# Expected points multiplier for each fixture difficulty rating (1-5).
+DIFFICULTY_FACTORS = (0.0, 1.25, 1.1, 1.0, 0.85, 0.7)
+
+SQUAD_SIZE = 15
+MAX_PER_TEAM = 3
+HIT_COST = 4
+
+
+class Plan(NamedTuple):
+    """A set of transfers and its value over the horizon."""
+    # (element sold, element bought) pairs.
+    transfers: Tuple[Tuple[int, int], ...]
+    # Expected points gained over the horizon, net of hits.
+    gain: float
+    # Points deducted for transfers beyond the free ones.
+    hits: int
+    # Money in the bank after the transfers (tenths of a million).
+    bank: int
+
+
+class TransferPlanner:
+    """Class representing the per-element arrays used to plan transfers.
+
+    Arrays are indexed by Element ID; IDs missing from the bootstrap have
+    `element_type` 0 and are never candidates.
+    """
+    def __init__(
+        self,
+        events: Sequence[int],
+        cost: np.ndarray,
+        element_type: np.ndarray,
+        team: np.ndarray,
+        expected: np.ndarray,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            events {Sequence[int]} -- The upcoming events, in order.
+            cost {np.ndarray} -- Each element's price (tenths of a million).
+            element_type {np.ndarray} -- Each element's type (1-4).
+            team {np.ndarray} -- Each element's PL team.
+            expected {np.ndarray} -- Expected points of shape
+                                     (element, len(events)).
+        """
+        self.events: Tuple[int, ...] = tuple(events)
+        self.cost: np.ndarray = cost
+        self.element_type: np.ndarray = element_type
+        self.team: np.ndarray = team
+        self.expected: np.ndarray = expected
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(events={list(self.events)!r}, "
+            f"elements={int((self.element_type > 0).sum())})"
+        )
+
+
+    def scores(self, horizon: int) -> np.ndarray:
+        """Return every element's expected points over the next `horizon`
+        events."""
+        return self.expected[:, :horizon].sum(axis=1)
+
+
+    def plan(
+        self,
+        squad: Iterable[int],
+        bank: int,
+        horizon: int = 3,
+        max_transfers: int = 2,
+        free_transfers: int = 1,
+        selling_prices: Optional[Dict[int, int]] = None,
+    ) -> List[Plan]:
+        """Return the best plan for each number of transfers.
+
+        Arguments:
+            squad {Iterable[int]} -- The 15 Element IDs in the squad.
+            bank {int} -- Money in the bank (tenths of a million).
+            horizon {int} -- The number of upcoming events to optimise over.
+            max_transfers {int} -- The most transfers to consider.
+            free_transfers {int} -- Transfers available without a hit.
+            selling_prices {Optional[Dict[int, int]]}
+                -- Selling price of squad elements, if not their now_cost.
+
+        Returns:
+            List[Plan] -- The best plan with 0, 1, ... max_transfers
+                          transfers (omitting counts with no legal plan),
+                          best first.
+        """
+        squad = np.asarray(list(squad), dtype=np.int64)
+        score = self.scores(horizon)
+        sell = np.array([
+            (selling_prices or {}).get(int(element), self.cost[element])
+            for element in squad
+        ], dtype=np.int64)
+        counts = np.bincount(self.team[squad], minlength=self.team.max() + 1)
+
+        owned = np.zeros(len(self.cost), dtype=bool)
+        owned[squad] = True
+        candidates = {
+            element_type: self._candidates(
+                element_type, score, owned, max_transfers
+            )
+            for element_type in np.unique(self.element_type[squad]).tolist()
+        }
+
+        plans = []
+        for k in range(max_transfers + 1):
+            hits = max(k - free_transfers, 0) * HIT_COST
+            plan = self._best(
+                k, squad, sell, bank, counts, score, candidates, hits
+            )
+            if plan is not None:
+                plans.append(plan)
+        return sorted(plans, key=lambda plan: -plan.gain)
+
+
+    def _candidates(
+        self,
+        element_type: int,
+        score: np.ndarray,
+        owned: np.ndarray,
+        max_transfers: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the elements of a type worth buying, best first, with
+        their scores.
+
+        An element is dropped when players from enough distinct teams score
+        at least as much for no more money: one of them is always free to
+        take its place, as only the other buys and the full teams can block
+        them.
+        """
+        ids = np.flatnonzero((self.element_type == element_type) & ~owned)
+        order = np.lexsort((self.cost[ids], -score[ids]))
+        ids = ids[order]
+
+        cost = self.cost[ids]
+        teams = self.team[ids]
+        # dominates[j, i]: i comes before j (scores at least as much) and
+        # costs no more.
+        before = np.tri(len(ids), k=-1, dtype=bool)
+        dominates = before & (cost[None, :] <= cost[:, None])
+        onehot = teams[:, None] == np.unique(teams)[None, :]
+        dominating_teams = (dominates.astype(np.int32) @ onehot) > 0
+        limit = max_transfers + SQUAD_SIZE // MAX_PER_TEAM
+        keep = dominating_teams.sum(axis=1) < limit
+        return ids[keep], score[ids[keep]]
+
+
+    def _best(
+        self,
+        k: int,
+        squad: np.ndarray,
+        sell: np.ndarray,
+        bank: int,
+        counts: np.ndarray,
+        score: np.ndarray,
+        candidates: Dict[int, Tuple[np.ndarray, np.ndarray]],
+        hits: int,
+    ) -> Optional[Plan]:
+        """Return the best plan with exactly `k` transfers, if any."""
+        squad_types = self.element_type[squad]
+
+        def _slot_bound(types):
+            # The best possible buys, ignoring budget and teams.
+            total = 0.0
+            for element_type, n in zip(*np.unique(types, return_counts=True)):
+                scores = candidates[element_type][1][:n]
+                if len(scores) < n:
+                    return None
+                total += scores.sum()
+            return total
+
+        sells = []
+        for outs in itertools.combinations(range(len(squad)), k):
+            outs = list(outs)
+            bound = _slot_bound(squad_types[outs])
+            if bound is not None:
+                sells.append((bound - score[squad[outs]].sum(), outs))
+        sells.sort(key=lambda item: -item[0])
+
+        best_gain = -np.inf
+        best = None
+        for bound, outs in sells:
+            if bound - hits <= best_gain:
+                break
+            out_ids = squad[outs]
+            out_score = score[out_ids].sum()
+            remaining = counts - np.bincount(
+                self.team[out_ids], minlength=len(counts)
+            )
+            # Slots of the same type are filled in candidate order, so each
+            # set of buys is tried once.
+            slots = sorted(self.element_type[out_ids].tolist())
+            found = self._search(
+                slots,
+                candidates,
+                bank + int(sell[outs].sum()),
+                remaining,
+                best_gain + out_score + hits,
+            )
+            if found is None:
+                continue
+            in_score, in_ids, spent = found
+            best_gain = in_score - out_score - hits
+            transfers = tuple(
+                (int(out), int(element))
+                for out, element in zip(
+                    out_ids[np.argsort(self.element_type[out_ids],
+                                       kind="stable")],
+                    in_ids,
+                )
+            )
+            best = Plan(
+                transfers,
+                float(best_gain),
+                hits,
+                bank + int(sell[outs].sum()) - spent,
+            )
+        return best
+
+
+    def _search(
+        self,
+        slots: List[int],
+        candidates: Dict[int, Tuple[np.ndarray, np.ndarray]],
+        budget: int,
+        counts: np.ndarray,
+        threshold: float,
+    ) -> Optional[Tuple[float, List[int], int]]:
+        """Return the highest scoring buys filling `slots` (element types)
+        within the budget and team limits, if they beat `threshold`.
+
+        Returns:
+            Optional[Tuple[float, List[int], int]]
+                -- The buys' total score, their Element IDs (in slot order)
+                   and total cost.
+        """
+        if not slots:
+            return (0.0, [], 0) if threshold < 0 else None
+
+        cost = self.cost
+        team = self.team
+        counts = counts.copy()
+        min_cost = {
+            element_type: int(cost[ids].min()) if len(ids) else 0
+            for element_type, (ids, _) in candidates.items()
+        }
+        best = [threshold, None]
+        chosen: List[int] = []
+
+        def _bound(depth, start):
+            # The best scores still available for the remaining slots.
+            total = 0.0
+            for slot in range(depth, len(slots)):
+                scores = candidates[slots[slot]][1]
+                if slot > depth and slots[slot] != slots[slot - 1]:
+                    start = 0
+                if start >= len(scores):
+                    return -np.inf
+                total += scores[start]
+                start += 1
+            return total
+
+        def _visit(depth, start, total, spent):
+            if depth == len(slots):
+                if total > best[0]:
+                    best[0], best[1] = total, (total, list(chosen), spent)
+                return
+
+            ids, scores = candidates[slots[depth]]
+            reserve = sum(min_cost[slot] for slot in slots[depth + 1:])
+            same = depth + 1 < len(slots) and slots[depth + 1] == slots[depth]
+            for i in range(start, len(ids)):
+                next_start = i + 1 if same else 0
+                bound = _bound(depth + 1, next_start)
+                if total + scores[i] + bound <= best[0]:
+                    # Later candidates score no more.
+                    break
+                element = ids[i]
+                price = int(cost[element])
+                element_team = team[element]
+                if spent + price + reserve > budget \
+                        or counts[element_team] >= MAX_PER_TEAM:
+                    continue
+                counts[element_team] += 1
+                chosen.append(int(element))
+                _visit(depth + 1, next_start, total + scores[i], spent + price)
+                chosen.pop()
+                counts[element_team] -= 1
+
+        _visit(0, 0, 0.0, 0)
+        return best[1]
+
+
+    @classmethod
+    def from_json(
+        cls,
+        bootstrap_json: dict,
+        summaries: Dict[int, dict],
+        events: Sequence[int],
+        base: str = "points_per_game",
+    ) -> "TransferPlanner":
+        """Create a TransferPlanner from the bootstrap and element summaries.
+
+        Arguments:
+            bootstrap_json {dict} -- get_bootstrap_json data (for now_cost,
+                                     element_type, team and `base`).
+            summaries {Dict[int, dict]}
+                -- get_element_json objects keyed by Element ID (for
+                   `fixtures`), e.g. from get_elements_json.
+            events {Sequence[int]} -- The upcoming events to plan over.
+            base {str} -- The bootstrap element field giving each element's
+                          expected points in an average fixture.
+        """
+        return cls.from_fixtures(
+            bootstrap_json,
+            process.element_fixtures_df_from_json(summaries),
+            events,
+            base,
+        )
+
+
+    @classmethod
+    def from_fixtures(
+        cls,
+        bootstrap_json: dict,
+        fixtures_df: pd.DataFrame,
+        events: Sequence[int],
+        base: str = "points_per_game",
+    ) -> "TransferPlanner":
+        """Create a TransferPlanner from the bootstrap and a table of every
+        element's upcoming fixtures.
+
+        Arguments:
+            bootstrap_json {dict} -- See from_json.
+            fixtures_df {pd.DataFrame}
+                -- Upcoming fixtures with `element`, `event` and
+                   `difficulty` (schema.ELEMENT_FIXTURES), e.g. from
+                   process.element_fixtures_df_from_json.
+            events {Sequence[int]} -- The upcoming events to plan over.
+            base {str} -- See from_json.
+        """
+        elements = pd.DataFrame(
+            bootstrap_json["elements"],
+            columns=["id", "now_cost", "element_type", "team", base],
+        )
+        size = int(elements["id"].max()) + 1 if len(elements) else 1
+        ids = elements["id"].to_numpy(np.int64)
+
+        def _dense(values, dtype):
+            array = np.zeros(size, dtype=dtype)
+            array[ids] = values
+            return array
+
+        rate = _dense(
+            pd.to_numeric(elements[base], errors="coerce").fillna(0.0),
+            np.float32,
+        )
+        column = pd.Series(
+            np.arange(len(events)), index=list(events), dtype=np.int64
+        )
+        factors = np.asarray(DIFFICULTY_FACTORS, dtype=np.float32)
+        expected = np.zeros((size, len(column)), dtype=np.float32)
+        fixtures_df = fixtures_df[
+            fixtures_df["event"].isin(column.index)
+            & (fixtures_df["element"] < size)
+        ]
+        # Double Gameweeks add up: one term per fixture.
+        np.add.at(
+            expected,
+            (
+                fixtures_df["element"].to_numpy(np.int64),
+                column[fixtures_df["event"]].to_numpy(),
+            ),
+            factors[fixtures_df["difficulty"].to_numpy(np.int64)],
+        )
+        expected *= rate[:, None]
+
+        return cls(
+            events,
+            _dense(elements["now_cost"], np.int64),
+            _dense(elements["element_type"], np.int64),
+            _dense(elements["team"], np.int64),
+            expected,
+        )
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
-from typing import Iterable, Optional, Dict
+from typing import Iterable, List, Optional, Dict, Tuple, Union
+
+import decode
+import schema
 
 def df_from_json(json_obj: Dict, fields: Optional[Iterable[str]] = None) -> pd.DataFrame:
     """Returns a pandas DataFrame from the given JSON object.
@@ -23,4 +26,181 @@ def df_from_json(json_obj: Dict, fields: Optional[Iterable[str]] = None) -> pd.D
     return df
 
 
+def typed_df_from_json(
+    records: Iterable[Dict], dtypes: Dict[str, str]
+) -> pd.DataFrame:
+    """Returns a pandas DataFrame with compact, explicit column dtypes.
+
+    Only the fields in `dtypes` are kept. Numeric dtypes are also parsed from
+    the string fields the FPL API uses for decimals (e.g. "4.5"), and
+    "datetime" columns are parsed as UTC timestamps.
+
+    Arguments:
+        records {Iterable[dict]} -- The list of JSON objects (table rows).
+
+        dtypes {Dict[str, str]} -- Mapping of field name to pandas dtype.
+
+    Raises:
+        KeyError -- If a field in `dtypes` doesn't appear in the JSON.
+    """
+    return typed_df_from_columns(decode.columns(records, dtypes), dtypes)
+
+
+def typed_df_from_columns(
+    columns: Dict[str, List], dtypes: Dict[str, str]
+) -> pd.DataFrame:
+    """Returns a pandas DataFrame with compact, explicit column dtypes from
+    per-field column lists (e.g. from decode.decode_columns).
+
+    Arguments:
+        columns {Dict[str, List]} -- The values of each field.
+
+        dtypes {Dict[str, str]} -- Mapping of field name to pandas dtype.
+
+    Raises:
+        KeyError -- If a field in `dtypes` doesn't appear in the columns.
+    """
+    data = {}
+    for field, dtype in dtypes.items():
+        column = pd.Series(columns[field], dtype=object)
+        if dtype == "datetime":
+            data[field] = pd.to_datetime(column, utc=True)
+        elif dtype.startswith("float"):
+            data[field] = pd.to_numeric(column, errors="coerce").astype(dtype)
+        else:
+            data[field] = column.astype(dtype)
+
+    return pd.DataFrame(data, columns=list(dtypes))
+
+
+def element_history_df_from_json(
+    summaries: Iterable[Union[Dict, bytes]]
+) -> pd.DataFrame:
+    """Returns the typed per-Gameweek element history DataFrame.
+
+    Arguments:
+        summaries {Iterable[Union[dict, bytes]]}
+            -- get_element_json objects (e.g. the values of
+               get_elements_json), or raw element-summary documents, whose
+               history is decoded straight into columns (see
+               decode.decode_columns).
+
+    Raises:
+        KeyError -- If a history row is missing a field.
+    """
+    fields = {
+        "round" if field == "event" else field: dtype
+        for field, dtype in schema.ELEMENT_HISTORY.items()
+    }
+    columns: Dict[str, List] = {field: [] for field in fields}
+    for summary in summaries:
+        summary_columns = decode.decode_columns(summary, ["history"], fields)
+        for field, values in summary_columns.items():
+            columns[field].extend(values)
+    columns["event"] = columns.pop("round")
+    return typed_df_from_columns(columns, schema.ELEMENT_HISTORY)
+
+
+def element_fixtures_df_from_json(summaries: Dict[int, Dict]) -> pd.DataFrame:
+    """Returns the typed upcoming fixtures DataFrame of the given elements.
+
+    Fixtures not yet scheduled (with a null `event`) are left out.
+
+    Arguments:
+        summaries {Dict[int, dict]} -- get_element_json objects keyed by
+                                       Element ID (e.g. get_elements_json).
+
+    Raises:
+        KeyError -- If a fixture is missing a field.
+    """
+    rows = [
+        {"element": element, **fixture}
+        for element, summary in summaries.items()
+        for fixture in summary["fixtures"]
+        if fixture.get("event") is not None
+    ]
+    columns = decode.columns(rows, schema.ELEMENT_FIXTURES)
+    return typed_df_from_columns(columns, schema.ELEMENT_FIXTURES)
+
+
+def picks_dfs_from_json(
+    picks_json: Dict[Tuple[int, int], Dict]
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Returns the typed picks, entry history and automatic subs DataFrames.
+
+    Arguments:
+        picks_json {Dict[Tuple[int, int], dict]}
+            -- get_entry_event_picks_json objects keyed by (entry, event),
+               as from get_picks_json.
+
+    Raises:
+        KeyError -- If the JSON is missing a field.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
+            -- The picks, entry_history and automatic_subs tables.
+    """
+    picks: Dict[str, List] = {field: [] for field in schema.PICKS}
+    history: Dict[str, List] = {field: [] for field in schema.ENTRY_HISTORY}
+    subs: Dict[str, List] = {field: [] for field in schema.AUTOMATIC_SUBS}
+
+    for (entry, event), data in picks_json.items():
+        rows = data["picks"]
+        picks["entry"].extend([entry] * len(rows))
+        picks["event"].extend([event] * len(rows))
+        for field in picks:
+            if field not in ("entry", "event"):
+                picks[field].extend(row[field] for row in rows)
+
+        entry_history = data["entry_history"]
+        history["entry"].append(entry)
+        history["event"].append(event)
+        history["active_chip"].append(data.get("active_chip"))
+        for field in history:
+            if field not in ("entry", "event", "active_chip"):
+                history[field].append(entry_history[field])
+
+        for sub in data.get("automatic_subs", []):
+            subs["entry"].append(entry)
+            subs["event"].append(event)
+            subs["element_in"].append(sub["element_in"])
+            subs["element_out"].append(sub["element_out"])
+
+    return (
+        typed_df_from_columns(picks, schema.PICKS),
+        typed_df_from_columns(history, schema.ENTRY_HISTORY),
+        typed_df_from_columns(subs, schema.AUTOMATIC_SUBS),
+    )
+
+
+def entry_history_df_from_json(
+    histories: Dict[int, Dict]
+) -> pd.DataFrame:
+    """Returns the typed entry history DataFrame for whole seasons.
+
+    Rows have the same columns as the picks-derived entry history (see
+    picks_dfs_from_json), with `active_chip` taken from the `chips` list.
+
+    Arguments:
+        histories {Dict[int, dict]}
+            -- get_entry_history_json objects keyed by entry, as from
+               get_entry_histories_json.
+
+    Raises:
+        KeyError -- If the JSON is missing a field.
+    """
+    history: Dict[str, List] = {field: [] for field in schema.ENTRY_HISTORY}
+    fields = [
+        field for field in schema.ENTRY_HISTORY
+        if field not in ("entry", "active_chip")
+    ]
+
+    for entry, data in histories.items():
+        rows = data["current"]
+        chips = {chip["event"]: chip["name"] for chip in data.get("chips", [])}
+        history["entry"].extend([entry] * len(rows))
+        history["active_chip"].extend(chips.get(row["event"]) for row in rows)
+        for field in fields:
+            history[field].extend(row[field] for row in rows)
 
+    return typed_df_from_columns(history, schema.ENTRY_HISTORY)
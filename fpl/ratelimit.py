@@ -0,0 +1,258 @@
+"""Client-side rate limiting for requests to the FPL API.
+
+A token bucket allows `burst` requests at once and `rate` per second on
+average. Its state lives in a small file guarded by an exclusive lock, so
+every process using the same file (e.g. the workers of a process pool)
+shares one budget. A 429 response pauses the bucket for all of them until
+its Retry-After has passed.
+"""
+import email.utils
+import os
+import struct
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+import cache
+
+__all__ = (
+    "default_path",
+    "TokenBucket",
+    "configure",
+    "get_limiter",
+    "reserve",
+    "acquire",
+    "penalize",
+    "retry_after",
+)
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+
+# Pause after a 429 without a usable Retry-After, doubled per attempt.
+DEFAULT_BACKOFF = 1.0
+
+# (tokens, updated, blocked_until) as little-endian doubles.
+_STATE = struct.Struct("<ddd")
+
+
+def default_path() -> str:
+    """Return the default bucket state file, alongside the response cache."""
+    return os.path.join(cache.default_directory(), "ratelimit.state")
+
+
+class TokenBucket:
+    """Class representing a token bucket, optionally shared between
+    processes through a state file.
+    """
+    def __init__(
+        self,
+        rate: Optional[float] = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        path: Optional[str] = None,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            rate {Optional[float]}
+                -- The sustained requests per second (unlimited if None).
+            burst {int} -- The number of requests which may start at once.
+            path {Optional[str]}
+                -- The shared state file. Processes using the same file
+                   share the budget; None keeps the state in this process.
+        """
+        self.rate: Optional[float] = rate
+        self.burst: int = burst
+        self.path: Optional[str] = path if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._state = (float(burst), time.time(), 0.0)
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(rate={self.rate!r}, burst={self.burst!r}, "
+            f"path={self.path!r})"
+        )
+
+
+    def _file(self) -> int:
+        """Return this process's descriptor for the state file.
+
+        Each process opens its own descriptor: flock() locks are shared by
+        descriptors inherited across fork().
+        """
+        if self._fd is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+
+    def _update(self, func) -> float:
+        """Apply `func` to the bucket state under the locks, returning its
+        result. `func` takes and returns (tokens, updated, blocked_until)
+        plus a result."""
+        with self._lock:
+            if self.path is None:
+                self._state, result = func(*self._state)
+                return result
+
+            fd = self._file()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                state = _STATE.unpack(raw) if len(raw) == _STATE.size \
+                    else (float(self.burst), time.time(), 0.0)
+                state, result = func(*state)
+                os.pwrite(fd, _STATE.pack(*state), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            return result
+
+
+    def reserve(self) -> float:
+        """Take a token without blocking, and return how long the caller
+        must wait before using it (e.g. with asyncio.sleep).
+
+        Callers which have to wait reserve their token up front (the bucket
+        goes negative), so concurrent callers are spaced out rather than
+        all retrying at once.
+
+        Returns:
+            float -- The wait (seconds).
+        """
+        if not self.rate:
+            return 0.0
+
+        def _take(tokens, updated, blocked_until):
+            now = time.time()
+            start = max(now, blocked_until)
+            tokens = min(
+                float(self.burst),
+                tokens + max(start - updated, 0.0) * self.rate,
+            )
+            tokens -= 1.0
+            wait = start - now
+            if tokens < 0:
+                wait += -tokens / self.rate
+            return (tokens, start, blocked_until), wait
+
+        return self._update(_take)
+
+
+    def acquire(self) -> float:
+        """Take a token, blocking until it may be used.
+
+        Returns:
+            float -- The time spent waiting (seconds).
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+    def penalize(self, delay: float) -> None:
+        """Stop handing out tokens for `delay` seconds, e.g. after a 429.
+
+        Arguments:
+            delay {float} -- The pause (seconds).
+        """
+        def _block(tokens, updated, blocked_until):
+            until = max(blocked_until, time.time() + delay)
+            return (min(tokens, 0.0), until, until), None
+
+        self._update(_block)
+
+
+_lock = threading.Lock()
+_limiter: Optional[TokenBucket] = None
+
+
+def configure(
+    rate: Optional[float] = DEFAULT_RATE,
+    burst: int = DEFAULT_BURST,
+    path: Optional[str] = None,
+    shared: bool = True,
+) -> TokenBucket:
+    """Replace the limiter used by every fetch.
+
+    Arguments:
+        rate {Optional[float]} -- See TokenBucket.
+        burst {int} -- See TokenBucket.
+        path {Optional[str]} -- The shared state file (default to
+                                default_path()).
+        shared {bool} -- Share the budget with other processes.
+
+    Returns:
+        TokenBucket -- The limiter now in use.
+    """
+    global _limiter
+    if shared and path is None:
+        path = default_path()
+    limiter = TokenBucket(rate, burst, path if shared else None)
+    with _lock:
+        _limiter = limiter
+    return limiter
+
+
+def get_limiter() -> TokenBucket:
+    """Return the limiter used by every fetch, creating it on first use."""
+    global _limiter
+    limiter = _limiter
+    if limiter is None:
+        with _lock:
+            if _limiter is None:
+                _limiter = TokenBucket(path=default_path())
+            limiter = _limiter
+    return limiter
+
+
+def reserve() -> float:
+    """Reserve a token from the shared limiter. See TokenBucket.reserve."""
+    return get_limiter().reserve()
+
+
+def acquire() -> float:
+    """Take a token from the shared limiter. See TokenBucket.acquire."""
+    return get_limiter().acquire()
+
+
+def penalize(delay: float) -> None:
+    """Pause the shared limiter. See TokenBucket.penalize."""
+    get_limiter().penalize(delay)
+
+
+def retry_after(headers, attempt: int = 0) -> float:
+    """Return how long to pause after a 429 response.
+
+    Arguments:
+        headers {Mapping[str, str]} -- The response headers.
+        attempt {int} -- The number of 429s already seen for this request,
+                         for the exponential fallback.
+
+    Returns:
+        float -- The Retry-After delay if given (seconds or an HTTP date),
+                 else DEFAULT_BACKOFF doubled per attempt.
+    """
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+            return max(date.timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+    return DEFAULT_BACKOFF * 2 ** attempt
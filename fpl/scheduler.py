@@ -0,0 +1,317 @@
+"""Background refresh scheduler.
+
+Pre-warms the shared response cache around Gameweek deadlines, so the app
+only ever reads warm data. Run alongside the app, e.g.:
+
+    python fpl/scheduler.py --league 309333
+
+With --live it instead follows the Gameweek in progress: every poll
+revalidates the tracked elements' summaries with the API (bypassing their
+live TTL) and feeds them to a live.LiveEngine, logging provisional scores.
+"""
+import argparse
+import datetime
+import logging
+import time
+from typing import Iterable, List, Optional, Sequence
+
+import cache
+import error
+import fetch
+import live
+import process
+
+__all__ = (
+    "prewarm",
+    "next_run",
+    "run",
+    "live_engine",
+    "poll_live",
+    "run_live",
+    "main",
+)
+
+LOG = logging.getLogger("fpl.scheduler")
+
+DEFAULT_LIVE_INTERVAL = 300.0
+DEFAULT_DEADLINE_DELAY = 120.0
+DEFAULT_IDLE_INTERVAL = 6 * 3600.0
+DEFAULT_POLL_INTERVAL = 60.0
+
+
+def _deadline(event: dict) -> float:
+    """Return the epoch time of the event's deadline."""
+    return cache.parse_time(event["deadline_time"])
+
+
+def prewarm(league_ids: Iterable[int]) -> dict:
+    """Fetch everything the app needs for the given leagues into the cache:
+    each league's standings, matches (per event, and all at once for the
+    season projection) and picks, and every element's summary (for the
+    transfer planner).
+
+    Arguments:
+        league_ids {Iterable[int]} -- The League IDs.
+
+    Returns:
+        dict -- The bootstrap JSON data, for scheduling the next run.
+    """
+    bootstrap_json = fetch.get_bootstrap_json()
+    started = [
+        event["id"] for event in bootstrap_json["events"]
+        if event.get("finished") or event.get("is_current")
+    ]
+
+    for league_id in league_ids:
+        entries = set()
+        for page in fetch.iter_league_pages(league_id):
+            entries.update(
+                row["entry"] for row in page["standings"]["results"]
+            )
+        # Per-event pages, as read by data.LeagueHistory. Finished events'
+        # pages are immutable, so only new and live events cost requests.
+        for event in started:
+            for _ in fetch.iter_league_matches_pages(league_id, event):
+                pass
+        # Every event's pages, as read by the app's season projection.
+        for _ in fetch.iter_league_matches_pages(league_id):
+            pass
+
+        try:
+            fetch.get_picks_json(entries, started)
+        except error.BulkFetchError as exc:
+            # Keep what we got - the rest is retried on the next run.
+            LOG.warning("League %s: %s", league_id, exc)
+
+        LOG.info(
+            "League %s: warmed %d entries x %d events",
+            league_id, len(entries), len(started),
+        )
+
+    # Shared by every league, as read by plane.DataPlane.
+    elements = [element["id"] for element in bootstrap_json["elements"]]
+    try:
+        fetch.get_elements_json(elements)
+    except error.BulkFetchError as exc:
+        LOG.warning("Elements: %s", exc)
+    LOG.info("Warmed %d element summaries", len(elements))
+
+    return bootstrap_json
+
+
+def next_run(
+    events: Sequence[dict],
+    now: Optional[float] = None,
+    live_interval: float = DEFAULT_LIVE_INTERVAL,
+    deadline_delay: float = DEFAULT_DEADLINE_DELAY,
+    idle_interval: float = DEFAULT_IDLE_INTERVAL,
+) -> float:
+    """Return the epoch time at which to next pre-warm the cache.
+
+    Arguments:
+        events {Sequence[dict]} -- The bootstrap `events` items.
+        now {Optional[float]} -- The current epoch time (default now).
+        live_interval {float} -- Seconds between runs during a live Gameweek.
+        deadline_delay {float} -- Seconds after a deadline to run, once the
+                                  API has published the new picks.
+        idle_interval {float} -- The longest time between runs.
+    """
+    now = time.time() if now is None else now
+    candidates = [now + idle_interval]
+
+    if any(e.get("is_current") and not e.get("finished") for e in events):
+        candidates.append(now + live_interval)
+
+    upcoming = [
+        _deadline(event) + deadline_delay for event in events
+        if event.get("deadline_time")
+        and _deadline(event) + deadline_delay > now
+    ]
+    if upcoming:
+        candidates.append(min(upcoming))
+
+    return min(candidates)
+
+
+def run(
+    league_ids: List[int],
+    once: bool = False,
+    **kwargs,
+) -> None:
+    """Pre-warm the cache now and then on schedule, until interrupted.
+
+    Arguments:
+        league_ids {List[int]} -- The League IDs.
+        once {bool} -- Pre-warm once and return.
+        kwargs -- Scheduling intervals passed to next_run.
+    """
+    # The last known events, so a failed run keeps the schedule.
+    events: List[dict] = []
+    while True:
+        try:
+            bootstrap_json = prewarm(league_ids)
+            events = bootstrap_json["events"]
+        except error.FplError as exc:
+            LOG.error("Pre-warm failed: %s", exc)
+        except Exception:
+            # E.g. a connection or decode error - keep the scheduler alive
+            # and retry on schedule.
+            LOG.exception("Pre-warm failed unexpectedly")
+        LOG.info("Cache stats: %s", fetch.CACHE.stats)
+
+        if once:
+            return
+
+        wake = next_run(events, **kwargs)
+        LOG.info(
+            "Next run at %s",
+            datetime.datetime.fromtimestamp(wake).isoformat(),
+        )
+        time.sleep(max(0.0, wake - time.time()))
+
+
+def _current_event(events: Sequence[dict]) -> Optional[dict]:
+    """Return the bootstrap event in progress, if any."""
+    return next((event for event in events if event.get("is_current")), None)
+
+
+def live_engine(league_ids: Iterable[int], event: int) -> live.LiveEngine:
+    """Create a LiveEngine tracking every entry of the given leagues.
+
+    Arguments:
+        league_ids {Iterable[int]} -- The League IDs.
+        event {int} -- The Event ID in progress.
+    """
+    entries = set()
+    for league_id in league_ids:
+        for page in fetch.iter_league_pages(league_id):
+            entries.update(
+                row["entry"] for row in page["standings"]["results"]
+            )
+    picks_df, history_df, _ = process.picks_dfs_from_json(
+        fetch.get_picks_json(entries, [event])
+    )
+    elements = fetch.get_bootstrap_json()["elements"]
+    return live.LiveEngine(
+        event,
+        picks_df,
+        {element["id"]: element["element_type"] for element in elements},
+        dict(zip(history_df["entry"], history_df["event_transfers_cost"])),
+    )
+
+
+def poll_live(engine: live.LiveEngine) -> List[int]:
+    """Fetch the engine's elements' current stats and apply them.
+
+    Element summaries and the bootstrap are revalidated with the API rather
+    than read from the cache, whose live TTL is longer than a poll; unchanged
+    ones cost a 304. Finished fixtures are derived from confirmed bonus (see
+    live.bonus_confirmed_fixtures) and the event's end from the bootstrap's
+    `finished` flag.
+
+    Arguments:
+        engine {live.LiveEngine} -- The engine to update.
+
+    Returns:
+        List[int] -- The entries whose scores were recomputed.
+    """
+    summaries = fetch.get_elements_json(engine.elements, revalidate=True)
+    stats_df = process.element_history_df_from_json(summaries.values())
+    events = fetch.get_bootstrap_json(revalidate=True)["events"]
+    event_finished = any(
+        event["id"] == engine.event and event["finished"] for event in events
+    )
+    return engine.update(stats_df, event_finished=event_finished)
+
+
+def run_live(
+    league_ids: List[int],
+    interval: float = DEFAULT_POLL_INTERVAL,
+    once: bool = False,
+) -> Optional[live.LiveEngine]:
+    """Poll the Gameweek in progress until it finishes or is interrupted.
+
+    Arguments:
+        league_ids {List[int]} -- The League IDs.
+        interval {float} -- Seconds between polls.
+        once {bool} -- Poll once and return.
+
+    Returns:
+        Optional[live.LiveEngine] -- The engine, with the last scores, or
+                                     None if no Gameweek is in progress.
+    """
+    current = _current_event(fetch.get_bootstrap_json()["events"])
+    if current is None or current.get("finished"):
+        LOG.info("No Gameweek in progress")
+        return None
+
+    engine = live_engine(league_ids, current["id"])
+    LOG.info("Following %s", engine)
+    while True:
+        try:
+            changed = poll_live(engine)
+            LOG.info(
+                "Gameweek %s: %d entries rescored", engine.event, len(changed)
+            )
+            if changed:
+                LOG.info("Provisional scores:\n%s", engine.scores_df)
+            # Just revalidated by poll_live.
+            current = _current_event(fetch.get_bootstrap_json()["events"])
+            if current is None or current["id"] != engine.event \
+                    or current.get("finished"):
+                return engine
+        except error.FplError as exc:
+            LOG.error("Live poll failed: %s", exc)
+        except Exception:
+            LOG.exception("Live poll failed unexpectedly")
+
+        if once:
+            return engine
+        time.sleep(interval)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--league", type=int, action="append", required=True,
+        help="H2H League ID to keep warm (may be repeated)",
+    )
+    parser.add_argument(
+        "--live-interval", type=float, default=DEFAULT_LIVE_INTERVAL,
+        help="seconds between refreshes during a live Gameweek",
+    )
+    parser.add_argument(
+        "--deadline-delay", type=float, default=DEFAULT_DEADLINE_DELAY,
+        help="seconds after each deadline to refresh",
+    )
+    parser.add_argument(
+        "--live", action="store_true",
+        help="follow the Gameweek in progress instead of pre-warming",
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+        help="seconds between live polls, with --live",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="run once and exit",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s",
+    )
+    if args.live:
+        run_live(args.league, interval=args.poll_interval, once=args.once)
+        return
+    run(
+        args.league,
+        once=args.once,
+        live_interval=args.live_interval,
+        deadline_delay=args.deadline_delay,
+    )
+
+
+if __name__ == "__main__":
+    main()
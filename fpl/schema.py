@@ -0,0 +1,96 @@
+"""Column dtypes for the normalized per-Gameweek tables.
+
+Each schema maps a field (as documented in fetch.py) to a compact pandas
+dtype; see process.typed_df_from_json. Nullable integer dtypes ("Int16")
+are used for fields which are null until a match has been played.
+"""
+
+__all__ = (
+    "ELEMENT_HISTORY",
+    "ELEMENT_FIXTURES",
+    "PICKS",
+    "ENTRY_HISTORY",
+    "AUTOMATIC_SUBS",
+)
+
+# element-summary/{id} `history` rows. `round` is stored as `event`.
+ELEMENT_HISTORY = {
+    "element": "int16",
+    "fixture": "int16",
+    "opponent_team": "int16",
+    "total_points": "int16",
+    "was_home": "bool",
+    "team_h_score": "Int16",
+    "team_a_score": "Int16",
+    "event": "int16",
+    "minutes": "int16",
+    "goals_scored": "int16",
+    "assists": "int16",
+    "clean_sheets": "int16",
+    "goals_conceded": "int16",
+    "own_goals": "int16",
+    "penalties_saved": "int16",
+    "penalties_missed": "int16",
+    "yellow_cards": "int16",
+    "red_cards": "int16",
+    "saves": "int16",
+    "bonus": "int16",
+    "bps": "int16",
+    "influence": "float32",
+    "creativity": "float32",
+    "threat": "float32",
+    "ict_index": "float32",
+    "value": "int16",
+    "transfers_balance": "int32",
+    "selected": "int32",
+    "transfers_in": "int32",
+    "transfers_out": "int32",
+}
+
+# element-summary/{id} `fixtures` rows (upcoming fixtures), with the element.
+ELEMENT_FIXTURES = {
+    "element": "int16",
+    "id": "int16",
+    "code": "int32",
+    "team_h": "int16",
+    "team_a": "int16",
+    "event": "int16",
+    "is_home": "bool",
+    "difficulty": "int8",
+}
+
+# entry/{id}/event/{event}/picks `picks` rows, keyed by (entry, event).
+PICKS = {
+    "entry": "int32",
+    "event": "int16",
+    "element": "int16",
+    "position": "int8",
+    "multiplier": "int8",
+    "is_captain": "bool",
+    "is_vice_captain": "bool",
+}
+
+# entry/{id}/event/{event}/picks `entry_history`, plus the `active_chip`.
+ENTRY_HISTORY = {
+    "entry": "int32",
+    "event": "int16",
+    "points": "int16",
+    "total_points": "int16",
+    "rank": "Int32",
+    "rank_sort": "Int32",
+    "overall_rank": "Int32",
+    "bank": "int16",
+    "value": "int16",
+    "event_transfers": "int16",
+    "event_transfers_cost": "int16",
+    "points_on_bench": "int16",
+    "active_chip": "object",
+}
+
+# entry/{id}/event/{event}/picks `automatic_subs` rows.
+AUTOMATIC_SUBS = {
+    "entry": "int32",
+    "event": "int16",
+    "element_in": "int16",
+    "element_out": "int16",
+}
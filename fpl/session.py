@@ -0,0 +1,179 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+__all__ = (
+    "SessionConfig",
+    "configure",
+    "get_config",
+    "get_session",
+    "get",
+    "close",
+)
+
+# 429s aren't retried here: fetch pauses the shared rate limiter (see
+# ratelimit.py) for every process, then retries.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class SessionConfig:
+    """Class representing the tunables for the shared HTTP session.
+    """
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 32,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            pool_connections {int}
+                -- The number of per-host connection pools to keep alive.
+            pool_maxsize {int}
+                -- The maximum number of connections kept per host. This
+                   should be at least the number of threads fetching at once.
+            retries {int}
+                -- The number of times to retry a request which failed to
+                   connect or came back with a 5xx status.
+            backoff_factor {float}
+                -- The exponential backoff factor between retries (seconds).
+            connect_timeout {float}
+                -- The timeout for establishing a connection (seconds).
+            read_timeout {float}
+                -- The timeout for reading the response (seconds).
+        """
+        self.pool_connections: int = pool_connections
+        self.pool_maxsize: int = pool_maxsize
+        self.retries: int = retries
+        self.backoff_factor: float = backoff_factor
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        parts = [f"{k}={repr(v)}" for k, v in self.__dict__.items()]
+        return f"{classname}({', '.join(parts)})"
+
+
+    @property
+    def timeout(self) -> tuple:
+        """Return the (connect, read) timeout tuple used by requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+
+_lock = threading.Lock()
+_config = SessionConfig()
+_session: Optional[requests.Session] = None
+
+
+def _build_session(config: SessionConfig) -> requests.Session:
+    """Return a new pooled, retrying session for the given config.
+
+    Arguments:
+        config {SessionConfig} -- The tunables for the session.
+    """
+    retry = Retry(
+        total=config.retries,
+        backoff_factor=config.backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        # Retry-After (sent with 429s) is handled by fetch's rate limiter.
+        respect_retry_after_header=False,
+        # Let the final 429/5xx response through so the caller's
+        # raise_for_status() reports it as a FetchError.
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def configure(
+    config: Optional[SessionConfig] = None, **kwargs
+) -> SessionConfig:
+    """Replace the shared session configuration.
+
+    Any existing session is closed; the next request builds a new one with
+    the updated configuration.
+
+    Arguments:
+        config {SessionConfig} -- The new config (default to the current
+                                  config if None).
+        kwargs -- Individual SessionConfig fields to override.
+
+    Returns:
+        SessionConfig -- The config now in use.
+    """
+    global _config, _session
+    with _lock:
+        new_config = config if config is not None else _config
+        new_config = SessionConfig(**{**new_config.__dict__, **kwargs})
+        if _session is not None:
+            _session.close()
+        _config, _session = new_config, None
+    return new_config
+
+
+def get_config() -> SessionConfig:
+    """Return the shared session configuration."""
+    return _config
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use.
+
+    The underlying urllib3 connection pools are thread-safe, so one session is
+    shared by every thread in the process.
+    """
+    global _session
+    session = _session
+    if session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session(_config)
+            session = _session
+    return session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Issue a GET request on the shared session.
+
+    Arguments:
+        url {str} -- The URL to fetch.
+        kwargs -- Extra arguments passed through to requests (e.g. headers).
+
+    Returns:
+        requests.Response -- The (possibly retried) response.
+    """
+    kwargs.setdefault("timeout", _config.timeout)
+    return get_session().get(url, **kwargs)
+
+
+def close() -> None:
+    """Close the shared session and release its pooled connections."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
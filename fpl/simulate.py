@@ -0,0 +1,348 @@
+"""Monte Carlo projection of the rest of an H2H league season.
+
+SeasonSimulator resamples each entry's past weekly scores to play out the
+remaining fixtures many times over, and reports how often each entry wins
+the title, finishes in the top N or is relegated. Results depend only on
+the seed, not on the number of worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import standings
+
+__all__ = (
+    "SeasonSimulator",
+    "histories_from_standings",
+)
+
+DEFAULT_SHARD_SIZE = 20000
+
+# Sentinel opponent index for the league AVERAGE (odd-sized leagues).
+AVERAGE = -1
+
+
+def histories_from_standings(
+    standings_df: pd.DataFrame,
+) -> Dict[int, np.ndarray]:
+    """Return each entry's weekly scores from a compute_standings table.
+
+    Arguments:
+        standings_df {pd.DataFrame} -- The output of compute_standings.
+
+    Returns:
+        Dict[int, np.ndarray] -- Weekly points for each Entry ID.
+    """
+    # Only count weeks in which the entry actually played a match.
+    df = standings_df.sort_values(["entry", "event"])
+    played = df["matches_played"] - df.groupby("entry")["matches_played"] \
+        .shift(1, fill_value=0)
+    played = df[played > 0]
+    return {
+        int(entry): group["event_points"].to_numpy(np.int16)
+        for entry, group in played.groupby("entry")
+    }
+
+
+def _simulate_shard(
+    args: Tuple[np.random.SeedSequence, int, dict]
+) -> np.ndarray:
+    """Play out `sims` seasons and return the (entries, entries) histogram of
+    final positions. Module-level so it can run in a worker process.
+    """
+    seed_seq, sims, arrays = args
+    rng = np.random.default_rng(seed_seq)
+
+    history = arrays["history"]            # (entries, max history)
+    lengths = arrays["lengths"]            # (entries,)
+    fixture_week = arrays["fixture_week"]  # (fixtures,)
+    fixture_a = arrays["fixture_a"]        # (fixtures,)
+    fixture_b = arrays["fixture_b"]        # (fixtures,), AVERAGE for byes
+    n_entries = len(lengths)
+    n_weeks = arrays["n_weeks"]
+
+    # Sample every entry's score for every remaining week: (sims, entries,
+    # weeks), drawn uniformly from that entry's own history.
+    picks = (
+        rng.random((sims, n_entries, n_weeks))
+        * lengths[None, :, None]
+    ).astype(np.int32)
+    scores = history[np.arange(n_entries)[None, :, None], picks]
+    average = scores.mean(axis=1)          # (sims, weeks)
+
+    score_a = scores[:, fixture_a, fixture_week]
+    score_b = np.where(
+        fixture_b[None, :] == AVERAGE,
+        average[:, fixture_week],
+        scores[:, np.maximum(fixture_b, 0), fixture_week],
+    )
+    drawn = np.where(score_a == score_b, standings.DRAW_POINTS, 0)
+    points_a = np.where(score_a > score_b, standings.WIN_POINTS, drawn)
+    points_b = np.where(score_b > score_a, standings.WIN_POINTS, drawn)
+
+    # Credit each fixture's result to its entries via one-hot incidence
+    # matrices - a matrix product rather than a loop over fixtures.
+    incidence_a = arrays["incidence_a"]    # (fixtures, entries)
+    incidence_b = arrays["incidence_b"]
+    total = (
+        arrays["total"][None, :]
+        + points_a @ incidence_a
+        + points_b @ incidence_b
+    )
+    points_for = arrays["points_for"][None, :] + scores.sum(axis=2)
+
+    # Rank on league points, then points scored, then a random tiebreak.
+    key = (
+        total.astype(np.float64) * 1e6
+        + points_for
+        + rng.random(total.shape)
+    )
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(
+        positions, order, np.arange(n_entries)[None, :], axis=1
+    )
+
+    cells = np.arange(n_entries)[None, :] * n_entries + positions
+    return np.bincount(
+        cells.ravel(), minlength=n_entries * n_entries
+    ).reshape(n_entries, n_entries)
+
+
+class SeasonSimulator:
+    """Class representing a Monte Carlo projection of an H2H league season.
+
+    Each simulated week, every entry's score is drawn from that entry's own
+    past weekly scores, the remaining fixtures are played out, and the final
+    table is ranked. Simulations are vectorized in shards of shape
+    (sims, entries, weeks) and shards run across a process pool.
+    """
+    def __init__(
+        self,
+        entries: Sequence[int],
+        total: Sequence[int],
+        points_for: Sequence[int],
+        histories: Dict[int, Sequence[int]],
+        fixtures: Iterable[Tuple[int, int, Optional[int]]],
+        names: Optional[Dict[int, str]] = None,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            entries {Sequence[int]}
+                -- The Entry IDs in the league.
+            total {Sequence[int]}
+                -- Each entry's current league points.
+            points_for {Sequence[int]}
+                -- Each entry's current total points scored.
+            histories {Dict[int, Sequence[int]]}
+                -- Each entry's past weekly scores, e.g. `points` from
+                   entry_history. Entries without history use the pooled
+                   history of the whole league.
+            fixtures {Iterable[Tuple[int, int, Optional[int]]]}
+                -- The remaining (event, entry_1, entry_2) fixtures, with
+                   entry_2 None for a match against the league AVERAGE.
+            names {Optional[Dict[int, str]]}
+                -- Team names for the result table.
+        """
+        self.entries: List[int] = [int(entry) for entry in entries]
+        self.names: Dict[int, str] = dict(names or {})
+        index = {entry: i for i, entry in enumerate(self.entries)}
+        n_entries = len(self.entries)
+
+        rows = [
+            np.asarray(histories.get(entry, []), dtype=np.int16)
+            for entry in self.entries
+        ]
+        pooled = np.concatenate(rows) if rows else np.zeros(0, np.int16)
+        if not pooled.size:
+            pooled = np.zeros(1, dtype=np.int16)
+        rows = [row if row.size else pooled for row in rows]
+        lengths = np.array([row.size for row in rows], dtype=np.int32)
+        history = np.zeros((n_entries, lengths.max(initial=1)), dtype=np.int16)
+        for i, row in enumerate(rows):
+            history[i, :row.size] = row
+
+        fixtures = list(fixtures)
+        weeks = sorted({int(event) for event, _, _ in fixtures})
+        week_index = {event: i for i, event in enumerate(weeks)}
+        fixture_week = np.array(
+            [week_index[int(event)] for event, _, _ in fixtures],
+            dtype=np.int32,
+        )
+        fixture_a = np.array(
+            [index[int(a)] for _, a, _ in fixtures], dtype=np.int32
+        )
+        fixture_b = np.array(
+            [AVERAGE if b is None or pd.isna(b) else index[int(b)]
+             for _, _, b in fixtures],
+            dtype=np.int32,
+        )
+        incidence_a = np.zeros((len(fixtures), n_entries), dtype=np.int32)
+        incidence_a[np.arange(len(fixtures)), fixture_a] = 1
+        incidence_b = np.zeros((len(fixtures), n_entries), dtype=np.int32)
+        has_b = fixture_b != AVERAGE
+        incidence_b[np.arange(len(fixtures))[has_b], fixture_b[has_b]] = 1
+
+        self.events: List[int] = weeks
+        self._arrays: dict = {
+            "history": history,
+            "lengths": lengths,
+            "n_weeks": len(weeks),
+            "fixture_week": fixture_week,
+            "fixture_a": fixture_a,
+            "fixture_b": fixture_b,
+            "incidence_a": incidence_a,
+            "incidence_b": incidence_b,
+            "total": np.asarray(total, dtype=np.int32),
+            "points_for": np.asarray(points_for, dtype=np.int32),
+        }
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(entries={len(self.entries)}, "
+            f"events={self.events!r})"
+        )
+
+
+    @classmethod
+    def from_matches(
+        cls,
+        matches_df: pd.DataFrame,
+        histories: Optional[Dict[int, Sequence[int]]] = None,
+    ) -> "SeasonSimulator":
+        """Create a simulator from a league's H2H matches.
+
+        Arguments:
+            matches_df {pd.DataFrame}
+                -- The H2H matches, as from standings.matches_df_from_pages.
+            histories {Optional[Dict[int, Sequence[int]]]}
+                -- Each entry's past weekly scores (default to the scores in
+                   the league's played matches).
+        """
+        standings_df = standings.compute_standings(matches_df)
+        if standings_df.empty:
+            entries = pd.unique(matches_df[
+                ["entry_1_entry", "entry_2_entry"]
+            ].stack().dropna())
+            current = pd.DataFrame({
+                "entry": entries, "total": 0, "points_for": 0,
+            })
+            names: Dict[int, str] = {}
+        else:
+            current = standings_df[
+                standings_df["event"] == standings_df["event"].max()
+            ]
+            names = dict(zip(current["entry"], current["entry_name"]))
+        if histories is None:
+            histories = histories_from_standings(standings_df) \
+                if not standings_df.empty else {}
+
+        played = (
+            matches_df["entry_1_win"] + matches_df["entry_1_draw"]
+            + matches_df["entry_1_loss"]
+        ) > 0
+        remaining = matches_df[~played]
+        fixtures = zip(
+            remaining["event"],
+            remaining["entry_1_entry"],
+            remaining["entry_2_entry"],
+        )
+
+        return cls(
+            current["entry"].tolist(),
+            current["total"].tolist(),
+            current["points_for"].tolist(),
+            histories,
+            fixtures,
+            names,
+        )
+
+
+    def position_counts(
+        self,
+        sims: int = 100000,
+        seed: int = 0,
+        processes: Optional[int] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+    ) -> np.ndarray:
+        """Return how often each entry finished in each position.
+
+        The seasons are split into fixed-size shards, each with its own child
+        of the seed, so results depend only on `seed` and `shard_size` and not
+        on the number of processes.
+
+        Arguments:
+            sims {int} -- The number of seasons to simulate.
+            seed {int} -- The random seed.
+            processes {Optional[int]} -- The number of worker processes (0 to
+                                         run in this process, None for one
+                                         per CPU).
+            shard_size {int} -- The number of seasons per shard.
+
+        Returns:
+            np.ndarray -- (entries, positions) counts, summing to `sims` per
+                          entry.
+        """
+        n_shards = max(1, -(-sims // shard_size))
+        sizes = [shard_size] * (n_shards - 1) + \
+            [sims - shard_size * (n_shards - 1)]
+        seeds = np.random.SeedSequence(seed).spawn(n_shards)
+        tasks = [
+            (child, size, self._arrays) for child, size in zip(seeds, sizes)
+        ]
+
+        if processes == 0 or n_shards == 1:
+            histograms = map(_simulate_shard, tasks)
+            return sum(histograms)
+
+        workers = min(n_shards, processes or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(_simulate_shard, tasks))
+
+
+    def run(
+        self,
+        sims: int = 100000,
+        seed: int = 0,
+        top_n: int = 4,
+        relegation: int = 3,
+        processes: Optional[int] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+    ) -> pd.DataFrame:
+        """Simulate the rest of the season and summarise the outcomes.
+
+        Arguments:
+            sims {int} -- The number of seasons to simulate.
+            seed {int} -- The random seed.
+            top_n {int} -- The number of places counted as "top N".
+            relegation {int} -- The number of places counted as relegation.
+            processes {Optional[int]} -- See position_counts.
+            shard_size {int} -- See position_counts.
+
+        Returns:
+            pd.DataFrame -- One row per entry with the probability of winning
+                            the title, finishing top N and being relegated,
+                            and the expected final rank.
+        """
+        counts = self.position_counts(sims, seed, processes, shard_size)
+        probs = counts / float(sims)
+        n_entries = len(self.entries)
+        ranks = np.arange(1, n_entries + 1)
+
+        df = pd.DataFrame({
+            "entry": self.entries,
+            "entry_name": [self.names.get(e, "") for e in self.entries],
+            "title": probs[:, 0],
+            "top_n": probs[:, :top_n].sum(axis=1),
+            "relegation": probs[:, max(0, n_entries - relegation):]
+                .sum(axis=1),
+            "expected_rank": probs @ ranks,
+        })
+        return df.sort_values("expected_rank").reset_index(drop=True)
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+__all__ = (
+    "Group",
+)
+
+T = TypeVar("T")
+
+
+class Group(Generic[T]):
+    """Class coalescing concurrent calls for the same key into one.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight wait for it and share its result or exception.
+    Once the call finishes the key is forgotten, so later callers start a
+    new call.
+    """
+    def __init__(self) -> None:
+        """Class constructor."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        with self._lock:
+            in_flight = len(self._calls)
+        return f"{self.__class__.__name__}(in_flight={in_flight})"
+
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> Tuple[T, bool]:
+        """Call `func` unless a call for `key` is already in flight, in which
+        case wait for that call instead.
+
+        Arguments:
+            key {Hashable} -- Identifies equivalent calls, e.g. the URL.
+            func {Callable[[], T]} -- The call to make.
+
+        Raises:
+            Exception -- Whatever the shared call raised.
+
+        Returns:
+            Tuple[T, bool] -- The call's result, and whether it was shared
+                              with another caller's call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
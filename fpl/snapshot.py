@@ -0,0 +1,427 @@
+"""Local snapshot store.
+
+Normalized per-Gameweek tables (element history and upcoming fixtures,
+picks, entry history, automatic subs and H2H matches) are written as
+Parquet files partitioned by event, and read back memory-mapped with
+predicate pushdown on event range, entries or elements. Raw documents
+that aren't per-Gameweek (bootstrap, league standings pages) are kept as
+compressed JSON.
+
+A store can stand in for HTTP: set `fetch.SNAPSHOT = SnapshotStore(root)`
+and the fetchers serve what the snapshot holds, rebuilding the API's JSON
+shape from the tables.
+"""
+import functools
+import gzip
+import os
+import re
+import urllib.parse
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+import data
+import decode
+import error
+import fetch
+import process
+import schema
+import standings
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+__all__ = (
+    "TABLES",
+    "SnapshotStore",
+    "capture_league",
+)
+
+TABLES = {
+    "elements": schema.ELEMENT_HISTORY,
+    "fixtures": schema.ELEMENT_FIXTURES,
+    "picks": schema.PICKS,
+    "entry_history": schema.ENTRY_HISTORY,
+    "automatic_subs": schema.AUTOMATIC_SUBS,
+    "matches": {"league": "int32", **standings.MATCHES},
+}
+
+# The columns identifying a row within an event partition. Rewriting an
+# event replaces rows with the same key and keeps the rest.
+KEYS = {
+    "elements": ("element", "fixture"),
+    "fixtures": ("element", "id"),
+    "picks": ("entry",),
+    "entry_history": ("entry",),
+    "automatic_subs": ("entry",),
+    "matches": ("league", "id"),
+}
+
+_PICKS_RE = re.compile(r"^entry/(?P<entry>\d+)/event/(?P<event>\d+)/picks/?$")
+_ELEMENT_RE = re.compile(r"^element-summary/(?P<element>\d+)/?$")
+_MATCHES_RE = re.compile(
+    r"^leagues-h2h-matches/league/(?P<league>\d+)/?"
+    r"(\?page=(?P<page>\d+)(&event=(?P<event>\d+))?)?$"
+)
+
+
+class SnapshotStore:
+    """Class representing a directory of partitioned columnar snapshots.
+    """
+    def __init__(self, root: str) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            root {str} -- The snapshot directory (created on first write).
+        """
+        if pa is None:
+            raise ImportError("SnapshotStore requires pyarrow")
+        self.root: str = root
+        self._filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        return f"{self.__class__.__name__}(root={self.root!r})"
+
+
+    def _table_dir(self, table: str) -> str:
+        """Return the directory of the given table."""
+        if table not in TABLES:
+            raise ValueError(f"Unknown snapshot table: {table}")
+        return os.path.join(self.root, table)
+
+
+    def _document_path(self, key: str) -> str:
+        """Return the file path of the raw document for the key."""
+        name = urllib.parse.quote(key, safe="")
+        return os.path.join(self.root, "documents", name + ".json.gz")
+
+
+    def _dataset(self, table: str) -> Optional["ds.Dataset"]:
+        """Return the table's dataset, or None if nothing is written yet."""
+        path = self._table_dir(table)
+        if not os.path.isdir(path):
+            return None
+        return ds.dataset(
+            path,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("event", pa.int16())]), flavor="hive"
+            ),
+            filesystem=self._filesystem,
+        )
+
+
+    def read(
+        self,
+        table: str,
+        events: Optional[Tuple[int, int]] = None,
+        entries: Optional[Iterable[int]] = None,
+        elements: Optional[Iterable[int]] = None,
+        league: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Read a table, filtered at the file and row-group level.
+
+        Arguments:
+            table {str} -- The table name (a key of TABLES).
+            events {Optional[Tuple[int, int]]}
+                -- Inclusive (first, last) event range to read.
+            entries {Optional[Iterable[int]]}
+                -- Entry IDs to read (tables with an `entry` column).
+            elements {Optional[Iterable[int]]}
+                -- Element IDs to read (tables with an `element` column).
+            league {Optional[int]}
+                -- League ID to read (the `matches` table).
+            columns {Optional[Sequence[str]]}
+                -- Columns to read (default to all).
+
+        Returns:
+            pd.DataFrame -- The matching rows with the table's dtypes.
+        """
+        dtypes = TABLES[table]
+        columns = list(columns) if columns is not None else list(dtypes)
+        dataset = self._dataset(table)
+        if dataset is None:
+            return process.typed_df_from_columns(
+                {column: [] for column in columns},
+                {column: dtypes[column] for column in columns},
+            )
+
+        conditions = []
+        if events is not None:
+            conditions.append(ds.field("event") >= events[0])
+            conditions.append(ds.field("event") <= events[1])
+        if entries is not None:
+            conditions.append(ds.field("entry").isin(list(entries)))
+        if elements is not None:
+            conditions.append(ds.field("element").isin(list(elements)))
+        if league is not None:
+            conditions.append(ds.field("league") == league)
+        expression = functools.reduce(lambda a, b: a & b, conditions) \
+            if conditions else None
+
+        arrow_table = dataset.to_table(columns=columns, filter=expression)
+        df = arrow_table.to_pandas()
+        return df.astype({column: dtypes[column] for column in columns})
+
+
+    def write(self, table: str, df: pd.DataFrame) -> None:
+        """Write rows into the table, replacing rows with the same key in
+        each event partition written.
+
+        Arguments:
+            table {str} -- The table name (a key of TABLES).
+            df {pd.DataFrame} -- Rows with the table's columns.
+        """
+        dtypes = TABLES[table]
+        keys = list(KEYS[table])
+        df = df[list(dtypes)].astype(dtypes)
+        if df.empty:
+            return
+
+        events = df["event"].unique().tolist()
+        existing = self.read(table, events=(min(events), max(events)))
+        existing = existing[existing["event"].isin(events)]
+        if not existing.empty:
+            merged = existing.merge(
+                df[["event"] + keys].drop_duplicates(),
+                on=["event"] + keys, how="left", indicator=True,
+            )
+            existing = existing[(merged["_merge"] == "left_only").to_numpy()]
+            df = pd.concat([existing, df], ignore_index=True)
+
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+        ds.write_dataset(
+            arrow_table,
+            self._table_dir(table),
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("event", pa.int16())]), flavor="hive"
+            ),
+            existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet",
+        )
+
+
+    def put_json(self, key: str, obj: Any) -> None:
+        """Store a raw JSON document under its endpoint key.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+            obj {Any} -- The JSON object.
+        """
+        path = self._document_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wb") as doc_file:
+            doc_file.write(decode.dumps(obj))
+
+
+    def get_json(self, key: str) -> Optional[Any]:
+        """Return the JSON for an endpoint key, as the API would.
+
+        Stored documents are returned as-is. Picks, element summaries and
+        league matches are rebuilt from the tables.
+
+        Arguments:
+            key {str} -- The endpoint path relative to the API base URL.
+
+        Returns:
+            Optional[Any] -- The JSON object, or None if not in the snapshot.
+        """
+        document = self._document(key)
+        if document is not None:
+            return decode.loads(document)
+
+        match = _PICKS_RE.match(key)
+        if match:
+            return self._picks_json(
+                int(match.group("entry")), int(match.group("event"))
+            )
+        match = _ELEMENT_RE.match(key)
+        if match:
+            return self._element_json(int(match.group("element")))
+        match = _MATCHES_RE.match(key)
+        if match:
+            event = match.group("event")
+            return self._matches_json(
+                int(match.group("league")),
+                int(match.group("page") or 1),
+                int(event) if event else None,
+            )
+        return None
+
+
+    def _document(self, key: str) -> Optional[bytes]:
+        """Return the raw stored document for a key, if there is one."""
+        path = self._document_path(key)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rb") as doc_file:
+            return doc_file.read()
+
+
+    def _picks_json(self, entry: int, event: int) -> Optional[dict]:
+        """Rebuild get_entry_event_picks_json from the tables."""
+        history = self.read(
+            "entry_history", events=(event, event), entries=[entry]
+        )
+        if history.empty:
+            return None
+        picks = self.read("picks", events=(event, event), entries=[entry])
+        subs = self.read(
+            "automatic_subs", events=(event, event), entries=[entry]
+        )
+
+        entry_history = history.drop(columns=["entry", "active_chip"])
+        entry_history = _records(entry_history)[0]
+        return {
+            "active_chip": history["active_chip"].iloc[0],
+            "automatic_subs": _records(subs),
+            "entry_history": entry_history,
+            "picks": _records(
+                picks.drop(columns=["entry", "event"])
+                .sort_values("position")
+            ),
+        }
+
+
+    def _element_json(self, element: int) -> Optional[dict]:
+        """Rebuild get_element_json's `fixtures` and `history` from the
+        tables."""
+        history = self.read("elements", elements=[element])
+        fixtures = self.read("fixtures", elements=[element])
+        if history.empty and fixtures.empty:
+            return None
+        history = history.sort_values(["event", "fixture"])
+        history = history.rename(columns={"event": "round"})
+        # The API sends these decimals as strings.
+        for column in ("influence", "creativity", "threat", "ict_index"):
+            history[column] = history[column].map("{:.1f}".format)
+        # Fixtures captured as upcoming may have been played since.
+        fixtures = fixtures[~fixtures["id"].isin(history["fixture"])]
+        fixtures = fixtures.sort_values(["event", "id"]).drop(
+            columns=["element"]
+        )
+        return {"fixtures": _records(fixtures), "history": _records(history),
+                "history_past": []}
+
+
+    def _matches_json(
+        self, league: int, page: int, event: Optional[int] = None
+    ) -> Optional[dict]:
+        """Rebuild get_league_matches_json from the tables, as one page."""
+        events = None if event is None else (event, event)
+        matches = self.read("matches", events=events, league=league)
+        if matches.empty:
+            return None
+        results = _records(
+            matches.drop(columns=["league"]).sort_values(["event", "id"])
+        ) if page == 1 else []
+        return {"has_next": False, "page": page, "results": results}
+
+
+    def load_bootstrap(self) -> data.Bootstrap:
+        """Create a Bootstrap instance from the snapshot, whose tables are
+        decoded straight from the stored document."""
+        key = fetch.PATHS["bootstrap"]
+        document = self._document(key)
+        if document is None:
+            raise error.FetchError(f"Not in snapshot {self.root}: {key}")
+        return data.Bootstrap.create(lambda: document)
+
+
+    def load_league(self, league_id: int) -> data.H2HLeague:
+        """Create an H2HLeague instance from the snapshot."""
+        def pages():
+            page = 1
+            while True:
+                json_data = self._require(fetch.PATHS["league"].format(
+                    league_id=league_id, page=page
+                ))
+                yield json_data
+                if not json_data["standings"]["has_next"]:
+                    return
+                page += 1
+
+        return data.H2HLeague.create(pages)
+
+
+    def _require(self, key: str) -> Any:
+        """Return the JSON for the key, raising FetchError if not present."""
+        json_data = self.get_json(key)
+        if json_data is None:
+            raise error.FetchError(f"Not in snapshot {self.root}: {key}")
+        return json_data
+
+
+def _records(df: pd.DataFrame) -> list:
+    """Return the DataFrame's rows as JSON-able dicts (nulls as None)."""
+    df = df.astype(object).where(df.notna(), None)
+    return [
+        {k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()}
+        for row in df.to_dict("records")
+    ]
+
+
+def capture_league(
+    store: SnapshotStore,
+    league_id: int,
+    events: Optional[Iterable[int]] = None,
+    elements: bool = True,
+) -> None:
+    """Fetch a league's data and write it into the snapshot store.
+
+    Arguments:
+        store {SnapshotStore} -- The store to write to.
+        league_id {int} -- The League ID.
+        events {Optional[Iterable[int]]}
+            -- The events whose picks to capture (default to every finished
+               event).
+        elements {bool}
+            -- Also capture the per-Gameweek history and upcoming fixtures
+               of every element (needed by planner.TransferPlanner).
+    """
+    bootstrap_json = fetch.get_bootstrap_json()
+    store.put_json(fetch.PATHS["bootstrap"], bootstrap_json)
+
+    entries = []
+    for page, json_data in enumerate(fetch.iter_league_pages(league_id), 1):
+        store.put_json(
+            fetch.PATHS["league"].format(league_id=league_id, page=page),
+            json_data,
+        )
+        entries.extend(
+            row["entry"] for row in json_data["standings"]["results"]
+        )
+
+    matches_df = standings.matches_df_from_pages(
+        fetch.iter_league_matches_pages(league_id)
+    )
+    matches_df.insert(0, "league", league_id)
+    store.write("matches", matches_df)
+
+    if events is None:
+        events = [e["id"] for e in bootstrap_json["events"] if e["finished"]]
+    picks_df, history_df, subs_df = process.picks_dfs_from_json(
+        fetch.get_picks_json(entries, events)
+    )
+    store.write("picks", picks_df)
+    store.write("entry_history", history_df)
+    store.write("automatic_subs", subs_df)
+
+    if elements:
+        element_ids = [element["id"] for element in bootstrap_json["elements"]]
+        summaries = fetch.get_elements_json(element_ids)
+        store.write(
+            "elements",
+            process.element_history_df_from_json(summaries.values()),
+        )
+        store.write(
+            "fixtures", process.element_fixtures_df_from_json(summaries)
+        )
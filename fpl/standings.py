@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+import error
+
+__all__ = (
+    "MATCHES",
+    "matches_df_from_json",
+    "matches_df_from_pages",
+    "compute_standings",
+    "standings_as_of",
+    "append_standings",
+)
+
+# H2H league points for each result.
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+MATCHES = {
+    "id": "int32",
+    "event": "int16",
+    "entry_1_entry": "Int32",
+    "entry_1_name": "object",
+    "entry_1_player_name": "object",
+    "entry_1_points": "int16",
+    "entry_1_win": "int8",
+    "entry_1_draw": "int8",
+    "entry_1_loss": "int8",
+    # Null when entry 1 plays the league AVERAGE (odd-sized leagues).
+    "entry_2_entry": "Int32",
+    "entry_2_name": "object",
+    "entry_2_player_name": "object",
+    "entry_2_points": "int16",
+    "entry_2_win": "int8",
+    "entry_2_draw": "int8",
+    "entry_2_loss": "int8",
+}
+
+STANDINGS_COLUMNS = [
+    "event",
+    "entry",
+    "entry_name",
+    "player_name",
+    "event_points",
+    "matches_played",
+    "matches_won",
+    "matches_drawn",
+    "matches_lost",
+    "points_for",
+    "total",
+    "rank",
+    "last_rank",
+]
+
+
+def matches_df_from_json(results: Iterable[Dict]) -> pd.DataFrame:
+    """Returns a typed DataFrame of H2H matches.
+
+    Arguments:
+        results {Iterable[dict]} -- The `results` items from one or more
+                                    get_league_matches_json pages.
+
+    Raises:
+        error.JSONError -- If the JSON structure isn't as expected.
+    """
+    try:
+        df = pd.DataFrame(list(results))
+        if df.empty:
+            df = pd.DataFrame(columns=list(MATCHES))
+        df = df[list(MATCHES)].astype(MATCHES)
+    except Exception as exc:
+        msg = f"Error in structure of downloaded JSON: {exc}"
+        raise error.JSONError(msg) from exc
+    return df
+
+
+def matches_df_from_pages(pages: Iterable[Dict]) -> pd.DataFrame:
+    """Returns a typed DataFrame of H2H matches, built page by page.
+
+    Each page is converted to a compact typed chunk as it arrives, so the raw
+    JSON for the whole league is never held at once.
+
+    Arguments:
+        pages {Iterable[dict]} -- get_league_matches_json pages.
+
+    Raises:
+        error.JSONError -- If the JSON structure isn't as expected.
+    """
+    try:
+        chunks = [matches_df_from_json(page["results"]) for page in pages]
+    except (KeyError, TypeError) as exc:
+        msg = f"Error in structure of downloaded JSON: {exc}"
+        raise error.JSONError(msg) from exc
+    if not chunks:
+        return matches_df_from_json([])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _sides(matches_df: pd.DataFrame) -> pd.DataFrame:
+    """Return one row per (match, side) for the played matches.
+
+    Unplayed fixtures come back from the API with all of the win/draw/loss
+    flags zero, so they are dropped.
+    """
+    played = matches_df[
+        (matches_df["entry_1_win"] + matches_df["entry_1_draw"]
+         + matches_df["entry_1_loss"]) > 0
+    ]
+
+    sides = []
+    for us, them in (("entry_1", "entry_2"), ("entry_2", "entry_1")):
+        side = pd.DataFrame({
+            "event": played["event"].to_numpy(),
+            "entry": played[f"{us}_entry"].to_numpy(),
+            "entry_name": played[f"{us}_name"].to_numpy(),
+            "player_name": played[f"{us}_player_name"].to_numpy(),
+            "event_points": played[f"{us}_points"].to_numpy(np.int32),
+            "against": played[f"{them}_points"].to_numpy(np.int32),
+        })
+        sides.append(side)
+
+    long_df = pd.concat(sides, ignore_index=True)
+    # The league AVERAGE opponent has no entry.
+    long_df = long_df[long_df["entry"].notna()]
+    long_df["entry"] = long_df["entry"].astype(np.int32)
+    return long_df
+
+
+def compute_standings(
+    matches_df: pd.DataFrame,
+    events: Optional[Iterable[int]] = None,
+    initial: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Compute the league table as of every played Gameweek in one pass.
+
+    Ranks are by league points (3 for a win, 1 for a draw), then by total
+    points scored, as the FPL site does. Entries with equal league points and
+    points scored share a rank.
+
+    Arguments:
+        matches_df {pd.DataFrame}
+            -- The H2H matches, as from matches_df_from_json.
+        events {Optional[Iterable[int]]}
+            -- The events to include (default to every played event).
+        initial {Optional[pd.DataFrame]}
+            -- The table before the first of these events (e.g. from
+               standings_as_of), which the new results are added to.
+
+    Returns:
+        pd.DataFrame -- One row per (event, entry) with cumulative results,
+                        sorted by event then rank.
+    """
+    long_df = _sides(matches_df)
+    if long_df.empty:
+        return pd.DataFrame(columns=STANDINGS_COLUMNS)
+
+    diff = long_df["event_points"].to_numpy() - long_df["against"].to_numpy()
+    long_df["matches_won"] = (diff > 0).astype(np.int16)
+    long_df["matches_drawn"] = (diff == 0).astype(np.int16)
+    long_df["matches_lost"] = (diff < 0).astype(np.int16)
+    long_df["matches_played"] = np.ones(len(long_df), dtype=np.int16)
+
+    names = long_df.drop_duplicates("entry", keep="last").set_index("entry")
+    names = names[["entry_name", "player_name"]]
+    if initial is not None:
+        initial = initial.set_index("entry")
+        names = pd.concat([
+            initial.loc[~initial.index.isin(names.index), names.columns],
+            names,
+        ])
+
+    # Weekly (event x entry) grids - zero where an entry had no match.
+    counted = [
+        "event_points", "matches_played",
+        "matches_won", "matches_drawn", "matches_lost",
+    ]
+    weekly = long_df.groupby(["event", "entry"])[counted].sum()
+    if events is None:
+        event_index = np.sort(long_df["event"].unique())
+    else:
+        event_index = np.sort(np.asarray(list(events)))
+    grid_index = pd.MultiIndex.from_product(
+        [event_index, names.index], names=["event", "entry"]
+    )
+    weekly = weekly.reindex(grid_index, fill_value=0)
+
+    # Cumulative totals per entry, in event order.
+    cumulative = weekly.groupby(level="entry").cumsum()
+    if initial is not None:
+        start = initial.reindex(names.index, fill_value=0)
+        start = start.drop(columns="event_points") \
+            .rename(columns={"points_for": "event_points"})
+        start = start[counted].to_numpy()
+        cumulative[counted] += np.tile(start, (len(event_index), 1))
+    cumulative["points_for"] = cumulative["event_points"]
+    cumulative["event_points"] = weekly["event_points"]
+    cumulative["total"] = (
+        WIN_POINTS * cumulative["matches_won"]
+        + DRAW_POINTS * cumulative["matches_drawn"]
+    )
+
+    # Rank on a single key: league points, then points scored. The grid is in
+    # (event, entry) product order, so it reshapes to (events, entries).
+    sort_key = (
+        cumulative["total"].to_numpy(np.int64) * 100000
+        + cumulative["points_for"].to_numpy(np.int64)
+    ).reshape(len(event_index), len(names.index))
+    rank_grid = pd.DataFrame(sort_key).rank(
+        axis=1, method="min", ascending=False
+    ).to_numpy()
+    first_last_rank = np.full((1, rank_grid.shape[1]), np.nan)
+    if initial is not None:
+        first_last_rank[0] = initial["rank"].reindex(names.index) \
+            .to_numpy(np.float64, na_value=np.nan)
+    last_rank_grid = np.vstack([first_last_rank, rank_grid[:-1]])
+    cumulative["rank"] = rank_grid.ravel().astype(np.int16)
+    cumulative["last_rank"] = pd.array(
+        last_rank_grid.ravel(), dtype="Float64"
+    ).astype("Int16")
+
+    result = cumulative.reset_index().join(names, on="entry")
+    result = result.astype({
+        "event": np.int16,
+        "entry": np.int32,
+        "event_points": np.int16,
+        "matches_played": np.int16,
+        "matches_won": np.int16,
+        "matches_drawn": np.int16,
+        "matches_lost": np.int16,
+        "points_for": np.int32,
+        "total": np.int16,
+    })
+    result = result.sort_values(["event", "rank", "entry"], kind="stable")
+    return result[STANDINGS_COLUMNS].reset_index(drop=True)
+
+
+def standings_as_of(standings_df: pd.DataFrame, event: int) -> pd.DataFrame:
+    """Return the league table as it stood after the given Gameweek.
+
+    Arguments:
+        standings_df {pd.DataFrame} -- The output of compute_standings.
+        event {int} -- The Event ID for the Gameweek.
+    """
+    df = standings_df[standings_df["event"] == event]
+    return df.reset_index(drop=True)
+
+
+def append_standings(
+    standings_df: pd.DataFrame, matches_df: pd.DataFrame
+) -> pd.DataFrame:
+    """Extend a standings history with newly played Gameweeks.
+
+    Only the matches after the last event already in `standings_df` are
+    used, starting from the table as it stood then, so the cost is
+    proportional to the new events rather than the season so far.
+
+    Arguments:
+        standings_df {pd.DataFrame} -- The output of compute_standings.
+        matches_df {pd.DataFrame} -- H2H matches including the new events
+                                     (older events are ignored).
+
+    Returns:
+        pd.DataFrame -- The extended standings history.
+    """
+    if standings_df.empty:
+        return compute_standings(matches_df)
+
+    last_event = standings_df["event"].max()
+    delta_df = compute_standings(
+        matches_df[matches_df["event"] > last_event],
+        initial=standings_as_of(standings_df, last_event),
+    )
+    if delta_df.empty:
+        return standings_df
+    return pd.concat([standings_df, delta_df], ignore_index=True)
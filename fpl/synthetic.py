@@ -0,0 +1,686 @@
+"""Deterministic synthetic FPL API payloads.
+
+SyntheticSeason generates internally consistent JSON for every endpoint in
+fetch.py - bootstrap, element summaries, picks, H2H standings and matches -
+for leagues of any size, without touching the network. Element points feed
+the picks, picks feed the H2H matches, and matches feed the standings.
+"""
+import datetime
+import functools
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = (
+    "PAGE_SIZE",
+    "SyntheticSeason",
+)
+
+# Results per page of league standings and matches, as in the API.
+PAGE_SIZE = 50
+
+N_PL_TEAMS = 20
+
+# Squad composition per element type: (starting, bench).
+_SQUAD = {1: (1, 1), 2: (4, 1), 3: (4, 1), 4: (2, 1)}
+
+_ELEMENT_TYPES = (
+    (1, "Goalkeepers", "GKP", "Goalkeeper", "GKP"),
+    (2, "Defenders", "DEF", "Defender", "DEF"),
+    (3, "Midfielders", "MID", "Midfielder", "MID"),
+    (4, "Forwards", "FWD", "Forward", "FWD"),
+)
+
+_SEASON_START = datetime.datetime(2020, 9, 12, 10, 0)
+
+
+def _memoize(method: Callable) -> Callable:
+    """Cache a method's results on its instance (in `_memo`), so that they
+    are freed with the season rather than held by a global cache."""
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        memo = self._memo.setdefault(method.__name__, {})
+        try:
+            return memo[args]
+        except KeyError:
+            result = memo[args] = method(self, *args)
+            return result
+    return wrapper
+
+
+class SyntheticSeason:
+    """Class representing a generated season for one H2H league.
+
+    Every payload is a pure function of the constructor arguments, so the
+    same season can be regenerated anywhere (e.g. by a benchmark and a mock
+    server) and compared.
+    """
+    def __init__(
+        self,
+        n_entries: int = 20,
+        n_elements: int = 600,
+        n_events: int = 38,
+        finished: Optional[int] = None,
+        league_id: int = 1,
+        seed: int = 0,
+    ) -> None:
+        """Class constructor.
+
+        Keyword Arguments:
+            n_entries {int} -- The number of entries in the league.
+            n_elements {int} -- The number of elements (players).
+            n_events {int} -- The number of events (Gameweeks).
+            finished {Optional[int]} -- The last finished event (default to
+                                        half the season).
+            league_id {int} -- The H2H League ID.
+            seed {int} -- The random seed.
+        """
+        self.n_entries: int = n_entries
+        self.n_elements: int = n_elements
+        self.n_events: int = n_events
+        self.finished: int = n_events // 2 if finished is None else finished
+        self.league_id: int = league_id
+        self.seed: int = seed
+        self.entries: List[int] = [
+            league_id * 100000 + i for i in range(1, n_entries + 1)
+        ]
+        # Results of the _memoize'd methods, by method name then arguments.
+        self._memo: Dict[str, Dict[tuple, Any]] = {}
+
+
+    def __repr__(self) -> str:
+        """Instance string representation."""
+        classname = self.__class__.__name__
+        return (
+            f"{classname}(n_entries={self.n_entries}, "
+            f"n_elements={self.n_elements}, n_events={self.n_events}, "
+            f"finished={self.finished}, league_id={self.league_id}, "
+            f"seed={self.seed})"
+        )
+
+
+    def _rng(self, *key) -> random.Random:
+        """Return a generator seeded by the season and the given key."""
+        return random.Random(":".join(map(str, (self.seed,) + key)))
+
+
+    def element_team(self, element_id: int) -> int:
+        """Return the PL team of the given element."""
+        return (element_id - 1) % N_PL_TEAMS + 1
+
+
+    def element_type(self, element_id: int) -> int:
+        """Return the element type (position) of the given element."""
+        return (element_id - 1) // N_PL_TEAMS % 4 + 1
+
+
+    def element_quality(self, element_id: int) -> float:
+        """Return the element's underlying quality, in [0, 1)."""
+        return self._rng("quality", element_id).random()
+
+
+    def element_cost(self, element_id: int) -> int:
+        """Return the element's cost in tenths of a million."""
+        base = (45, 40, 45, 45)[self.element_type(element_id) - 1]
+        return base + int(self.element_quality(element_id) * 80)
+
+
+    def opponent(self, team: int, event: int) -> Tuple[int, bool]:
+        """Return the PL team's opponent in an event, and whether at home."""
+        # Circle-method round robin, repeated each half of the season.
+        teams = list(range(1, N_PL_TEAMS + 1))
+        rotation = (event - 1) % (N_PL_TEAMS - 1)
+        rotated = [teams[0]] + teams[1:][rotation:] + teams[1:][:rotation]
+        half = N_PL_TEAMS // 2
+        for i in range(half):
+            home, away = rotated[i], rotated[-1 - i]
+            if (event // (N_PL_TEAMS - 1)) % 2:
+                home, away = away, home
+            if team == home:
+                return away, True
+            if team == away:
+                return home, False
+        raise ValueError(team)
+
+
+    def team_strength(self, team: int) -> int:
+        """Return a PL team's strength (fixture difficulty when playing
+        them), from 2 to 5."""
+        return 2 + self._rng("strength", team).randrange(4)
+
+
+    @_memoize
+    def element_event(self, element_id: int, event: int) -> Dict:
+        """Return the element's history row for one (finished) event."""
+        rng = self._rng("history", element_id, event)
+        quality = self.element_quality(element_id)
+        element_type = self.element_type(element_id)
+        team = self.element_team(element_id)
+        opponent, was_home = self.opponent(team, event)
+
+        minutes = 90 if rng.random() < 0.5 + 0.4 * quality else (
+            rng.choice((0, 0, 20, 60))
+        )
+        played = minutes > 0
+        goals = sum(
+            rng.random() < 0.05 * element_type * quality for _ in range(3)
+        ) if played else 0
+        assists = sum(rng.random() < 0.15 * quality for _ in range(2)) \
+            if played else 0
+        team_score = rng.randrange(4)
+        team_conceded = rng.randrange(4)
+        clean_sheet = int(minutes >= 60 and team_conceded == 0)
+        bonus = rng.choice((0, 0, 0, 1, 2, 3)) if goals or assists else 0
+        points = 0
+        if played:
+            points = (
+                (2 if minutes >= 60 else 1)
+                + goals * (6, 6, 5, 4)[element_type - 1]
+                + assists * 3
+                + clean_sheet * (4, 4, 1, 0)[element_type - 1]
+                + bonus
+            )
+        influence = round(rng.random() * 40 * played, 1)
+        creativity = round(rng.random() * 40 * played, 1)
+        threat = round(rng.random() * 40 * played, 1)
+        return {
+            "element": element_id,
+            "fixture": (event - 1) * (N_PL_TEAMS // 2) + min(team, opponent),
+            "opponent_team": opponent,
+            "total_points": points,
+            "was_home": was_home,
+            "team_h_score": team_score if was_home else team_conceded,
+            "team_a_score": team_conceded if was_home else team_score,
+            "round": event,
+            "minutes": minutes,
+            "goals_scored": goals,
+            "assists": assists,
+            "clean_sheets": clean_sheet,
+            "goals_conceded": team_conceded if played else 0,
+            "own_goals": 0,
+            "penalties_saved": 0,
+            "penalties_missed": 0,
+            "yellow_cards": int(played and rng.random() < 0.1),
+            "red_cards": 0,
+            "saves": rng.randrange(6) if played and element_type == 1 else 0,
+            "bonus": bonus,
+            "bps": max(points * 3 + rng.randrange(10), 0) if played else 0,
+            "influence": f"{influence:.1f}",
+            "creativity": f"{creativity:.1f}",
+            "threat": f"{threat:.1f}",
+            "ict_index": f"{(influence + creativity + threat) / 10:.1f}",
+            "value": self.element_cost(element_id),
+            "transfers_balance": 0,
+            "selected": int(quality * 1000000),
+            "transfers_in": 0,
+            "transfers_out": 0,
+        }
+
+
+    def element_json(self, element_id: int) -> Dict:
+        """Return the element-summary/{id} payload."""
+        team = self.element_team(element_id)
+        fixtures = []
+        for event in range(self.finished + 1, self.n_events + 1):
+            opponent, is_home = self.opponent(team, event)
+            fixtures.append({
+                "id": (event - 1) * (N_PL_TEAMS // 2) + min(team, opponent),
+                "code": event * 1000 + min(team, opponent),
+                "team_h": team if is_home else opponent,
+                "team_a": opponent if is_home else team,
+                "event": event,
+                "event_name": f"Gameweek {event}",
+                "is_home": is_home,
+                "difficulty": self.team_strength(opponent),
+            })
+        return {
+            "fixtures": fixtures,
+            "history": [
+                self.element_event(element_id, event)
+                for event in range(1, self.finished + 1)
+            ],
+            "history_past": [],
+        }
+
+
+    def bootstrap_json(self) -> Dict:
+        """Return the bootstrap-static payload."""
+        events = []
+        for event in range(1, self.n_events + 1):
+            deadline = _SEASON_START + datetime.timedelta(weeks=event - 1)
+            finished = event <= self.finished
+            events.append({
+                "id": event,
+                "name": f"Gameweek {event}",
+                "deadline_time": deadline.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "average_entry_score": 50 if finished else 0,
+                "finished": finished,
+                "data_checked": finished,
+                "highest_scoring_entry": self.entries[0] if finished else None,
+                "highest_score": 100 if finished else None,
+                "is_previous": event == self.finished - 1,
+                "is_current": event == self.finished,
+                "is_next": event == self.finished + 1,
+                "chip_plays": [],
+                "most_selected": 1 if finished else None,
+                "most_transferred_in": 1 if finished else None,
+                "top_element": 1 if finished else None,
+                "top_element_info": None,
+                "transfers_made": 0,
+                "most_captained": 1 if finished else None,
+                "most_vice_captained": 1 if finished else None,
+            })
+
+        elements = []
+        for element_id in range(1, self.n_elements + 1):
+            history = [
+                self.element_event(element_id, event)
+                for event in range(1, self.finished + 1)
+            ]
+            totals = {
+                field: sum(row[field] for row in history)
+                for field in (
+                    "total_points", "minutes", "goals_scored", "assists",
+                    "clean_sheets", "goals_conceded", "own_goals",
+                    "penalties_saved", "penalties_missed", "yellow_cards",
+                    "red_cards", "saves", "bonus", "bps",
+                )
+            }
+            recent = history[-4:]
+            form = sum(row["total_points"] for row in recent) / max(
+                len(recent), 1
+            )
+            played = sum(row["minutes"] > 0 for row in history)
+            team = self.element_team(element_id)
+            elements.append({
+                "id": element_id,
+                "web_name": f"Player{element_id}",
+                "first_name": "Player",
+                "second_name": str(element_id),
+                "element_type": self.element_type(element_id),
+                "team": team,
+                "team_code": team,
+                "now_cost": self.element_cost(element_id),
+                "cost_change_start": 0,
+                "cost_change_event": 0,
+                "event_points": history[-1]["total_points"] if history else 0,
+                "form": f"{form:.1f}",
+                "points_per_game": (
+                    f"{totals['total_points'] / max(played, 1):.1f}"
+                ),
+                "selected_by_percent": (
+                    f"{self.element_quality(element_id) * 50:.1f}"
+                ),
+                "value_form": "0.0",
+                "value_season": "0.0",
+                "dreamteam_count": 0,
+                "in_dreamteam": False,
+                "transfers_in_event": 0,
+                "transfers_out_event": 0,
+                "status": "a",
+                **totals,
+            })
+
+        return {
+            "total_players": self.n_entries,
+            "events": events,
+            "game_settings": {},
+            "phases": [{
+                "id": 1,
+                "name": "Overall",
+                "start_event": 1,
+                "stop_event": self.n_events,
+            }],
+            "teams": [
+                {
+                    "id": team,
+                    "code": team,
+                    "name": f"Team {team}",
+                    "short_name": f"T{team:02d}",
+                    "strength": self.team_strength(team),
+                }
+                for team in range(1, N_PL_TEAMS + 1)
+            ],
+            "elements": elements,
+            "element_types": [
+                dict(zip(
+                    (
+                        "id", "plural_name", "plural_name_short",
+                        "singular_name", "singular_name_short",
+                    ),
+                    element_type,
+                ))
+                for element_type in _ELEMENT_TYPES
+            ],
+            "element_stats": [],
+        }
+
+
+    def entry_name(self, entry_id: int) -> Tuple[str, str]:
+        """Return the entry's team name and manager name."""
+        number = entry_id % 100000
+        return f"Team {number}", f"Manager {number}"
+
+
+    @_memoize
+    def squad(self, entry_id: int, event: int) -> List[Dict]:
+        """Return the entry's picks in one event."""
+        rng = self._rng("squad", entry_id, event)
+        by_type: Dict[int, List[int]] = {t: [] for t in _SQUAD}
+        for element_id in range(1, self.n_elements + 1):
+            by_type[self.element_type(element_id)].append(element_id)
+
+        starting, bench = [], []
+        for element_type, (n_starting, n_bench) in _SQUAD.items():
+            chosen = rng.sample(by_type[element_type], n_starting + n_bench)
+            starting.extend(chosen[:n_starting])
+            bench.extend(chosen[n_starting:])
+        captain, vice = rng.sample(range(len(starting)), 2)
+
+        picks = []
+        for position, element_id in enumerate(starting + bench, 1):
+            index = position - 1
+            picks.append({
+                "element": element_id,
+                "position": position,
+                "multiplier": (
+                    0 if position > len(starting)
+                    else 2 if index == captain else 1
+                ),
+                "is_captain": index == captain,
+                "is_vice_captain": index == vice,
+            })
+        return picks
+
+
+    @_memoize
+    def entry_points(self, entry_id: int, event: int) -> Tuple[int, int]:
+        """Return the entry's points and points on the bench in one event
+        (zero for unfinished events)."""
+        if event > self.finished:
+            return 0, 0
+        points = bench = 0
+        for pick in self.squad(entry_id, event):
+            element_points = self.element_event(
+                pick["element"], event
+            )["total_points"]
+            points += element_points * pick["multiplier"]
+            if pick["multiplier"] == 0:
+                bench += element_points
+        return points, bench
+
+
+    def transfers(self, entry_id: int, event: int) -> Tuple[int, int]:
+        """Return the entry's transfers and transfer cost in one event."""
+        if event == 1:
+            return 0, 0
+        made = self._rng("transfers", entry_id, event).choice((0, 1, 1, 2, 3))
+        return made, max(made - 1, 0) * 4
+
+
+    def entry_history_row(self, entry_id: int, event: int) -> Dict:
+        """Return the entry's history in one (finished) event."""
+        total = 0
+        for previous in range(1, event + 1):
+            total += self.entry_points(entry_id, previous)[0]
+            total -= self.transfers(entry_id, previous)[1]
+        points, bench = self.entry_points(entry_id, event)
+        made, cost = self.transfers(entry_id, event)
+        value = sum(
+            self.element_cost(pick["element"])
+            for pick in self.squad(entry_id, event)
+        )
+        return {
+            "event": event,
+            "points": points,
+            "total_points": total,
+            "rank": None,
+            "rank_sort": None,
+            "overall_rank": None,
+            "bank": max(1000 - value, 0),
+            "value": max(value, 1000),
+            "event_transfers": made,
+            "event_transfers_cost": cost,
+            "points_on_bench": bench,
+        }
+
+
+    def picks_json(self, entry_id: int, event: int) -> Dict:
+        """Return the entry/{id}/event/{event}/picks payload."""
+        return {
+            "active_chip": None,
+            "automatic_subs": [],
+            "entry_history": self.entry_history_row(entry_id, event),
+            "picks": self.squad(entry_id, event),
+        }
+
+
+    def entry_history_json(self, entry_id: int) -> Dict:
+        """Return the entry/{id}/history payload."""
+        return {
+            "chips": [],
+            "current": [
+                self.entry_history_row(entry_id, event)
+                for event in range(1, self.finished + 1)
+            ],
+            "past": [],
+        }
+
+
+    def entry_json(self, entry_id: int) -> Dict:
+        """Return the entry/{id} payload."""
+        name, player_name = self.entry_name(entry_id)
+        first_name, last_name = player_name.split(" ")
+        history = self.entry_history_row(entry_id, max(self.finished, 1))
+        return {
+            "id": entry_id,
+            "started_event": 1,
+            "favourite_team": None,
+            "name": name,
+            "player_first_name": first_name,
+            "player_last_name": last_name,
+            "player_region_id": 0,
+            "player_region_name": "",
+            "player_region_iso_code_short": "",
+            "summary_overall_points": history["total_points"],
+            "summary_overall_rank": None,
+            "summary_event_points": history["points"],
+            "summary_event_rank": None,
+            "current_event": self.finished,
+            "last_deadline_bank": history["bank"],
+            "last_deadline_value": history["value"],
+            "last_deadline_total_transfers": 0,
+            "leagues": {
+                "classic": [],
+                "h2h": [{
+                    "id": self.league_id,
+                    "name": f"Synthetic League {self.league_id}",
+                    "short_name": f"h2h-{self.league_id}",
+                    "start_event": 1,
+                    "entry_rank": None,
+                    "entry_last_rank": None,
+                }],
+                "cup": {"matches": []},
+            },
+        }
+
+
+    @_memoize
+    def matches(self) -> List[Dict]:
+        """Return every H2H match of the season, ordered by event."""
+        # Circle-method round robin; None is the league AVERAGE.
+        entries: List[Optional[int]] = list(self.entries)
+        if len(entries) % 2:
+            entries.append(None)
+        n_rounds = max(len(entries) - 1, 1)
+        average = {
+            event: sum(
+                self.entry_points(entry, event)[0] for entry in self.entries
+            ) // max(self.n_entries, 1)
+            for event in range(1, self.finished + 1)
+        }
+
+        matches = []
+        for event in range(1, self.n_events + 1):
+            rotation = (event - 1) % n_rounds
+            rotated = [entries[0]] + entries[1:][rotation:] + \
+                entries[1:][:rotation]
+            for i in range(len(entries) // 2):
+                entry_1, entry_2 = rotated[i], rotated[-1 - i]
+                if entry_1 is None:
+                    entry_1, entry_2 = entry_2, entry_1
+                matches.append(self._match(
+                    len(matches) + 1, event, entry_1, entry_2,
+                    average.get(event, 0),
+                ))
+        return matches
+
+
+    def _match(
+        self,
+        match_id: int,
+        event: int,
+        entry_1: int,
+        entry_2: Optional[int],
+        average: int,
+    ) -> Dict:
+        """Return one H2H match result."""
+        points_1 = self.entry_points(entry_1, event)[0] - \
+            self.transfers(entry_1, event)[1]
+        if entry_2 is None:
+            points_2 = average
+            name_2, player_2 = "AVERAGE", ""
+        else:
+            points_2 = self.entry_points(entry_2, event)[0] - \
+                self.transfers(entry_2, event)[1]
+            name_2, player_2 = self.entry_name(entry_2)
+        name_1, player_1 = self.entry_name(entry_1)
+
+        played = event <= self.finished
+        win_1 = int(played and points_1 > points_2)
+        loss_1 = int(played and points_1 < points_2)
+        draw = int(played and points_1 == points_2)
+        return {
+            "id": match_id,
+            "entry_1_entry": entry_1,
+            "entry_1_name": name_1,
+            "entry_1_player_name": player_1,
+            "entry_1_points": points_1 if played else 0,
+            "entry_1_win": win_1,
+            "entry_1_draw": draw,
+            "entry_1_loss": loss_1,
+            "entry_1_total": 0,
+            "entry_2_entry": entry_2,
+            "entry_2_name": name_2,
+            "entry_2_player_name": player_2,
+            "entry_2_points": points_2 if played else 0,
+            "entry_2_win": loss_1,
+            "entry_2_draw": draw,
+            "entry_2_loss": win_1,
+            "entry_2_total": 0,
+            "is_knockout": False,
+            "winner": None,
+            "seed_value": None,
+            "event": event,
+            "tiebreak": None,
+        }
+
+
+    def league_matches_json(
+        self,
+        page: int = 1,
+        event: Optional[int] = None,
+        page_size: int = PAGE_SIZE,
+    ) -> Dict:
+        """Return one page of the leagues-h2h-matches payload.
+
+        Arguments:
+            page {int} -- The 1-based page.
+            event {Optional[int]} -- Only include matches in this event.
+            page_size {int} -- The number of matches per page.
+        """
+        matches = self.matches()
+        if event is not None:
+            matches = [match for match in matches if match["event"] == event]
+        start = (page - 1) * page_size
+        return {
+            "has_next": start + page_size < len(matches),
+            "page": page,
+            "results": matches[start:start + page_size],
+        }
+
+
+    @_memoize
+    def standings(self) -> List[Dict]:
+        """Return the current H2H standings rows, ranked."""
+        rows = {
+            entry: {
+                "won": 0, "drawn": 0, "lost": 0, "points_for": 0,
+                "rank": 0, "last_rank": 0,
+            }
+            for entry in self.entries
+        }
+        for match in self.matches():
+            if match["event"] > self.finished:
+                continue
+            for side in ("entry_1", "entry_2"):
+                entry = match[f"{side}_entry"]
+                if entry is None:
+                    continue
+                row = rows[entry]
+                row["won"] += match[f"{side}_win"]
+                row["drawn"] += match[f"{side}_draw"]
+                row["lost"] += match[f"{side}_loss"]
+                row["points_for"] += match[f"{side}_points"]
+
+        def _total(entry):
+            return 3 * rows[entry]["won"] + rows[entry]["drawn"]
+
+        ranked = sorted(
+            self.entries,
+            key=lambda entry: (-_total(entry), -rows[entry]["points_for"]),
+        )
+        results = []
+        for rank, entry in enumerate(ranked, 1):
+            row = rows[entry]
+            name, player_name = self.entry_name(entry)
+            results.append({
+                "id": entry,
+                "division": self.league_id,
+                "entry": entry,
+                "player_name": player_name,
+                "rank": rank,
+                "last_rank": rank,
+                "rank_sort": rank,
+                "total": _total(entry),
+                "entry_name": name,
+                "matches_played": row["won"] + row["drawn"] + row["lost"],
+                "matches_won": row["won"],
+                "matches_drawn": row["drawn"],
+                "matches_lost": row["lost"],
+                "points_for": row["points_for"],
+            })
+        return results
+
+
+    def league_json(self, page: int = 1, page_size: int = PAGE_SIZE) -> Dict:
+        """Return one page of the leagues-h2h standings payload.
+
+        Arguments:
+            page {int} -- The 1-based page.
+            page_size {int} -- The number of standings rows per page.
+        """
+        results = self.standings()
+        start = (page - 1) * page_size
+        return {
+            "league": {
+                "id": self.league_id,
+                "name": f"Synthetic League {self.league_id}",
+                "start_event": 1,
+            },
+            "new_entries": {"has_next": False, "page": 1, "results": []},
+            "standings": {
+                "has_next": start + page_size < len(results),
+                "page": page,
+                "results": results[start:start + page_size],
+            },
+        }
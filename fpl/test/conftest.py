@@ -0,0 +1,9 @@
+"""Shared pytest configuration.
+
+The fpl modules import each other by module name, so the fpl directory
+goes on the path ahead of the tests.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+"""Integration test fixtures: the fetch layer pointed at a local
+mockapi.MockServer."""
+import pytest
+
+import cache
+import fetch
+import mockapi
+import ratelimit
+
+N_ENTRIES = 12
+N_EVENTS = 8
+FINISHED = 5
+LEAGUE_ID = 7
+
+
+@pytest.fixture(scope="session")
+def server():
+    with mockapi.MockServer(
+        n_entries=N_ENTRIES, n_elements=200, n_events=N_EVENTS,
+        finished=FINISHED,
+    ) as srv:
+        yield srv
+
+
+@pytest.fixture
+def api(server, tmp_path, monkeypatch):
+    """Point every fetch at the server, with an empty cache and no rate
+    limit; the previous base URL, cache and limiter are put back after."""
+    monkeypatch.setattr(fetch, "BASE_URL", fetch.BASE_URL)
+    monkeypatch.setattr(fetch, "CACHE", fetch.CACHE)
+    monkeypatch.setattr(fetch, "SNAPSHOT", None)
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit._limiter)
+    ratelimit.configure(None, shared=False)
+    fetch.set_base_url(
+        server.url, cache.ResponseCache(str(tmp_path / "cache"))
+    )
+    return server
+
+
+@pytest.fixture
+def faulty_server():
+    """A server rate limiting a fraction of requests with a 429."""
+    with mockapi.MockServer(
+        n_entries=N_ENTRIES, n_elements=200, n_events=N_EVENTS,
+        finished=FINISHED, error_rate=0.3, error_status=429,
+        retry_after=0.0,
+    ) as srv:
+        yield srv
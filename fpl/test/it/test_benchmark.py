@@ -0,0 +1,74 @@
+"""Integration tests for benchmark.py, against its local stub server."""
+import json
+
+import pytest
+
+import benchmark
+import fetch
+import ratelimit
+
+# Every case but the (slow) season simulation.
+CASES = [
+    "fetch_bootstrap_cold",
+    "fetch_bootstrap_cached",
+    "decode_bootstrap",
+    "bootstrap_elements_df_raw",
+    "element_history_df_raw",
+    "h2h_league_create",
+    "compute_standings",
+    "append_standings",
+]
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    return benchmark.synthetic_fixtures(n_entries=6, n_events=4)
+
+
+def test_fixtures_round_trip(fixtures, tmp_path):
+    benchmark.save_fixtures(str(tmp_path), fixtures)
+    assert benchmark.load_fixtures(str(tmp_path)) == fixtures
+
+
+def test_run(api, fixtures):
+    base_url, response_cache = fetch.BASE_URL, fetch.CACHE
+    limiter = ratelimit.get_limiter()
+    requests = api.stats["requests"]
+
+    record = benchmark.run(fixtures, {"entries": 6}, repeat=2, only=CASES)
+    assert list(record["results"]) == CASES
+    for result in record["results"].values():
+        assert 0 < result["best_s"] <= result["median_s"]
+        assert result["peak_bytes"] > 0
+    assert record["scale"] == {"entries": 6}
+
+    # Only the stub server was used, and the fetch layer is put back.
+    assert api.stats["requests"] == requests
+    assert (fetch.BASE_URL, fetch.CACHE) == (base_url, response_cache)
+    assert ratelimit.get_limiter().rate == limiter.rate
+
+
+def test_main_records_runs(api, fixtures, tmp_path):
+    benchmark.save_fixtures(str(tmp_path / "fixtures"), fixtures)
+    results = tmp_path / "results.jsonl"
+    argv = [
+        "--fixtures", str(tmp_path / "fixtures"),
+        "--results", str(results),
+        "--repeat", "1",
+        "--case", "decode_bootstrap",
+    ]
+    assert benchmark.main(argv) == 0
+    # Any slowdown counts as a regression at a negative threshold.
+    assert benchmark.main(
+        argv + ["--threshold", "-1", "--fail-on-regression"]
+    ) == 1
+
+    records = [
+        json.loads(line)
+        for line in results.read_text(encoding="utf-8").splitlines()
+    ]
+    assert len(records) == 2
+    assert all(
+        list(record["results"]) == ["decode_bootstrap"]
+        for record in records
+    )
@@ -0,0 +1,152 @@
+"""Integration tests for fetch.py and afetch.py against a mock API."""
+import functools
+
+import pytest
+
+import afetch
+import cache
+import data
+import error
+import fetch
+import metrics
+
+from .conftest import FINISHED, LEAGUE_ID, N_ENTRIES
+
+
+def test_league_pages(api):
+    season = api.season(LEAGUE_ID)
+    pages = list(fetch.iter_league_pages(LEAGUE_ID))
+    assert pages == [
+        season.league_json(page) for page in range(1, len(pages) + 1)
+    ]
+    entries = [
+        row["entry"] for page in pages for row in page["standings"]["results"]
+    ]
+    assert len(set(entries)) == N_ENTRIES
+
+
+def test_picks(api):
+    season = api.season(LEAGUE_ID)
+    entries = season.entries[:3]
+    picks = fetch.get_picks_json(entries, [1, 2])
+    assert picks == {
+        (entry, event): season.picks_json(entry, event)
+        for entry in entries for event in (1, 2)
+    }
+
+
+def test_not_found(api):
+    with pytest.raises(error.FetchError):
+        fetch.get_entry_event_picks_json(LEAGUE_ID * 100000 + 1, 99)
+
+    with pytest.raises(error.BulkFetchError) as exc_info:
+        fetch.get_elements_json([1, 9999])
+    assert set(exc_info.value.errors) == {9999}
+    assert set(exc_info.value.results) == {1}
+
+
+def test_responses_are_cached(api):
+    fetch.get_element_json(1)
+    requests = api.stats["requests"]
+    assert fetch.get_element_json(1) == api.season(1).element_json(1)
+    assert api.stats["requests"] == requests
+
+
+def test_revalidate(api):
+    bootstrap_json = fetch.get_bootstrap_json()
+    not_modified = api.stats["not_modified"]
+    assert fetch.get_bootstrap_json(revalidate=True) == bootstrap_json
+    assert fetch.get_elements_json([1, 2], revalidate=True)
+    assert fetch.get_elements_json([1, 2], revalidate=True)
+    assert api.stats["not_modified"] == not_modified + 3
+
+
+def test_league_season(api):
+    season = api.season(LEAGUE_ID)
+    league = data.LeagueSeason.create(
+        functools.partial(fetch.iter_league_pages, LEAGUE_ID),
+        fetch.get_entry_histories_json,
+    )
+    assert sorted(league.points_df.index) == season.entries
+    assert league.points_df.shape == (N_ENTRIES, FINISHED)
+    assert league.pivot("total_points")[FINISHED].sort_index().tolist() == [
+        season.entry_history_row(entry, FINISHED)["total_points"]
+        for entry in sorted(season.entries)
+    ]
+
+
+def test_metrics(api, monkeypatch):
+    monkeypatch.setattr(metrics, "REGISTRY", metrics.Registry())
+    fetch.get_elements_json([1, 2])
+    fetch.get_element_json(1)
+    stats = metrics.REGISTRY.snapshot()["element-summary/{id}"]
+    assert stats["requests"] == 2
+    assert stats["cache_misses"] == 2
+    assert stats["cache_hits"] == 1
+    assert stats["response_bytes"] > 0
+    assert stats["errors"] == 0
+
+
+def test_rate_limited_requests_are_retried(api, faulty_server, tmp_path):
+    fetch.set_base_url(
+        faulty_server.url, cache.ResponseCache(str(tmp_path / "faulty"))
+    )
+    summaries = fetch.get_elements_json(range(1, 31))
+    assert faulty_server.stats["errors"] > 0
+    season = faulty_server.season(1)
+    assert summaries == {
+        element: season.element_json(element) for element in range(1, 31)
+    }
+
+
+def test_afetch_matches_fetch(api):
+    try:
+        pages = afetch.run(afetch.get_league_matches_pages(LEAGUE_ID))
+        picks = afetch.run(afetch.get_picks_json(
+            api.season(LEAGUE_ID).entries[:2], [1]
+        ))
+    finally:
+        afetch.run(afetch.close())
+    assert pages == list(fetch.iter_league_matches_pages(LEAGUE_ID))
+    assert picks == fetch.get_picks_json(
+        api.season(LEAGUE_ID).entries[:2], [1]
+    )
+
+
+def test_afetch_revalidate(api):
+    try:
+        bootstrap_json = afetch.run(afetch.get_bootstrap_json())
+        afetch.run(afetch.get_elements_json([1, 2]))
+        not_modified = api.stats["not_modified"]
+        assert afetch.run(afetch.get_bootstrap_json(revalidate=True)) == \
+            bootstrap_json
+        assert afetch.run(afetch.get_elements_json(
+            [1, 2], revalidate=True
+        )) == fetch.get_elements_json([1, 2])
+    finally:
+        afetch.run(afetch.close())
+    assert api.stats["not_modified"] == not_modified + 3
+
+
+def test_afetch_errors_are_wrapped(api):
+    async def _get(key):
+        if key == 2:
+            raise ValueError("bad")
+        if key == 3:
+            raise error.FetchError("not found")
+        return key
+
+    with pytest.raises(error.BulkFetchError) as exc_info:
+        afetch.run(afetch.gather_bounded(_get, [1, 2, 3]))
+    errors = exc_info.value.errors
+    assert set(errors) == {2, 3}
+    assert all(isinstance(exc, error.FetchError) for exc in errors.values())
+    assert isinstance(errors[2].__cause__, ValueError)
+    assert exc_info.value.results == {1: 1}
+
+    try:
+        with pytest.raises(error.BulkFetchError) as exc_info:
+            afetch.run(afetch.get_elements_json([1, 9999]))
+    finally:
+        afetch.run(afetch.close())
+    assert isinstance(exc_info.value.errors[9999], error.FetchError)
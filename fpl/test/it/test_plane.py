@@ -0,0 +1,117 @@
+"""Integration tests for plane.py against a mock API."""
+import copy
+
+import pandas as pd
+import pytest
+
+import fetch
+import plane
+
+from .conftest import FINISHED, LEAGUE_ID, N_ENTRIES, N_EVENTS
+
+
+@pytest.fixture
+def data_plane(api):
+    return plane.DataPlane()
+
+
+def _held_back(finished):
+    """Return a bootstrap getter reporting only `finished["n"]` finished
+    events, returning the same object until that changes."""
+    versions = {}
+
+    def _get():
+        n = finished["n"]
+        if n not in versions:
+            json_data = copy.deepcopy(fetch.get_bootstrap_json())
+            for event in json_data["events"]:
+                event["finished"] = event["id"] <= n
+                event["is_current"] = event["id"] == n
+            versions[n] = json_data
+        return versions[n]
+    return _get
+
+
+def test_league_view(api, data_plane):
+    view = data_plane.league(LEAGUE_ID)
+    assert view.id == LEAGUE_ID
+    assert view.events == list(range(1, FINISHED + 1))
+    assert len(view.standings_df) == N_ENTRIES
+    assert set(view.matches_df["event"]) == set(view.events)
+    assert set(view.picks_df["event"]) == set(view.events)
+    assert data_plane.leagues == [LEAGUE_ID]
+
+    # A second view reuses the model and its ownership.
+    requests = api.stats["requests"]
+    other = data_plane.league(LEAGUE_ID)
+    assert other.ownership is view.ownership
+    assert api.stats["requests"] == requests
+
+
+def test_update_matches_build(api):
+    finished = {"n": FINISHED - 2}
+    data_plane = plane.DataPlane(get_bootstrap_func=_held_back(finished))
+    old = data_plane.league(LEAGUE_ID)
+    assert old.events == list(range(1, FINISHED - 1))
+
+    finished["n"] = FINISHED
+    data_plane.refresh()
+    new = data_plane.league(LEAGUE_ID)
+    fresh = plane.DataPlane().league(LEAGUE_ID)
+
+    # The old view keeps the version it was created with.
+    assert old.events == list(range(1, FINISHED - 1))
+    assert new.events == fresh.events
+    for table in ("matches_df", "standings_history_df", "picks_df",
+                  "entry_history_df", "stats_df"):
+        got = getattr(new, table)
+        expected = getattr(fresh, table)
+        if table == "stats_df":
+            got, expected = got.sort_index(), expected.sort_index()
+        else:
+            columns = [c for c in ("event", "entry", "id", "position")
+                       if c in expected]
+            got = got.sort_values(columns).reset_index(drop=True)
+            expected = expected.sort_values(columns).reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_transfer_planner(api, data_plane):
+    transfer_planner = data_plane.transfer_planner()
+    assert transfer_planner.events == tuple(range(FINISHED + 1, N_EVENTS + 1))
+    assert data_plane.transfer_planner() is transfer_planner
+
+    view = data_plane.league(LEAGUE_ID)
+    entry = view.standings_df["entry"].iloc[0]
+    picks_df = view.picks_df
+    squad = picks_df.loc[
+        (picks_df["entry"] == entry) & (picks_df["event"] == FINISHED),
+        "element",
+    ].tolist()
+    plans = transfer_planner.plan(squad, 0, horizon=2, max_transfers=1)
+    assert plans and plans[0].gain >= 0
+
+
+def test_evict(api, data_plane):
+    data_plane.league(LEAGUE_ID)
+    data_plane.league(LEAGUE_ID + 1)
+    data_plane.evict(LEAGUE_ID)
+    assert data_plane.leagues == [LEAGUE_ID + 1]
+    data_plane.evict()
+    assert data_plane.leagues == []
+
+
+def test_element_cube(api, data_plane):
+    view = data_plane.league(LEAGUE_ID)
+    element_cube = view.element_cube
+    assert element_cube is data_plane.league(LEAGUE_ID).element_cube
+    assert element_cube.n_events == FINISHED
+    assert set(view.picks_df["element"]) <= set(
+        element_cube.element_ids.tolist()
+    )
+
+    # Loading another league's elements rebuilds it, over all of them.
+    other = data_plane.league(LEAGUE_ID + 1)
+    assert set(other.picks_df["element"]) <= set(
+        other.element_cube.element_ids.tolist()
+    )
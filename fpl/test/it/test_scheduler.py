@@ -0,0 +1,44 @@
+"""Integration tests for scheduler.py against a mock API."""
+import fetch
+import plane
+import scheduler
+
+from .conftest import FINISHED, LEAGUE_ID, N_ENTRIES
+
+
+def test_prewarm(api):
+    bootstrap_json = scheduler.prewarm([LEAGUE_ID])
+    assert bootstrap_json == api.season(1).bootstrap_json()
+
+    requests = api.stats["requests"]
+    entries = api.season(LEAGUE_ID).entries
+    fetch.get_picks_json(entries, range(1, FINISHED + 1))
+    list(fetch.iter_league_matches_pages(LEAGUE_ID, FINISHED))
+    # As read by the app's season projection and transfer planner.
+    list(fetch.iter_league_matches_pages(LEAGUE_ID))
+    plane.DataPlane().transfer_planner()
+    assert api.stats["requests"] == requests
+
+
+def test_poll_live(api):
+    season = api.season(LEAGUE_ID)
+    engine = scheduler.live_engine([LEAGUE_ID], FINISHED)
+    assert sorted(scheduler.poll_live(engine)) == sorted(season.entries)
+    assert len(engine.scores) == N_ENTRIES
+
+    for entry, score in engine.scores.items():
+        history = season.entry_history_row(entry, FINISHED)
+        assert score["transfers_cost"] == history["event_transfers_cost"]
+        assert score["points"] == \
+            score["gross_points"] - score["transfers_cost"]
+
+    # Nothing changed, so every revalidation is a 304.
+    not_modified = api.stats["not_modified"]
+    assert scheduler.poll_live(engine) == []
+    assert api.stats["not_modified"] == \
+        not_modified + len(engine.elements) + 1
+
+
+def test_run_live_without_live_event(api):
+    # The mock's current Gameweek has finished.
+    assert scheduler.run_live([LEAGUE_ID], once=True) is None
@@ -0,0 +1,73 @@
+"""Integration tests for snapshot.capture_league against a mock API."""
+import functools
+
+import pandas as pd
+import pytest
+
+import data
+import fetch
+import snapshot
+import standings
+
+from .conftest import FINISHED, LEAGUE_ID
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def store(api, tmp_path):
+    store = snapshot.SnapshotStore(str(tmp_path / "snapshot"))
+    snapshot.capture_league(store, LEAGUE_ID)
+    return store
+
+
+def test_capture_round_trip(api, store):
+    season = api.season(LEAGUE_ID)
+    assert store.get_json(fetch.PATHS["bootstrap"]) == \
+        fetch.get_bootstrap_json()
+    pd.testing.assert_frame_equal(
+        store.load_bootstrap().elements_df,
+        data.Bootstrap.create(fetch.get_bootstrap_json).elements_df,
+    )
+    league = data.H2HLeague.create(
+        functools.partial(fetch.iter_league_pages, LEAGUE_ID)
+    )
+    assert store.load_league(LEAGUE_ID).standings_df.equals(
+        league.standings_df
+    )
+
+    entry = season.entries[0]
+    for event in (1, FINISHED):
+        key = fetch.PATHS["picks"].format(entry_id=entry, event_id=event)
+        assert store.get_json(key) == season.picks_json(entry, event)
+
+    expected = api.season(1).element_json(3)
+    got = store.get_json(fetch.PATHS["element"].format(element_id=3))
+    assert got["history"] == expected["history"]
+    assert got["fixtures"] == [
+        {k: v for k, v in fixture.items() if k != "event_name"}
+        for fixture in expected["fixtures"]
+    ]
+
+    matches = store.get_json(
+        fetch.PATHS["league_event_matches"].format(
+            league_id=LEAGUE_ID, page=1, event_id=FINISHED
+        )
+    )
+    # The table keeps the columns standings.py reads.
+    assert standings.matches_df_from_pages([matches]).equals(
+        standings.matches_df_from_pages(
+            fetch.iter_league_matches_pages(LEAGUE_ID, FINISHED)
+        )
+    )
+
+
+def test_snapshot_serves_fetches(api, store, monkeypatch):
+    monkeypatch.setattr(fetch, "SNAPSHOT", store)
+    requests = api.stats["requests"]
+    entry = api.season(LEAGUE_ID).entries[1]
+    assert fetch.get_entry_event_picks_json(entry, 2) == \
+        api.season(LEAGUE_ID).picks_json(entry, 2)
+    assert list(fetch.iter_league_pages(LEAGUE_ID))
+    assert api.stats["requests"] == requests
+
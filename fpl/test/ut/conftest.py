@@ -0,0 +1,51 @@
+"""Unit test fixtures: a small synthetic league, served without HTTP."""
+import pytest
+
+import standings
+import synthetic
+
+
+def pages(get_page, has_next):
+    """Return every page from a 1-based page getter."""
+    result = [get_page(1)]
+    while has_next(result[-1]):
+        result.append(get_page(len(result) + 1))
+    return result
+
+
+@pytest.fixture(scope="session")
+def season():
+    # An odd number of entries, so some matches are against the AVERAGE.
+    return synthetic.SyntheticSeason(
+        n_entries=7, n_elements=200, n_events=8, finished=6
+    )
+
+
+@pytest.fixture(scope="session")
+def matches_df(season):
+    return standings.matches_df_from_pages(pages(
+        season.league_matches_json, lambda page: page["has_next"]
+    ))
+
+
+@pytest.fixture(scope="session")
+def get_matches(season):
+    """Return a LeagueHistory get_matches_func for the season."""
+    def _get(event_id):
+        return pages(
+            lambda page: season.league_matches_json(page, event_id),
+            lambda page: page["has_next"],
+        )
+    return _get
+
+
+@pytest.fixture(scope="session")
+def get_picks(season):
+    """Return a LeagueHistory get_picks_func for the season."""
+    def _get(entry_ids, event_ids):
+        event_ids = list(event_ids)
+        return {
+            (entry, event): season.picks_json(entry, event)
+            for entry in entry_ids for event in event_ids
+        }
+    return _get
@@ -0,0 +1,133 @@
+"""Unit tests for breakdown.py."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import breakdown
+import data
+import process
+
+ENTRY, EVENT = 1, 2
+
+
+def _history(rows):
+    """Return element history from (element, event, total_points, minutes)
+    rows."""
+    return pd.DataFrame(
+        rows, columns=["element", "event", "total_points", "minutes"]
+    )
+
+
+def _picks(picks):
+    """Return one team's picks from (element, position, multiplier,
+    is_captain, is_vice_captain) tuples."""
+    return pd.DataFrame([
+        {
+            "entry": ENTRY,
+            "event": EVENT,
+            "element": element,
+            "position": position,
+            "multiplier": multiplier,
+            "is_captain": is_captain,
+            "is_vice_captain": is_vice,
+        }
+        for element, position, multiplier, is_captain, is_vice in picks
+    ])
+
+
+def test_element_event_index():
+    # Element 1 has a Double Gameweek in event 2 and a blank in event 3.
+    index = breakdown.ElementEventIndex(_history([
+        (1, 1, 2, 90), (1, 2, 6, 90), (1, 2, 3, 60), (1, 4, 1, 30),
+        (2, 1, 5, 90),
+    ]))
+    assert (index.n_elements, index.n_events) == (3, 5)
+    assert index.points[1].tolist() == [0, 2, 9, 0, 1]
+    assert index.minutes[1].tolist() == [0, 90, 150, 0, 30]
+    assert index.lookup(
+        index.points, np.array([1, 2, 2, 9]), np.array([2, 1, 9, 1])
+    ).tolist() == [9, 5, 0, 0]
+
+
+def test_captain_and_auto_sub():
+    history = _history([
+        (1, EVENT, 5, 90), (2, EVENT, 0, 0), (3, EVENT, 3, 90),
+        (4, EVENT, 4, 90),
+    ])
+    picks = _picks([
+        (1, 1, 2, True, False),
+        (2, 2, 1, False, True),
+        (3, 12, 0, False, False),
+        (4, 13, 0, False, False),
+    ])
+    subs = pd.DataFrame(
+        [{"entry": ENTRY, "event": EVENT, "element_in": 3, "element_out": 2}]
+    )
+    entry_history = pd.DataFrame(
+        [{"entry": ENTRY, "event": EVENT, "event_transfers_cost": 4}]
+    )
+    detail_df, summary_df = breakdown.compute_breakdown(
+        picks, history, entry_history, subs
+    )
+    assert detail_df["multiplier"].tolist() == [2, 0, 1, 0]
+    assert detail_df["contribution"].tolist() == [10, 0, 3, 0]
+    assert detail_df["auto_sub_in"].tolist() == [False, False, True, False]
+    assert detail_df["auto_sub_out"].tolist() == [False, True, False, False]
+    assert summary_df.drop(columns=["entry", "event"]).iloc[0].to_dict() == {
+        "starting_points": 5,
+        "captain_points": 5,
+        "auto_sub_points": 3,
+        "bench_points": 4,
+        "points": 13,
+        "transfers_cost": 4,
+        "net_points": 9,
+    }
+
+
+@pytest.mark.parametrize("vice_minutes, multipliers", [
+    # The vice-captain played, so takes the captain's multiplier.
+    (90, [0, 2]),
+    # Neither played: the captain keeps the (pointless) multiplier.
+    (0, [2, 1]),
+])
+def test_vice_captain_fallback(vice_minutes, multipliers):
+    history = _history([(1, EVENT, 0, 0), (2, EVENT, 4, vice_minutes)])
+    picks = _picks([(1, 1, 2, True, False), (2, 2, 1, False, True)])
+    detail_df, summary_df = breakdown.compute_breakdown(picks, history)
+    assert detail_df["multiplier"].tolist() == multipliers
+    assert summary_df["points"].tolist() == [4 * multipliers[1]]
+    assert summary_df["transfers_cost"].tolist() == [0]
+
+
+def test_league_history_breakdown(season, get_matches, get_picks):
+    history = data.LeagueHistory.create(
+        season.league_id, range(1, 7), get_matches, get_picks
+    )
+    element_history_df = process.element_history_df_from_json(
+        season.element_json(element) for element in history.element_ids
+    )
+    detail_df, summary_df = history.points_breakdown(element_history_df)
+    assert len(detail_df) == len(history.picks_df)
+    assert len(summary_df) == 7 * 6
+
+    df = summary_df.merge(
+        history.entry_history_df, on=["entry", "event"],
+        suffixes=("", "_api"),
+    )
+    assert (df["bench_points"] == df["points_on_bench"]).all()
+    assert (
+        df["net_points"] == df["points"] - df["event_transfers_cost"]
+    ).all()
+    assert (
+        df["points"]
+        == df["starting_points"] + df["captain_points"]
+        + df["auto_sub_points"]
+    ).all()
+    # The synthetic season has no vice-captain fallback, so the points only
+    # match the API's where the captain played.
+    captains = detail_df[detail_df["is_captain"]]
+    played = df.merge(
+        captains.loc[captains["minutes"] > 0, ["entry", "event"]]
+    )
+    assert len(played) > 0
+    assert (played["points"] == played["points_api"]).all()
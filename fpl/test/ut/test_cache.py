@@ -0,0 +1,135 @@
+"""Unit tests for cache.py."""
+import os
+
+import pytest
+
+import cache
+
+NOW = cache.parse_time("2020-09-20T12:00:00Z")
+
+EVENTS = [
+    {"id": 1, "deadline_time": "2020-09-12T10:00:00Z", "finished": True,
+     "is_current": False},
+    {"id": 2, "deadline_time": "2020-09-19T10:00:00Z", "finished": True,
+     "is_current": True},
+    {"id": 3, "deadline_time": "2020-09-26T10:00:00Z", "finished": False,
+     "is_current": False},
+]
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    return cache.ResponseCache(str(tmp_path))
+
+
+def test_parse_time():
+    assert cache.parse_time("1970-01-01T00:01:00Z") == 60.0
+    assert cache.parse_time("1970-01-01T01:01:00+01:00") == 60.0
+
+
+def test_policy_before_events():
+    policy = cache.TTLPolicy(default_ttl=100.0)
+    assert policy.ttl_for("entry/1/event/1/picks/") == 100.0
+
+
+def test_policy_finished_events_are_immutable():
+    policy = cache.TTLPolicy()
+    policy.update(EVENTS)
+    assert policy.ttl_for("entry/1/event/2/picks/", NOW) is None
+    assert policy.ttl_for(
+        "leagues-h2h-matches/league/7/?page=1&event=1", NOW
+    ) is None
+    assert policy.ttl_for("entry/1/event/3/picks/", NOW) is not None
+    # Every event's matches change until the season is over.
+    assert policy.ttl_for("leagues-h2h-matches/league/7/?page=1", NOW) \
+        is not None
+
+
+def test_policy_until_next_deadline():
+    policy = cache.TTLPolicy(default_ttl=7 * 24 * 3600.0)
+    policy.update(EVENTS)
+    deadline = cache.parse_time(EVENTS[2]["deadline_time"])
+    assert policy.ttl_for("bootstrap-static", NOW) == deadline - NOW
+    # Capped by the default TTL.
+    policy.default_ttl = 60.0
+    assert policy.ttl_for("bootstrap-static", NOW) == 60.0
+    # The season is over.
+    assert policy.ttl_for("bootstrap-static", deadline + 1) == 60.0
+
+
+def test_policy_live():
+    policy = cache.TTLPolicy(live_ttl=30.0)
+    policy.update([dict(EVENTS[2], is_current=True)])
+    assert policy.live
+    assert policy.ttl_for("bootstrap-static", NOW) == 30.0
+
+
+def test_put_get(response_cache, tmp_path):
+    assert response_cache.get("a") is None
+    response_cache.put("a", {"value": 1}, ttl=60.0)
+    assert response_cache.get("a") == {"value": 1}
+    assert response_cache.stats.hits == 1
+    assert response_cache.stats.misses == 1
+    # The files are the source of truth, shared by other instances.
+    assert cache.ResponseCache(str(tmp_path)).get("a") == {"value": 1}
+
+
+def test_expired(response_cache):
+    response_cache.put("a", {"value": 1}, ttl=0.0)
+    assert response_cache.get("a") is None
+    assert response_cache.stats.stale == 1
+
+
+def test_put_uses_stored_policy(response_cache, tmp_path):
+    response_cache.put("bootstrap-static", {"events": EVENTS}, ttl=60.0)
+    # A cold instance reads the policy from the stored bootstrap.
+    cold = cache.ResponseCache(str(tmp_path))
+    cold.put("entry/1/event/1/picks/", {"picks": []})
+    assert cold.policy.finished_events == {1, 2}
+    assert cold._read_meta("entry/1/event/1/picks/")["expires"] is None
+
+
+def test_invalidate(response_cache):
+    response_cache.put("a", {"value": 1}, ttl=60.0)
+    response_cache.put("b", {"value": 2}, ttl=None)
+    assert response_cache.invalidate() == 1
+    assert response_cache.get("a") is None
+    assert response_cache.get("b") == {"value": 2}
+    assert response_cache.invalidate(immutable=True) == 1
+    assert response_cache.get("b") is None
+
+
+def test_revalidate(response_cache):
+    response_cache.put(
+        "a", {"value": 1}, ttl=0.0,
+        validators={"etag": '"v1"', "last_modified": None}, raw_size=1000,
+    )
+    assert response_cache.get("a") is None
+    # Stale entries keep their validators for a conditional request.
+    assert response_cache.validators("a") == {"etag": '"v1"'}
+    assert response_cache.revalidate("a", ttl=60.0) == {"value": 1}
+    assert response_cache.get("a") == {"value": 1}
+    assert response_cache.stats.not_modified == 1
+    assert response_cache.stats.bytes_saved == 1000
+    assert response_cache.revalidate("missing", ttl=60.0) is None
+
+
+def test_lru_eviction(tmp_path):
+    # Without the memory tier every get() touches the body on disk.
+    response_cache = cache.ResponseCache(str(tmp_path), memory_items=0)
+    for key in ("a", "b"):
+        response_cache.put(key, {"key": key, "data": list(range(100))})
+    size = max(
+        os.path.getsize(response_cache._paths(key)[0]) for key in ("a", "b")
+    )
+    for key, mtime in (("a", 1000), ("b", 2000)):
+        os.utime(response_cache._paths(key)[0], (mtime, mtime))
+
+    # "a" is used again, so "b" is now the least recently used.
+    assert response_cache.get("a") is not None
+    response_cache.max_bytes = int(size * 2.5)
+    response_cache.put("c", {"key": "c", "data": list(range(100))})
+    assert response_cache.stats.evictions == 1
+    assert response_cache.get("b") is None
+    assert response_cache.get("a") is not None
+    assert response_cache.get("c") is not None
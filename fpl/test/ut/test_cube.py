@@ -0,0 +1,156 @@
+"""Unit tests for cube.py."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import cube
+import process
+
+ELEMENTS = (1, 2, 3, 50, 120, 200)
+
+
+@pytest.fixture(scope="module")
+def history_df(season):
+    return process.element_history_df_from_json(
+        season.element_json(element) for element in ELEMENTS
+    )
+
+
+@pytest.fixture(scope="module")
+def element_cube(history_df):
+    return cube.ElementCube.from_history_df(history_df)
+
+
+def _window(history_df, stat, event, window):
+    """Return each element's stat summed over the window, with pandas."""
+    in_window = history_df["event"].between(event - window + 1, event)
+    return history_df[in_window].groupby("element")[stat].sum().reindex(
+        list(ELEMENTS), fill_value=0
+    ).to_numpy()
+
+
+def test_dtypes_and_shape(season, element_cube):
+    assert element_cube.values.dtype == np.int16
+    assert element_cube.cumsum.dtype == np.int32
+    assert element_cube.played_cumsum.dtype == np.int16
+    assert element_cube.rows.dtype == np.int16
+    assert element_cube.values.shape == \
+        (len(ELEMENTS), season.finished + 1, len(cube.STATS))
+    assert element_cube.n_events == season.finished
+    assert not element_cube.values[:, 0].any()
+    assert element_cube.element_ids.tolist() == list(ELEMENTS)
+
+
+def test_lookup(history_df, element_cube):
+    row = history_df[
+        (history_df["element"] == 50) & (history_df["event"] == 3)
+    ].iloc[0]
+    assert element_cube.get(50, 3, "total_points") == row["total_points"]
+    assert element_cube.get(50, 3, "fixtures") == 1
+    assert element_cube.get(50, 3, "influence") == \
+        pytest.approx(row["influence"])
+    assert element_cube.row(50) == ELEMENTS.index(50)
+    with pytest.raises(KeyError):
+        element_cube.row(4)
+    with pytest.raises(KeyError):
+        element_cube.row(9999)
+
+
+@pytest.mark.parametrize("event, window", [
+    (1, 1), (3, 1), (3, 2), (5, 3), (6, 6), (6, 10), (4, 4),
+])
+def test_window_sum(history_df, element_cube, event, window):
+    for stat in ("total_points", "minutes", "bonus"):
+        np.testing.assert_array_equal(
+            element_cube.window_sum(stat, event, window),
+            _window(history_df, stat, event, window),
+        )
+    np.testing.assert_array_equal(
+        element_cube.appearances(event, window),
+        _window(
+            history_df.assign(played=history_df["minutes"] > 0),
+            "played", event, window,
+        ),
+    )
+
+
+def test_rolling(element_cube):
+    rolling = element_cube.rolling("total_points", 3)
+    for event in range(1, element_cube.n_events + 1):
+        np.testing.assert_array_equal(
+            rolling[:, event],
+            element_cube.window_sum("total_points", event, 3),
+        )
+
+
+def test_form_and_points_per_match(history_df, element_cube):
+    event = element_cube.n_events
+    np.testing.assert_allclose(
+        element_cube.form(event, 4),
+        _window(history_df, "total_points", event, 4) / 4,
+    )
+    # Early in the season the window is the events so far.
+    np.testing.assert_allclose(
+        element_cube.form(2, 4),
+        _window(history_df, "total_points", 2, 2) / 2,
+    )
+
+    played = history_df[history_df["minutes"] > 0]
+    expected = played.groupby("element")["total_points"].mean().reindex(
+        list(ELEMENTS), fill_value=0
+    )
+    np.testing.assert_allclose(
+        element_cube.points_per_match(event), expected, rtol=1e-6
+    )
+
+
+@pytest.mark.parametrize("window", [0, -1])
+def test_bad_window(element_cube, window):
+    with pytest.raises(ValueError):
+        element_cube.window_sum("total_points", 3, window)
+    with pytest.raises(ValueError):
+        element_cube.rolling("total_points", window)
+
+
+def test_double_gameweek(history_df):
+    first = history_df[history_df["event"] == 2].iloc[[0]]
+    second = first.assign(
+        fixture=first["fixture"] + 1000,
+        total_points=5,
+        minutes=30,
+        value=first["value"] + 1,
+    )
+    element_cube = cube.ElementCube.from_history_df(
+        pd.concat([history_df, second], ignore_index=True)
+    )
+    element = int(first["element"].iloc[0])
+    assert element_cube.get(element, 2, "fixtures") == 2
+    assert element_cube.get(element, 2, "total_points") == \
+        int(first["total_points"].iloc[0]) + 5
+    assert element_cube.get(element, 2, "minutes") == \
+        int(first["minutes"].iloc[0]) + 30
+    # Value isn't summed.
+    assert element_cube.get(element, 2, "value") == \
+        int(first["value"].iloc[0]) + 1
+
+
+def test_frame(history_df, element_cube):
+    frame = element_cube.frame(3, ("total_points", "ict_index"))
+    assert frame.index.tolist() == list(ELEMENTS)
+    assert frame["ict_index"].dtype == np.float32
+    expected = history_df[history_df["event"] == 3].set_index("element")
+    np.testing.assert_array_equal(
+        frame["total_points"], expected.loc[list(ELEMENTS), "total_points"]
+    )
+    np.testing.assert_allclose(
+        frame["ict_index"], expected.loc[list(ELEMENTS), "ict_index"],
+        rtol=1e-6,
+    )
+
+
+def test_empty_history():
+    element_cube = cube.ElementCube.from_history_df(
+        process.element_history_df_from_json([])
+    )
+    assert element_cube.n_events == 0
+    assert len(element_cube.element_ids) == 0
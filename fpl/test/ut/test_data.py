@@ -0,0 +1,225 @@
+"""Unit tests for data.py."""
+import pandas as pd
+import pytest
+
+import data
+import error
+from .conftest import pages
+
+
+# Each table's row key: update() appends event by event, so rows may come
+# in a different order than from one fetch of every event.
+TABLES = {
+    "matches_df": ["event", "id"],
+    "standings_df": ["event", "entry"],
+    "picks_df": ["entry", "event", "position"],
+    "entry_history_df": ["entry", "event"],
+    "automatic_subs_df": ["entry", "event", "element_in"],
+    "entry_stats_df": None,
+}
+
+
+def _sorted(df, keys):
+    df = df.sort_values(keys) if keys else df.sort_index()
+    return df.reset_index(drop=keys is not None)
+
+
+def _assert_history_equal(actual, expected):
+    assert actual.id == expected.id
+    assert actual.events == expected.events
+    for table, keys in TABLES.items():
+        pd.testing.assert_frame_equal(
+            _sorted(getattr(actual, table), keys),
+            _sorted(getattr(expected, table), keys),
+            obj=table,
+        )
+
+
+def test_h2h_league_create_from_pages(season):
+    league_pages = pages(
+        lambda page: season.league_json(page, page_size=3),
+        lambda page: page["standings"]["has_next"],
+    )
+    assert len(league_pages) == 3
+
+    league = data.H2HLeague.create(lambda: iter(league_pages))
+    single = data.H2HLeague.create(season.league_json)
+    assert league.id == season.league_id
+    assert league.standings_df["entry"].tolist() == \
+        [row["entry"] for row in season.standings()]
+    pd.testing.assert_frame_equal(league.standings_df, single.standings_df)
+
+
+def test_h2h_league_create_bad_json():
+    with pytest.raises(error.JSONError):
+        data.H2HLeague.create(lambda: {"standings": {}})
+    with pytest.raises(error.JSONError):
+        data.H2HLeague.create(lambda: iter([]))
+
+
+def test_h2h_league_create_fetch_error(season):
+    def _pages():
+        yield season.league_json(1, page_size=3)
+        raise error.FetchError("page 2")
+
+    # A failed fetch isn't reported as malformed JSON.
+    with pytest.raises(error.FetchError) as exc_info:
+        data.H2HLeague.create(_pages)
+    assert not isinstance(exc_info.value, error.JSONError)
+
+
+@pytest.mark.parametrize("split", [1, 4, 5])
+def test_league_history_update_matches_rebuild(
+    season, get_matches, get_picks, split
+):
+    rebuilt = data.LeagueHistory.create(
+        season.league_id, range(1, 7), get_matches, get_picks
+    )
+
+    history = data.LeagueHistory.create(
+        season.league_id, range(1, split + 1), get_matches, get_picks
+    )
+    applied = []
+    for event in range(split + 1, 7):
+        applied += history.update(range(1, event + 1), get_matches, get_picks)
+
+    assert applied == list(range(split + 1, 7))
+    _assert_history_equal(history, rebuilt)
+
+
+def test_league_history_update_is_idempotent(season, get_matches, get_picks):
+    history = data.LeagueHistory.create(
+        season.league_id, range(1, 7), get_matches, get_picks
+    )
+    assert history.update(range(1, 7), get_matches, get_picks) == []
+    assert history.events == list(range(1, 7))
+
+
+def test_league_history_stats(season, get_matches, get_picks):
+    history = data.LeagueHistory.create(
+        season.league_id, range(1, 7), get_matches, get_picks
+    )
+    stats_df = history.stats_df
+    points = history.entry_history_df.groupby("entry")["points"]
+    assert sorted(stats_df.index) == season.entries
+    assert (stats_df["events_played"] == 6).all()
+    pd.testing.assert_series_equal(
+        stats_df["points_sum"], points.sum().astype("int32"),
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        stats_df["points_max"], points.max(), check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        stats_df["points_mean"], points.mean(), check_names=False,
+    )
+
+
+def test_bootstrap_tables_are_lazy(season):
+    bootstrap = data.Bootstrap.create(season.bootstrap_json)
+    assert "built" not in repr(bootstrap)
+    elements_df = bootstrap.elements_df
+    # The elements' categories are read from the teams and element types.
+    assert repr(bootstrap) == (
+        "Bootstrap(elements_df=built, events_df=lazy, phases_df=lazy, "
+        "pl_teams_df=built, element_types_df=built)"
+    )
+    assert bootstrap.elements_df is elements_df
+
+
+def test_bootstrap_dtypes(season):
+    bootstrap = data.Bootstrap.create(season.bootstrap_json)
+    for table, dtypes in (
+        ("elements_df", data.Bootstrap.ELEMENTS),
+        ("events_df", data.Bootstrap.EVENTS),
+        ("phases_df", data.Bootstrap.PHASES),
+        ("pl_teams_df", data.Bootstrap.PL_TEAMS),
+        ("element_types_df", data.Bootstrap.ELEMENT_TYPES),
+    ):
+        df = getattr(bootstrap, table)
+        assert list(df.columns) == list(dtypes), table
+        for column, dtype in dtypes.items():
+            if dtype == "datetime":
+                assert str(df[column].dtype) == "datetime64[ns, UTC]"
+            else:
+                assert df[column].dtype == dtype, (table, column)
+
+
+def test_bootstrap_categories(season):
+    bootstrap = data.Bootstrap.create(season.bootstrap_json)
+    elements_df = bootstrap.elements_df
+    assert list(elements_df["team"].cat.categories) == \
+        bootstrap.pl_teams_df["id"].tolist()
+    assert list(elements_df["element_type"].cat.categories) == \
+        bootstrap.element_types_df["id"].tolist()
+    teams = {
+        element["id"]: element["team"]
+        for element in season.bootstrap_json()["elements"]
+    }
+    assert all(
+        teams[row.id] == row.team for row in elements_df.itertuples()
+    )
+
+
+def test_bootstrap_nullable_event_columns(season):
+    events_df = data.Bootstrap.create(season.bootstrap_json).events_df
+    unplayed = events_df[~events_df["finished"]]
+    assert len(unplayed) == 2
+    assert unplayed["highest_score"].isna().all()
+    assert events_df.loc[events_df["finished"], "highest_score"] \
+        .notna().all()
+
+
+def test_bootstrap_create_bad_json(season):
+    bootstrap_json = dict(season.bootstrap_json())
+    del bootstrap_json["phases"]
+    with pytest.raises(error.JSONError):
+        data.Bootstrap.create(lambda: bootstrap_json)
+
+
+def _league_pages(season):
+    return lambda: pages(
+        lambda page: season.league_json(page, page_size=3),
+        lambda page: page["standings"]["has_next"],
+    )
+
+
+def test_league_season_create(season):
+    histories = {}
+
+    def _get_histories(entries):
+        histories.update(
+            (entry, season.entry_history_json(entry)) for entry in entries
+        )
+        histories[season.entries[0]]["chips"] = [
+            {"name": "wildcard", "event": 2, "time": None},
+        ]
+        return histories
+
+    league = data.LeagueSeason.create(_league_pages(season), _get_histories)
+    assert league.id == season.league_id
+    assert sorted(histories) == season.entries
+    assert repr(league) == f"LeagueSeason(id={season.league_id}, entries=7)"
+
+    points_df = league.points_df
+    assert list(points_df.index) == season.entries
+    assert list(points_df.columns) == list(range(1, 7))
+    for entry in season.entries:
+        for event in range(1, 7):
+            assert points_df.loc[entry, event] == \
+                season.entry_points(entry, event)[0]
+    costs_df = league.pivot("event_transfers_cost")
+    assert costs_df.loc[season.entries[1], 2] == \
+        season.transfers(season.entries[1], 2)[1]
+
+    chips = league.entry_history_df.set_index(["entry", "event"])
+    assert chips.loc[(season.entries[0], 2), "active_chip"] == "wildcard"
+    assert chips["active_chip"].notna().sum() == 1
+
+
+def test_league_season_create_bad_json(season):
+    with pytest.raises(error.JSONError):
+        data.LeagueSeason.create(
+            _league_pages(season),
+            lambda entries: {entry: {"chips": []} for entry in entries},
+        )
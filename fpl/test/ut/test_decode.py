@@ -0,0 +1,90 @@
+"""Unit tests for decode.py, run against each available backend."""
+import pandas as pd
+import pytest
+
+import data
+import error
+import decode
+import process
+
+
+@pytest.fixture(params=["orjson", "msgspec", "json"])
+def backend(request, monkeypatch):
+    """Use one backend for loads/dumps; decode_columns only takes its
+    struct path with msgspec."""
+    if request.param != "json" and getattr(decode, request.param) is None:
+        pytest.skip(f"{request.param} isn't installed")
+    monkeypatch.setattr(decode, "BACKEND", request.param)
+    if request.param != "msgspec":
+        monkeypatch.setattr(decode, "msgspec", None)
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def summaries(season):
+    return [season.element_json(element) for element in (1, 2, 3, 120)]
+
+
+def test_round_trip(backend, season):
+    bootstrap_json = season.bootstrap_json()
+    raw = decode.dumps(bootstrap_json)
+    assert isinstance(raw, bytes)
+    assert decode.loads(raw) == bootstrap_json
+    assert decode.loads(raw.decode("utf-8")) == bootstrap_json
+
+
+def test_decode_columns(backend, season):
+    bootstrap_json = season.bootstrap_json()
+    fields = data.Bootstrap.ELEMENTS
+    expected = decode.columns(bootstrap_json["elements"], fields)
+    assert decode.decode_columns(
+        decode.dumps(bootstrap_json), ["elements"], fields
+    ) == expected
+    assert decode.decode_columns(bootstrap_json, ["elements"], fields) == \
+        expected
+
+
+def test_decode_columns_nested(backend, season):
+    page = season.league_json(1)
+    fields = {"entry": "int32", "entry_name": "object"}
+    assert decode.decode_columns(
+        decode.dumps(page), ["standings", "results"], fields
+    ) == decode.columns(page["standings"]["results"], fields)
+
+
+@pytest.mark.parametrize("document", [
+    {"elements": [{"id": 1}]},
+    {"events": []},
+])
+def test_decode_columns_missing(backend, document):
+    fields = {"id": "int16", "web_name": "object"}
+    with pytest.raises(KeyError):
+        decode.decode_columns(decode.dumps(document), ["elements"], fields)
+    with pytest.raises(KeyError):
+        decode.decode_columns(document, ["elements"], fields)
+
+
+def test_bootstrap_from_raw(backend, season):
+    bootstrap_json = season.bootstrap_json()
+    raw = data.Bootstrap.create(lambda: decode.dumps(bootstrap_json))
+    decoded = data.Bootstrap.create(lambda: bootstrap_json)
+    for table in data.Bootstrap.TABLES:
+        pd.testing.assert_frame_equal(
+            getattr(raw, table), getattr(decoded, table), obj=table
+        )
+    assert raw.json_data == bootstrap_json
+
+
+def test_bootstrap_from_bad_raw(backend):
+    bootstrap = data.Bootstrap.create(lambda: decode.dumps({"events": []}))
+    with pytest.raises(error.JSONError):
+        bootstrap.elements_df
+
+
+def test_element_history_from_raw(backend, summaries):
+    pd.testing.assert_frame_equal(
+        process.element_history_df_from_json(
+            decode.dumps(summary) for summary in summaries
+        ),
+        process.element_history_df_from_json(summaries),
+    )
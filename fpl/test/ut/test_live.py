@@ -0,0 +1,157 @@
+"""Unit tests for live.py."""
+import pandas as pd
+import pytest
+
+import live
+
+EVENT = 3
+
+# Positions 1-11 start in a 4-4-2, 12-15 are the bench; element IDs are
+# the positions, plus 100 for the second entry.
+TYPES = (1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 1, 2, 3, 4)
+CAPTAIN, VICE = 6, 7
+
+
+def _picks(entry, offset):
+    return [
+        {
+            "entry": entry,
+            "event": EVENT,
+            "element": position + offset,
+            "position": position,
+            "multiplier": 0 if position > 11 else
+                2 if position == CAPTAIN else 1,
+            "is_captain": position == CAPTAIN,
+            "is_vice_captain": position == VICE,
+        }
+        for position in range(1, 16)
+    ]
+
+
+@pytest.fixture
+def engine():
+    picks_df = pd.DataFrame(_picks(1, 0) + _picks(2, 100))
+    element_types = {}
+    for offset in (0, 100):
+        element_types.update({
+            position + offset: element_type
+            for position, element_type in enumerate(TYPES, 1)
+        })
+    return live.LiveEngine(EVENT, picks_df, element_types, {2: 4})
+
+
+def _stats(minutes=None, points=None):
+    """Return one finished fixture's stats: everyone plays 90 minutes for
+    2 points unless given, and element 10's confirmed bonus marks the
+    fixture finished."""
+    minutes, points = minutes or {}, points or {}
+    rows = []
+    for element in list(range(1, 16)) + list(range(101, 116)):
+        played = minutes.get(element, 90)
+        rows.append({
+            "element": element,
+            "fixture": 1,
+            "event": EVENT,
+            "minutes": played,
+            "bps": element if played else 0,
+            "bonus": 3 if element == 10 else 0,
+            "total_points": points.get(element, 2 if played else 0),
+        })
+    return pd.DataFrame(rows)
+
+
+def test_provisional_bonus():
+    stats_df = pd.DataFrame({
+        "fixture": [1, 1, 1, 1, 1, 2],
+        "minutes": [90, 90, 90, 90, 0, 90],
+        "bps": [30, 30, 20, 10, 40, 5],
+    })
+    assert live.provisional_bonus(stats_df).tolist() == [3, 3, 1, 0, 0, 3]
+
+
+def test_bonus_confirmed_fixtures():
+    stats_df = pd.DataFrame({
+        "fixture": [1, 1, 2, 2, 3],
+        "bonus": [0, 2, 0, 0, 1],
+    })
+    assert live.bonus_confirmed_fixtures(stats_df) == [1, 3]
+
+
+def test_scores(engine):
+    assert sorted(engine.update(_stats())) == [1, 2]
+    # 11 starters at 2 points, the captain doubled.
+    assert engine.scores[1] == {
+        "points": 24, "gross_points": 24, "transfers_cost": 0,
+        "auto_subs": [],
+    }
+    assert engine.scores[2]["points"] == 20
+
+
+def test_provisional_bonus_until_confirmed(engine):
+    stats_df = _stats().assign(bonus=0)
+    stats_df["bps"] = stats_df["element"].map({2: 100, 3: 90, 4: 80}) \
+        .fillna(0)
+    engine.update(stats_df)
+    assert engine.scores[1]["points"] == 24 + 3 + 2 + 1
+
+    # Once confirmed, only the awarded bonus (in total_points) counts.
+    confirmed = stats_df.assign(
+        bonus=(stats_df["element"] == 2) * 3,
+        total_points=stats_df["total_points"] + (stats_df["element"] == 2) * 3,
+    )
+    engine.update(confirmed)
+    assert engine.scores[1]["points"] == 24 + 3
+
+
+def test_automatic_sub(engine):
+    engine.update(_stats(minutes={3: 0}))
+    score = engine.scores[1]
+    # The first outfield bench player replaces the defender.
+    assert score["auto_subs"] == [(3, 13)]
+    assert score["gross_points"] == 24
+
+
+def test_no_sub_breaking_formation(engine):
+    engine.update(_stats(minutes={3: 0, 13: 0}))
+    # Three defenders remain, so the midfielder can come on.
+    assert engine.scores[1]["auto_subs"] == [(3, 14)]
+
+    engine.update(_stats(minutes={1: 0, 12: 0}))
+    # Only a goalkeeper can replace a goalkeeper.
+    assert engine.scores[1]["auto_subs"] == []
+    assert engine.scores[1]["gross_points"] == 22
+
+
+def test_no_sub_before_bench_fixture_finished(engine):
+    stats_df = _stats(minutes={3: 0, 13: 0})
+    stats_df.loc[stats_df["element"] == 13, "fixture"] = 2
+    engine.update(stats_df, finished_fixtures=[1])
+    # The first bench player's fixture is pending, so they may yet play.
+    assert engine.scores[1]["auto_subs"] == []
+    assert engine.scores[1]["gross_points"] == 22
+
+    engine.update(stats_df, finished_fixtures=[1, 2])
+    assert engine.scores[1]["auto_subs"] == [(3, 14)]
+    assert engine.scores[1]["gross_points"] == 24
+
+
+def test_captain_fallback(engine):
+    engine.update(_stats(minutes={CAPTAIN: 0}, points={VICE: 5}))
+    score = engine.scores[1]
+    assert score["auto_subs"] == [(CAPTAIN, 13)]
+    # The vice-captain's 5 points are doubled instead.
+    assert score["gross_points"] == 9 * 2 + 2 + 2 * 5
+
+
+def test_incremental_update(engine):
+    engine.update(_stats())
+    stats_df = _stats(points={4: 7})
+    assert engine.update(stats_df) == [1]
+    assert engine.update(stats_df) == []
+
+    fresh = live.LiveEngine(
+        EVENT, pd.DataFrame(_picks(1, 0) + _picks(2, 100)),
+        engine.element_types, engine.transfers_cost,
+    )
+    fresh.update(stats_df)
+    assert fresh.scores == engine.scores
@@ -0,0 +1,86 @@
+"""Unit tests for metrics.py."""
+import json
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def registry():
+    return metrics.Registry()
+
+
+@pytest.mark.parametrize("key, template", [
+    ("bootstrap-static/", "bootstrap-static"),
+    ("entry/123/event/4/picks/", "entry/{id}/event/{id}/picks"),
+    ("element-summary/5", "element-summary/{id}"),
+    ("leagues-h2h-matches/league/7/?page=2&event=3",
+     "leagues-h2h-matches/league/{id}"),
+])
+def test_endpoint_template(key, template):
+    assert metrics.endpoint_template(key) == template
+
+
+def test_record_request(registry):
+    registry.record_request("element-summary/1/", 0.02, response_bytes=100)
+    registry.record_request(
+        "element-summary/2/", 0.2, retries=2, not_modified=True
+    )
+    registry.record_request("element-summary/3/", 20.0, failed=True)
+    stats = registry.snapshot()["element-summary/{id}"]
+    assert stats["requests"] == 3
+    assert stats["errors"] == 1
+    assert stats["retries"] == 2
+    assert stats["not_modified"] == 1
+    assert stats["response_bytes"] == 100
+    assert stats["latency_seconds_sum"] == pytest.approx(20.22)
+    assert stats["latency_p50"] == 0.2
+    assert stats["latency_p99"] == 20.0
+
+
+def test_record_cache(registry):
+    registry.record_cache("bootstrap-static/", hit=True)
+    registry.record_cache("bootstrap-static/", hit=False)
+    registry.record_cache("bootstrap-static/", hit=True)
+    registry.record_coalesced("bootstrap-static/")
+    stats = registry.snapshot()["bootstrap-static"]
+    assert stats["cache_hits"] == 2
+    assert stats["cache_misses"] == 1
+    assert stats["coalesced"] == 1
+    assert stats["requests"] == 0
+    assert stats["latency_p50"] is None
+
+
+def test_reset(registry):
+    registry.record_cache("bootstrap-static/", hit=True)
+    registry.reset()
+    assert registry.snapshot() == {}
+
+
+def test_to_prometheus(registry):
+    registry.record_request("bootstrap-static/", 0.03)
+    registry.record_request("bootstrap-static/", 30.0)
+    lines = registry.to_prometheus().splitlines()
+    assert 'fpl_fetch_requests_total{endpoint="bootstrap-static"} 2' in lines
+    # The histogram buckets are cumulative.
+    bucket = 'fpl_fetch_latency_seconds_bucket{endpoint="bootstrap-static",'
+    assert bucket + 'le="0.025"} 0' in lines
+    assert bucket + 'le="0.05"} 1' in lines
+    assert bucket + 'le="10.0"} 1' in lines
+    assert bucket + 'le="+Inf"} 2' in lines
+    assert 'fpl_fetch_latency_seconds_count{endpoint="bootstrap-static"} 2' \
+        in lines
+
+
+def test_write(registry, tmp_path):
+    registry.record_request("bootstrap-static/", 0.03)
+    json_path = tmp_path / "metrics.json"
+    registry.write(str(json_path))
+    assert json.loads(json_path.read_text(encoding="utf-8")) == \
+        json.loads(registry.to_json())
+    prom_path = tmp_path / "metrics.prom"
+    registry.write(str(prom_path))
+    assert prom_path.read_text(encoding="utf-8") == registry.to_prometheus()
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+        ["metrics.json", "metrics.prom"]
@@ -0,0 +1,105 @@
+"""Unit tests for ownership.py and data.LeagueOwnership."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import data
+import ownership
+
+EVENT = 3
+
+
+@pytest.fixture(scope="module")
+def picks_df(season, get_matches, get_picks):
+    return data.LeagueHistory.create(
+        season.league_id, range(1, 7), get_matches, get_picks
+    ).picks_df
+
+
+@pytest.fixture(scope="module")
+def league(season, picks_df):
+    return data.LeagueOwnership.from_picks(season.league_id, picks_df)
+
+
+def _teams(picks_df, event):
+    """Return each entry's (squad, starting, captain) sets in one event."""
+    teams = {}
+    for entry, df in picks_df[picks_df["event"] == event].groupby("entry"):
+        teams[entry] = (
+            set(df["element"]),
+            set(df.loc[df["multiplier"] > 0, "element"]),
+            set(df.loc[df["is_captain"], "element"]),
+        )
+    return teams
+
+
+def test_event_matrices():
+    picks_df = pd.DataFrame({
+        "entry": [10, 10, 20, 20, 20],
+        "event": [1, 1, 1, 1, 2],
+        "element": [5, 7, 7, 9, 5],
+        "multiplier": [2, 0, 1, 1, 1],
+        "is_captain": [True, False, False, True, False],
+    })
+    matrices = ownership.event_matrices(
+        picks_df, np.array([10, 20]), np.array([5, 7, 9])
+    )
+    assert sorted(matrices) == [1, 2]
+    assert matrices[1].squad.toarray().tolist() == [[1, 1, 0], [0, 1, 1]]
+    assert matrices[1].starting.toarray().tolist() == [[1, 0, 0], [0, 1, 1]]
+    assert matrices[1].captain.toarray().tolist() == [[1, 0, 0], [0, 0, 1]]
+    assert matrices[2].squad.toarray().tolist() == [[0, 0, 0], [1, 0, 0]]
+
+    result = ownership.overlaps(matrices[1])
+    assert result.shared.tolist() == [[2, 1], [1, 2]]
+    assert result.shared_starting.tolist() == [[1, 0], [0, 2]]
+    assert result.same_captain.tolist() == [[True, False], [False, True]]
+    assert result.differentials.tolist() == [[0, 1], [1, 0]]
+
+
+def test_overlaps_match_sets(league, picks_df):
+    teams = _teams(picks_df, EVENT)
+    entries = league.entries.tolist()
+    shared_df = league.overlap_df(EVENT)
+    differentials_df = league.overlap_df(EVENT, "differentials")
+    same_captain_df = league.overlap_df(EVENT, "same_captain")
+    for entry_1 in entries:
+        squad_1, _, captain_1 = teams[entry_1]
+        for entry_2 in entries:
+            squad_2, _, captain_2 = teams[entry_2]
+            assert shared_df.loc[entry_1, entry_2] == len(squad_1 & squad_2)
+            assert differentials_df.loc[entry_1, entry_2] == \
+                len(squad_1 - squad_2)
+            assert same_captain_df.loc[entry_1, entry_2] == \
+                (captain_1 == captain_2)
+
+
+def test_ownership_df(league, picks_df):
+    teams = _teams(picks_df, EVENT)
+    df = league.ownership_df(EVENT)
+    assert df["owned"].is_monotonic_decreasing
+    for element, row in df.iterrows():
+        counts = [
+            sum(element in team[i] for team in teams.values())
+            for i in range(3)
+        ]
+        assert [row["owned"], row["started"], row["captained"]] == \
+            pytest.approx([count / len(teams) for count in counts])
+    owned = set().union(*(team[0] for team in teams.values()))
+    assert set(df.index) == owned
+
+
+def test_matchups_df(league, picks_df, matches_df):
+    teams = _teams(picks_df, EVENT)
+    df = league.matchups_df(matches_df, EVENT)
+    # Matches against the AVERAGE are left out.
+    event_matches = matches_df[matches_df["event"] == EVENT]
+    assert 0 < len(df) == event_matches["entry_2_entry"].notna().sum()
+    for row in df.itertuples():
+        squad_1, starting_1, captain_1 = teams[row.entry_1_entry]
+        squad_2, starting_2, captain_2 = teams[row.entry_2_entry]
+        assert row.shared == len(squad_1 & squad_2)
+        assert row.shared_starting == len(starting_1 & starting_2)
+        assert row.entry_1_differentials == len(squad_1 - squad_2)
+        assert row.entry_2_differentials == len(squad_2 - squad_1)
+        assert row.same_captain == (captain_1 == captain_2)
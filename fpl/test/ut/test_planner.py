@@ -0,0 +1,122 @@
+"""Unit tests for planner.py."""
+import itertools
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import planner
+import process
+
+EVENTS = (7, 8)
+
+
+@pytest.fixture(scope="module")
+def transfer_planner(season):
+    bootstrap_json = season.bootstrap_json()
+    summaries = {
+        element["id"]: season.element_json(element["id"])
+        for element in bootstrap_json["elements"]
+    }
+    return planner.TransferPlanner.from_json(
+        bootstrap_json, summaries, EVENTS
+    )
+
+
+@pytest.fixture(scope="module")
+def squad(season):
+    entry = season.entries[0]
+    return [pick["element"] for pick in season.squad(entry, 6)]
+
+
+def _brute_force(tp, squad, bank, horizon, k, hits):
+    """Return the best gain over every legal set of exactly k transfers."""
+    score = tp.scores(horizon)
+    owned = set(squad)
+    best = None
+    for outs in itertools.combinations(squad, k):
+        types = sorted(tp.element_type[list(outs)].tolist())
+        budget = bank + int(tp.cost[list(outs)].sum())
+        teams = Counter(tp.team[element] for element in squad) - \
+            Counter(tp.team[element] for element in outs)
+        pools = {
+            element_type: [
+                element for element in np.flatnonzero(
+                    tp.element_type == element_type
+                ).tolist() if element not in owned
+            ]
+            for element_type in set(types)
+        }
+        per_type = Counter(types)
+        choices = [
+            itertools.combinations(pools[element_type], n)
+            for element_type, n in per_type.items()
+        ]
+        for buys in itertools.product(*choices):
+            ins = [element for group in buys for element in group]
+            if int(tp.cost[ins].sum()) > budget:
+                continue
+            counts = teams + Counter(tp.team[element] for element in ins)
+            if max(counts.values()) > planner.MAX_PER_TEAM:
+                continue
+            gain = float(score[ins].sum() - score[list(outs)].sum()) - hits
+            if best is None or gain > best:
+                best = gain
+    return best
+
+
+def test_expected_points_follow_fixtures(season, transfer_planner):
+    element = 1
+    rate = float(season.bootstrap_json()["elements"][0]["points_per_game"])
+    fixtures = season.element_json(element)["fixtures"]
+    expected = [
+        rate * sum(
+            planner.DIFFICULTY_FACTORS[fixture["difficulty"]]
+            for fixture in fixtures if fixture["event"] == event
+        )
+        for event in EVENTS
+    ]
+    np.testing.assert_allclose(
+        transfer_planner.expected[element], expected, rtol=1e-6
+    )
+
+
+def test_from_json_matches_from_fixtures(season, transfer_planner):
+    bootstrap_json = season.bootstrap_json()
+    fixtures_df = process.element_fixtures_df_from_json({
+        element["id"]: season.element_json(element["id"])
+        for element in bootstrap_json["elements"]
+    })
+    other = planner.TransferPlanner.from_fixtures(
+        bootstrap_json, fixtures_df, EVENTS
+    )
+    np.testing.assert_array_equal(other.expected, transfer_planner.expected)
+
+
+@pytest.mark.parametrize("bank", [0, 15])
+def test_plan_is_optimal(transfer_planner, squad, bank):
+    plans = transfer_planner.plan(
+        squad, bank, horizon=2, max_transfers=2, free_transfers=1
+    )
+    by_count = {len(plan.transfers): plan for plan in plans}
+    assert by_count[0].gain == 0.0
+
+    for k in (1, 2):
+        hits = max(k - 1, 0) * planner.HIT_COST
+        expected = _brute_force(transfer_planner, squad, bank, 2, k, hits)
+        assert by_count[k].gain == pytest.approx(expected, abs=1e-4)
+        assert by_count[k].hits == hits
+
+
+def test_plan_is_legal(transfer_planner, squad):
+    for plan in transfer_planner.plan(squad, 5, horizon=2, max_transfers=2):
+        outs = [out for out, _ in plan.transfers]
+        ins = [element for _, element in plan.transfers]
+        assert set(outs) <= set(squad)
+        assert not set(ins) & set(squad)
+        assert sorted(transfer_planner.element_type[outs]) == \
+            sorted(transfer_planner.element_type[ins])
+        assert plan.bank >= 0
+        new_squad = [e for e in squad if e not in outs] + ins
+        teams = Counter(transfer_planner.team[new_squad].tolist())
+        assert max(teams.values()) <= planner.MAX_PER_TEAM
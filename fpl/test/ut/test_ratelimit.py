@@ -0,0 +1,119 @@
+"""Unit tests for ratelimit.py."""
+import email.utils
+import types
+
+import pytest
+
+import ratelimit
+
+START = 1000.0
+
+
+class Clock:
+    """A fake clock for ratelimit's time.time and time.sleep."""
+    def __init__(self):
+        self.now = START
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(
+        ratelimit, "time", types.SimpleNamespace(
+            time=clock.time, sleep=clock.sleep
+        )
+    )
+    return clock
+
+
+@pytest.fixture(params=["local", "shared"])
+def bucket(request, clock, tmp_path):
+    path = str(tmp_path / "ratelimit.state") \
+        if request.param == "shared" else None
+    return ratelimit.TokenBucket(rate=10.0, burst=2, path=path)
+
+
+def test_unlimited(clock):
+    bucket = ratelimit.TokenBucket(rate=None)
+    assert [bucket.reserve() for _ in range(100)] == [0.0] * 100
+
+
+def test_burst_then_rate(bucket):
+    waits = [bucket.reserve() for _ in range(4)]
+    # Waiting callers are spaced out at the rate.
+    assert waits == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+
+def test_refill(bucket, clock):
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 0.1
+    assert bucket.reserve() == pytest.approx(0.0)
+    # Never more than the burst, however long it's idle.
+    clock.now += 60.0
+    assert [bucket.reserve() for _ in range(3)] == \
+        pytest.approx([0.0, 0.0, 0.1])
+
+
+def test_acquire_sleeps(bucket, clock):
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == pytest.approx([0.1])
+
+
+def test_penalize(bucket, clock):
+    bucket.penalize(5.0)
+    assert bucket.reserve() == pytest.approx(5.1)
+    # A shorter pause doesn't cut a longer one short.
+    bucket.penalize(1.0)
+    assert bucket.reserve() == pytest.approx(5.2)
+
+
+def test_shared_state(clock, tmp_path):
+    path = str(tmp_path / "ratelimit.state")
+    first = ratelimit.TokenBucket(rate=10.0, burst=2, path=path)
+    second = ratelimit.TokenBucket(rate=10.0, burst=2, path=path)
+    first.reserve()
+    first.reserve()
+    assert second.reserve() == pytest.approx(0.1)
+    second.penalize(3.0)
+    # The pause comes on top of the token already reserved.
+    assert first.reserve() == pytest.approx(3.2)
+
+
+def test_configure(monkeypatch, tmp_path):
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+    monkeypatch.setenv("FPL_CACHE_DIR", str(tmp_path))
+    limiter = ratelimit.get_limiter()
+    assert limiter.path == str(tmp_path / "ratelimit.state")
+    assert ratelimit.get_limiter() is limiter
+
+    limiter = ratelimit.configure(None, shared=False)
+    assert (limiter.rate, limiter.path) == (None, None)
+    assert ratelimit.get_limiter() is limiter
+    assert ratelimit.reserve() == 0.0
+
+
+@pytest.mark.parametrize("headers, attempt, delay", [
+    ({"Retry-After": "3"}, 0, 3.0),
+    ({"Retry-After": "1.5"}, 2, 1.5),
+    ({"Retry-After": "-1"}, 0, 0.0),
+    ({"Retry-After": "soon"}, 0, ratelimit.DEFAULT_BACKOFF),
+    ({}, 0, ratelimit.DEFAULT_BACKOFF),
+    ({}, 3, ratelimit.DEFAULT_BACKOFF * 8),
+])
+def test_retry_after(headers, attempt, delay):
+    assert ratelimit.retry_after(headers, attempt) == delay
+
+
+def test_retry_after_date(clock):
+    value = email.utils.formatdate(START + 30.0, usegmt=True)
+    assert ratelimit.retry_after({"Retry-After": value}) == 30.0
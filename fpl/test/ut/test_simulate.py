@@ -0,0 +1,57 @@
+"""Unit tests for simulate.py."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import simulate
+import standings
+import synthetic
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    season = synthetic.SyntheticSeason(
+        n_entries=7, n_elements=200, n_events=10, finished=5
+    )
+    pages = [season.league_matches_json(1)]
+    while pages[-1]["has_next"]:
+        pages.append(season.league_matches_json(len(pages) + 1))
+    return simulate.SeasonSimulator.from_matches(
+        standings.matches_df_from_pages(pages)
+    )
+
+
+def test_remaining_fixtures(simulator):
+    assert simulator.events == [6, 7, 8, 9, 10]
+    assert len(simulator.entries) == 7
+
+
+@pytest.mark.parametrize("seed", [0, 17])
+def test_run_independent_of_processes(simulator, seed):
+    serial = simulator.run(sims=3000, seed=seed, processes=0, shard_size=1000)
+    parallel = simulator.run(
+        sims=3000, seed=seed, processes=2, shard_size=1000
+    )
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_run_reproducible(simulator):
+    first = simulator.position_counts(sims=2000, seed=3, processes=0)
+    second = simulator.position_counts(sims=2000, seed=3, processes=0)
+    other = simulator.position_counts(sims=2000, seed=4, processes=0)
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+
+def test_position_counts_sum_to_sims(simulator):
+    counts = simulator.position_counts(sims=1500, seed=1, processes=0)
+    assert (counts.sum(axis=1) == 1500).all()
+    assert (counts.sum(axis=0) == 1500).all()
+
+
+def test_run_probabilities(simulator):
+    df = simulator.run(sims=2000, seed=2, top_n=3, relegation=2, processes=0)
+    assert df["title"].sum() == pytest.approx(1.0)
+    assert df["top_n"].sum() == pytest.approx(3.0)
+    assert df["relegation"].sum() == pytest.approx(2.0)
+    assert df["expected_rank"].is_monotonic_increasing
@@ -0,0 +1,87 @@
+"""Unit tests for singleflight.py."""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+import singleflight
+
+N_CALLERS = 8
+
+
+class _CountingFuture(Future):
+    """A Future counting the callers waiting on its result."""
+    waiting = 0
+    lock = threading.Lock()
+
+    def result(self, timeout=None):
+        with self.lock:
+            _CountingFuture.waiting += 1
+        return super().result(timeout)
+
+
+@pytest.fixture
+def group(monkeypatch):
+    monkeypatch.setattr(singleflight, "Future", _CountingFuture)
+    monkeypatch.setattr(_CountingFuture, "waiting", 0)
+    return singleflight.Group()
+
+
+def _run_concurrently(group, outcome):
+    """Call group.do for one key from N_CALLERS threads, the others arriving
+    while the first call is in flight. Returns the futures of the calls (the
+    leader's first) and the number of times the call ran."""
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def _call():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with ThreadPoolExecutor(N_CALLERS) as pool:
+        futures = [pool.submit(group.do, "key", _call)]
+        assert started.wait(5)
+        futures += [
+            pool.submit(group.do, "key", _call)
+            for _ in range(N_CALLERS - 1)
+        ]
+        while _CountingFuture.waiting < N_CALLERS - 1:
+            pass
+        release.set()
+    return futures, len(calls)
+
+
+def test_concurrent_calls_are_coalesced(group):
+    futures, calls = _run_concurrently(group, "result")
+    assert calls == 1
+    assert [future.result() for future in futures] == \
+        [("result", False)] + [("result", True)] * (N_CALLERS - 1)
+    assert repr(group) == "Group(in_flight=0)"
+
+
+def test_exception_is_shared(group):
+    futures, calls = _run_concurrently(group, ValueError("bad"))
+    assert calls == 1
+    for future in futures:
+        with pytest.raises(ValueError, match="bad"):
+            future.result()
+
+
+def test_finished_calls_are_forgotten(group):
+    assert group.do("key", lambda: 1) == (1, False)
+    assert group.do("key", lambda: 2) == (2, False)
+    with pytest.raises(KeyError):
+        group.do("key", lambda: {}["missing"])
+    # A failed call doesn't poison the key.
+    assert group.do("key", lambda: 3) == (3, False)
+    assert repr(group) == "Group(in_flight=0)"
+
+
+def test_keys_are_independent(group):
+    # A call for one key may make a call for another.
+    assert group.do("a", lambda: group.do("b", lambda: "b")) == \
+        (("b", False), False)
@@ -0,0 +1,109 @@
+"""Unit tests for snapshot.py: tables written from the API's JSON read back
+as the same JSON."""
+import pytest
+
+import fetch
+import process
+import snapshot
+import standings
+
+pytest.importorskip("pyarrow")
+
+LEAGUE_ID = 1
+ELEMENTS = (1, 2, 50, 200)
+
+
+@pytest.fixture(scope="module")
+def store(season, matches_df, tmp_path_factory):
+    store = snapshot.SnapshotStore(str(tmp_path_factory.mktemp("snapshot")))
+    league_df = matches_df.copy()
+    league_df.insert(0, "league", LEAGUE_ID)
+    store.write("matches", league_df)
+
+    picks = {
+        (entry, event): season.picks_json(entry, event)
+        for entry in season.entries for event in range(1, season.finished + 1)
+    }
+    picks_df, history_df, subs_df = process.picks_dfs_from_json(picks)
+    store.write("picks", picks_df)
+    store.write("entry_history", history_df)
+    store.write("automatic_subs", subs_df)
+
+    summaries = {element: season.element_json(element) for element in ELEMENTS}
+    store.write(
+        "elements", process.element_history_df_from_json(summaries.values())
+    )
+    store.write("fixtures", process.element_fixtures_df_from_json(summaries))
+    return store
+
+
+def test_picks_round_trip(season, store):
+    entry = season.entries[2]
+    for event in (1, season.finished):
+        key = fetch.PATHS["picks"].format(entry_id=entry, event_id=event)
+        assert store.get_json(key) == season.picks_json(entry, event)
+
+
+def test_element_round_trip(season, store):
+    for element in ELEMENTS:
+        expected = season.element_json(element)
+        got = store.get_json(
+            fetch.PATHS["element"].format(element_id=element)
+        )
+        assert got["history"] == expected["history"]
+        # The fixtures table doesn't keep the display name.
+        assert got["fixtures"] == [
+            {k: v for k, v in fixture.items() if k != "event_name"}
+            for fixture in expected["fixtures"]
+        ]
+
+
+def test_matches_round_trip(season, store, matches_df):
+    got = store.get_json(fetch.PATHS["league_matches"].format(
+        league_id=LEAGUE_ID, page=1
+    ))
+    assert not got["has_next"]
+    assert standings.matches_df_from_pages([got]).equals(matches_df)
+
+    event = season.finished
+    got = store.get_json(
+        fetch.PATHS["league_event_matches"].format(
+            league_id=LEAGUE_ID, page=1, event_id=event
+        )
+    )
+    assert {match["event"] for match in got["results"]} == {event}
+
+
+def test_missing_keys(season, store):
+    assert store.get_json(fetch.PATHS["picks"].format(
+        entry_id=season.entries[0], event_id=99
+    )) is None
+    assert store.get_json(
+        fetch.PATHS["element"].format(element_id=9999)
+    ) is None
+    assert store.get_json(fetch.PATHS["league_matches"].format(
+        league_id=2, page=1
+    )) is None
+    assert store.get_json(fetch.PATHS["bootstrap"]) is None
+
+
+def test_read_pushdown(season, store):
+    entries = list(season.entries[:2])
+    df = store.read("picks", events=(2, 3), entries=entries)
+    assert set(df["event"]) == {2, 3}
+    assert set(df["entry"]) == set(entries)
+    assert len(df) == 2 * 2 * 15
+
+
+def test_rewrite_replaces_rows(store, tmp_path):
+    other = snapshot.SnapshotStore(str(tmp_path))
+    df = store.read("entry_history", events=(1, 2))
+    other.write("entry_history", df)
+    changed = df[df["event"] == 1]
+    other.write("entry_history", changed.assign(bank=changed["bank"] + 1))
+
+    after = other.read("entry_history", events=(1, 1)).sort_values("entry")
+    assert after["bank"].tolist() == \
+        (changed.sort_values("entry")["bank"] + 1).tolist()
+    assert len(other.read("entry_history", events=(2, 2))) == \
+        (df["event"] == 2).sum()
@@ -0,0 +1,52 @@
+"""Unit tests for standings.py."""
+import pandas as pd
+import pytest
+
+import standings
+
+
+def test_compute_standings_ignores_unplayed(matches_df):
+    standings_df = standings.compute_standings(matches_df)
+    assert sorted(standings_df["event"].unique()) == list(range(1, 7))
+    # Every entry plays one match per event.
+    last = standings.standings_as_of(standings_df, 6)
+    assert (last["matches_played"] == 6).all()
+    assert (
+        last["matches_won"] + last["matches_drawn"] + last["matches_lost"]
+        == last["matches_played"]
+    ).all()
+
+
+@pytest.mark.parametrize("split", [1, 3, 5])
+def test_append_standings_matches_full_compute(matches_df, split):
+    full_df = standings.compute_standings(matches_df)
+    before_df = standings.compute_standings(
+        matches_df[matches_df["event"] <= split]
+    )
+
+    # One event at a time, as LeagueHistory.update applies them.
+    appended_df = before_df
+    for event in range(split + 1, 7):
+        appended_df = standings.append_standings(
+            appended_df, matches_df[matches_df["event"] <= event]
+        )
+
+    pd.testing.assert_frame_equal(
+        appended_df.reset_index(drop=True), full_df.reset_index(drop=True)
+    )
+
+
+def test_append_standings_from_empty(matches_df):
+    empty_df = standings.compute_standings(matches_df.iloc[:0])
+    pd.testing.assert_frame_equal(
+        standings.append_standings(empty_df, matches_df),
+        standings.compute_standings(matches_df),
+    )
+
+
+def test_append_standings_without_new_events(matches_df):
+    full_df = standings.compute_standings(matches_df)
+    pd.testing.assert_frame_equal(
+        standings.append_standings(full_df, matches_df).reset_index(drop=True),
+        full_df.reset_index(drop=True),
+    )